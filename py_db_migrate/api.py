@@ -0,0 +1,106 @@
+"""Async API to run the migrations from an application.
+
+The functions run on the asyncpg pool or connection and the event loop of
+the application, return their results and raise the errors of the services
+instead of exiting:
+
+    async with asyncpg.create_pool(dsn) as pool:
+        migrated_files = await migrate_up(pool, "migrations")
+"""
+import logging
+from logging import Logger
+from pathlib import Path
+
+from asyncpg import Connection, Pool
+from asyncpg.pool import PoolConnectionProxy
+
+from py_db_migrate.database.postgresql import PoolPSql
+from py_db_migrate.service.migration_down import MigrationDown
+from py_db_migrate.service.migration_status import MigrationState, MigrationStatus
+from py_db_migrate.service.migration_up import MigrationUp
+
+MIGRATION_TABLE: str = "pydbmigration"
+
+# The services log to this logger unless another one is given. It doesn't
+# write anything until the application adds a handler to it.
+logger: Logger = logging.getLogger("py_db_migrate.api")
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+
+async def migrate_up(
+    pool: Pool | Connection | PoolConnectionProxy,
+    migrations_path: Path | str,
+    table: str = MIGRATION_TABLE,
+    service_logger: Logger | None = None,
+) -> list[str]:
+    """Run the new migration files.
+
+    Arguments:
+        pool: The asyncpg pool or connection of the application.
+        migrations_path: Migration folder or bundle path.
+        table: The name of the table that holds migrated files.
+        service_logger: The logger of the service.
+
+    Returns:
+        The names of the migrated files in the running order.
+
+    Raises:
+        FolderNotFoundError: If the migration folder couldn't be found.
+        MigrationError: If the problem occurs while migrating.
+    """
+    return await MigrationUp(
+        database=PoolPSql(pool=pool), logger=service_logger or logger
+    )(migration_folder=Path(migrations_path), migration_table=table)
+
+
+async def migrate_down(
+    pool: Pool | Connection | PoolConnectionProxy,
+    migrations_path: Path | str,
+    table: str = MIGRATION_TABLE,
+    service_logger: Logger | None = None,
+) -> str:
+    """Roll back the latest migration.
+
+    Arguments:
+        pool: The asyncpg pool or connection of the application.
+        migrations_path: Migration folder or bundle path.
+        table: The name of the table that holds migrated files.
+        service_logger: The logger of the service.
+
+    Returns:
+        The name of the down file that is run.
+
+    Raises:
+        FolderNotFoundError: If the migration folder doesn't exist.
+        TableNotFoundError: If the migration table doesn't exist.
+        EmptyTableError: If the migration table is empty.
+    """
+    return await MigrationDown(
+        database=PoolPSql(pool=pool), logger=service_logger or logger
+    )(migration_folder=Path(migrations_path), migration_table=table)
+
+
+async def migration_status(
+    pool: Pool | Connection | PoolConnectionProxy,
+    migrations_path: Path | str,
+    table: str = MIGRATION_TABLE,
+    service_logger: Logger | None = None,
+) -> list[MigrationState]:
+    """Report which migrations were run and which are pending.
+
+    Arguments:
+        pool: The asyncpg pool or connection of the application.
+        migrations_path: Migration folder or bundle path.
+        table: The name of the table that holds migrated files.
+        service_logger: The logger of the service.
+
+    Returns:
+        The states of the migrations in the running order.
+
+    Raises:
+        FolderNotFoundError: If the migration folder couldn't be found.
+    """
+    return await MigrationStatus(
+        database=PoolPSql(pool=pool), logger=service_logger or logger
+    )(migration_folder=Path(migrations_path), migration_table=table)
@@ -0,0 +1,66 @@
+"""Thin client of the migration server.
+
+It only uses the standard library, so a request costs little more than the
+interpreter start:
+
+    python -m py_db_migrate.client up .py-db-migrate.sock
+"""
+import json
+import socket
+import sys
+from typing import Any
+
+DEFAULT_SOCKET_PATH: str = ".py-db-migrate.sock"
+
+
+class ServerError(ValueError):
+    """Raises when the migration server couldn't run the command."""
+
+
+def request(command: str, socket_path: str = DEFAULT_SOCKET_PATH) -> Any:
+    """Send a command to the migration server and wait for its result.
+
+    Arguments:
+        command: The command to run. (up, down, status or reset)
+        socket_path: Path of the Unix domain socket of the server.
+
+    Returns:
+        The result of the command.
+
+    Raises:
+        ServerError: If the server couldn't run the command.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps({"command": command}).encode() + b"\n")
+        with connection.makefile("rb") as file:
+            response: dict[str, Any] = json.loads(file.readline())
+
+    if not response["ok"]:
+        raise ServerError(response["error"])
+    return response["result"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a command from the command line and print its result as JSON.
+
+    Arguments:
+        argv: Command and optional socket path.
+
+    Returns:
+        Exit code of the process.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(argv) <= 2:
+        print("Usage: python -m py_db_migrate.client COMMAND [SOCKET]", file=sys.stderr)
+        return 2
+    try:
+        print(json.dumps(request(*argv), indent=2))
+    except (OSError, ServerError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,29 +27,55 @@ class Configuration(BaseModel):
 
     database: DatabaseFields
     migration_directory: str
+    replicas: list[str] = []
 
 
-@lru_cache(maxsize=1)
-def get_configuration(path: Path) -> Configuration:
+class ConfigurationError(ValueError):
+    """Raises when the configuration file is missing or incorrect."""
+
+
+def load_configuration(path: Path) -> Configuration:
     """Read and check the py-db-migration.yaml file.
 
+    Arguments:
+        path: Path of the configuration file.
+
     Returns:
         Configuration file of the project.
+
+    Raises:
+        ConfigurationError: If the file couldn't be found or is incorrect.
     """
-    logger.info("Reading configuration file...")
     try:
         config_data: dict[str, Any]
         with open(path, "r") as yaml_file:
             config_data = yaml.safe_load(yaml_file)
 
-        configuration: Configuration = Configuration(
+        return Configuration(
             database=DatabaseFields(**config_data["database"]),
             migration_directory=config_data["migration_directory"],
+            replicas=config_data.get("replicas") or [],
         )
-        logger.info("Configuration file is ready.")
-        return configuration
-    except (ValidationError, KeyError, TypeError):
-        logger.error("Configuration file is incorrect.")
-    except FileNotFoundError:
-        logger.error("Configuration file couldn't be found.")
-    sys.exit(1)
+    except (ValidationError, KeyError, TypeError) as e:
+        raise ConfigurationError("Configuration file is incorrect.") from e
+    except FileNotFoundError as e:
+        raise ConfigurationError("Configuration file couldn't be found.") from e
+
+
+@lru_cache(maxsize=1)
+def get_configuration(path: Path) -> Configuration:
+    """Read and check the py-db-migration.yaml file for the CLI.
+
+    The process exits if the file couldn't be read.
+
+    Returns:
+        Configuration file of the project.
+    """
+    logger.info("Reading configuration file...")
+    try:
+        configuration: Configuration = load_configuration(path)
+    except ConfigurationError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info("Configuration file is ready.")
+    return configuration
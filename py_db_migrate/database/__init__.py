@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, AsyncIterator, Mapping, Self
 
 from pydantic import BaseModel, Field, validate_call
 
@@ -16,10 +16,17 @@ class Sql(ABC, BaseModel):
         password: The password of the database.
         port: The port number to connect database
         host: The host of the database.
+        search_path: The search path of the connections. The default one of
+            the server is used if it isn't given.
 
     Methods:
         fetch: Fetch a query.
+        fetch_records: Fetch a query without copying the rows.
+        stream: Iterate over the rows of a query by using a cursor.
         execute: Execute a query and don't return anything.
+        session: Pin a single connection for the following queries.
+        clone: Create another instance which opens its own connections.
+        can_retry: Check whether a failed query can run again.
     """
 
     name: str
@@ -27,6 +34,7 @@ class Sql(ABC, BaseModel):
     password: str
     port: int = Field(default=5432)
     host: str = Field(default="localhost")
+    search_path: str | None = None
 
     @abstractmethod
     @validate_call
@@ -40,6 +48,34 @@ class Sql(ABC, BaseModel):
             The response of the given query.
         """
 
+    @abstractmethod
+    @validate_call
+    async def fetch_records(self, query: str) -> list[Mapping[str, Any]]:
+        """Fetch a query and return the rows as the driver creates them.
+
+        Arguments:
+            query: Query to send to db.
+
+        Returns:
+            The read-only rows of the given query.
+        """
+
+    @abstractmethod
+    def stream(
+        self, query: str, prefetch: int = 1000
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over the rows of a query by using a server-side cursor.
+
+        Only a batch of rows is held in memory at a time.
+
+        Arguments:
+            query: Query to send to db.
+            prefetch: The number of rows to fetch from db at a time.
+
+        Returns:
+            An async iterator of the read-only rows of the given query.
+        """
+
     @abstractmethod
     @validate_call
     async def execute(self, query: str) -> None:
@@ -55,9 +91,50 @@ class Sql(ABC, BaseModel):
     @asynccontextmanager
     @abstractmethod
     @validate_call
-    async def __call__(self):
+    async def __call__(self) -> AsyncIterator[Any]:
         """Create a context manager.
 
         Returns:
             Connection to send queries to db.
         """
+        yield
+
+    def clone(self, **changes: Any) -> Self:
+        """Create another instance of the database without the session.
+
+        The instance opens its own connections, so it can run queries while
+        the session of this instance is in use. Its connections use the same
+        search path.
+
+        Arguments:
+            changes: The fields to change, such as the name of the database.
+
+        Returns:
+            The new instance.
+        """
+        return self.__class__(**(self.model_dump() | changes))
+
+    def can_retry(self) -> bool:
+        """Check whether a failed query can run again.
+
+        A query of a session runs on its pinned connection. So, it can't run
+        again once the connection is closed.
+
+        Returns:
+            True if the query can run again. Otherwise, False.
+        """
+        return True
+
+    @asynccontextmanager
+    @abstractmethod
+    async def session(self) -> AsyncIterator[Any]:
+        """Create a context manager that pins a single connection.
+
+        Until the context exits, the other methods reuse the pinned connection
+        instead of opening new ones. A transaction that is opened by
+        `__call__` while another one is active becomes a savepoint.
+
+        Returns:
+            The pinned connection.
+        """
+        yield
@@ -1,56 +1,325 @@
 """Postgresql class."""
+import asyncio
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Mapping, Self, TypeVar
 
-from asyncpg import connect, Connection
+from asyncpg import connect, create_pool, Connection, Pool, Record
+from asyncpg.exceptions import (
+    AdminShutdownError,
+    CannotConnectNowError,
+    ConnectionDoesNotExistError,
+    CrashShutdownError,
+    PostgresConnectionError,
+    TooManyConnectionsError,
+    TransactionRollbackError,
+)
+from asyncpg.pool import PoolConnectionProxy
 from overrides import override
-from pydantic import validate_call
+from pydantic import ConfigDict, PrivateAttr, validate_call
 
 from py_db_migrate.database import Sql
+from py_db_migrate.logger import get_logger
+
+T = TypeVar("T")
+
+RETRY_ATTEMPTS: int = 5
+RETRY_DELAY: float = 0.5
+RETRY_MAX_DELAY: float = 8.0
+
+# The errors of opening a connection while the server is unreachable,
+# restarting or full.
+CONNECT_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    asyncio.TimeoutError,
+    CannotConnectNowError,
+    TooManyConnectionsError,
+    PostgresConnectionError,
+)
+# The errors of a statement whose connection is lost, so it isn't known
+# whether its transaction is committed.
+CONNECTION_LOST_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    AdminShutdownError,
+    CrashShutdownError,
+    ConnectionDoesNotExistError,
+)
+# The errors of a statement that can succeed if the statement is run again on a
+# new connection. OSError covers the connections which are reset.
+QUERY_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    AdminShutdownError,
+    CrashShutdownError,
+    ConnectionDoesNotExistError,
+    TransactionRollbackError,
+)
+
+logger = get_logger()
+
+
+async def retry_transient(
+    operation: Callable[[], Awaitable[T]],
+    errors: tuple[type[Exception], ...] = QUERY_ERRORS,
+    attempts: int | None = None,
+    delay: float | None = None,
+    can_retry: Callable[[], bool] | None = None,
+) -> T:
+    """Run an operation again if it fails with a transient error.
+
+    The delay doubles after each attempt up to `RETRY_MAX_DELAY`. Only
+    idempotent operations should be retried, since the server may have
+    committed the work before the error.
+
+    Arguments:
+        operation: The function which starts the operation.
+        errors: The errors which are retried.
+        attempts: The maximum number of attempts. RETRY_ATTEMPTS by default.
+        delay: The delay before the second attempt in seconds. RETRY_DELAY
+            by default.
+        can_retry: Whether the operation can run again after an error, such
+            as `Sql.can_retry`. It is always retried if None.
+
+    Returns:
+        The result of the operation.
+
+    Raises:
+        Exception: The error of the last attempt.
+    """
+    attempts = RETRY_ATTEMPTS if attempts is None else attempts
+    delay = RETRY_DELAY if delay is None else delay
+    for attempt in range(1, attempts + 1):
+        try:
+            return await operation()
+        except errors as e:
+            if attempt == attempts or (can_retry is not None and not can_retry()):
+                raise
+            logger.warning(
+                f"{e.__class__.__name__}: {e}. Retrying in {delay:.1f} s "
+                f"({attempt}/{attempts - 1})."
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX_DELAY)
+    raise ValueError("attempts must be positive.")
 
 
 class PSql(Sql):
     """Psql class."""
 
+    _connection: Connection | None = PrivateAttr(default=None)
+
     @override
     async def fetch(self, query: str) -> list[dict[str, Any]]:
         """Fetch a query."""
-        connection: Connection = await self._get_connection()
-        query_result = await connection.fetch(query)
-        return [dict(row) for row in query_result]
+        return [dict(row) for row in await self.fetch_records(query)]
+
+    @override
+    async def fetch_records(self, query: str) -> list[Mapping[str, Any]]:
+        """Fetch a query and return asyncpg records."""
+        async with self._acquire() as connection:
+            query_result: list[Record] = await connection.fetch(query)
+        return query_result
+
+    @override
+    async def stream(
+        self, query: str, prefetch: int = 1000
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over the asyncpg records of a query by using a cursor."""
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                async for record in connection.cursor(query, prefetch=prefetch):
+                    yield record
 
     @override
     async def execute(self, query: str) -> None:
         """Execute a query."""
-        connection: Connection = await self._get_connection()
-        await connection.execute(query)
+        async with self._acquire() as connection:
+            await connection.execute(query)
+
+    @override
+    def can_retry(self) -> bool:
+        """Check that the pinned connection isn't closed if there is a session."""
+        return self._connection is None or not self._connection.is_closed()
+
+    async def create_pool(self, min_size: int = 1, max_size: int = 10) -> Pool:
+        """Create an asyncpg pool of the database.
+
+        The first connections are retried with backoff like a new connection.
+
+        Arguments:
+            min_size: The number of connections to keep open.
+            max_size: The maximum number of connections.
+
+        Returns:
+            The pool which should be closed by the caller.
+        """
+        return await retry_transient(
+            lambda: create_pool(
+                **(self._get_connection_params()), min_size=min_size, max_size=max_size
+            ),
+            errors=CONNECT_ERRORS,
+        )
 
     # Helpers.
     @validate_call
-    def _get_connection_params(self) -> dict[str, str | int]:
+    def _get_connection_params(self) -> dict[str, Any]:
         """Get connection parameters."""
-        params: dict[str, str | int] = self.model_dump()
+        params: dict[str, Any] = self.model_dump(exclude={"search_path"})
         params["database"] = params["name"]
         del params["name"]
+        if self.search_path is not None:
+            params["server_settings"] = {"search_path": self.search_path}
         return params
 
     @validate_call
     async def _get_connection(self) -> Connection:
         """Get connection instance of database.
 
+        A new connection is retried with backoff while the server is
+        unreachable or doesn't accept connections, such as during a failover.
+
         Returns:
-            Database connection.
+            Database connection. If a session is active, its pinned
+            connection is returned.
         """
-        return await connect(**(self._get_connection_params()))
+        if self._connection is not None:
+            return self._connection
+        return await retry_transient(
+            lambda: connect(**(self._get_connection_params())), errors=CONNECT_ERRORS
+        )
+
+    async def _release(self, connection: Connection) -> None:
+        """Give back a connection that is opened by `_get_connection`."""
+        await connection.close()
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[Connection]:
+        """Create a context manager and return a connection.
+
+        The connection is closed when the context exits unless it is the
+        pinned connection of a session.
+
+        Returns:
+            A database connection.
+        """
+        if self._connection is not None:
+            yield self._connection
+            return
+
+        connection: Connection = await self._get_connection()
+        try:
+            yield connection
+        finally:
+            await self._release(connection)
 
     @asynccontextmanager
     @override
-    async def __call__(self) -> Connection:
+    async def __call__(self) -> AsyncIterator[Connection]:
         """Create a context manager and return connection.
 
+        If the connection is lost in the transaction, its error is raised
+        instead of the error of rolling back on the closed connection.
+
         Returns:
             A database connection.
         """
+        async with self._acquire() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                yield connection
+            except BaseException:
+                if not connection.is_closed():
+                    await transaction.rollback()
+                raise
+            await transaction.commit()
+
+    @asynccontextmanager
+    @override
+    async def session(self) -> AsyncIterator[Connection]:
+        """Create a context manager and pin a connection until it exits.
+
+        Nested sessions reuse the connection of the outermost one.
+
+        Returns:
+            The pinned database connection.
+        """
+        if self._connection is not None:
+            yield self._connection
+            return
+
         connection: Connection = await self._get_connection()
-        async with connection.transaction():
+        self._connection = connection
+        try:
             yield connection
+        finally:
+            self._connection = None
+            await self._release(connection)
+
+
+class PoolPSql(PSql):
+    """PSql class which runs on the connections of an application.
+
+    The connection fields aren't used, the connections are acquired from the
+    given asyncpg pool and released to it. If a single connection is given,
+    it is used for every query and isn't closed.
+
+    Attributes:
+        pool: The asyncpg pool or connection of the application.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    pool: Pool | Connection | PoolConnectionProxy
+    name: str = ""
+    user: str = ""
+    password: str = ""
+
+    @override
+    def clone(self, **changes: Any) -> Self:
+        """Create another instance on the same pool.
+
+        Raises:
+            ValueError: If a single connection is given, since it can't run
+                another query at the same time, or another database is asked.
+        """
+        if not isinstance(self.pool, Pool):
+            raise ValueError(
+                "A single connection can't run queries on several connections. "
+                "Give a pool instead."
+            )
+        if set(changes) - {"search_path"}:
+            raise ValueError(
+                "Another database can't be connected on the pool of the application."
+            )
+        return self.__class__(
+            pool=self.pool, search_path=changes.get("search_path", self.search_path)
+        )
+
+    @override
+    async def _get_connection(self) -> Connection:
+        """Acquire a connection from the pool.
+
+        The search path is set on the acquired connection, and the pool
+        resets it when the connection is released.
+        """
+        if self._connection is not None:
+            return self._connection
+        if not isinstance(self.pool, Pool):
+            return self.pool
+        connection: Connection = await retry_transient(
+            self.pool.acquire, errors=CONNECT_ERRORS
+        )
+        if self.search_path is not None:
+            try:
+                await connection.execute(
+                    "SELECT set_config('search_path', $1, false)", self.search_path
+                )
+            except BaseException:
+                await self.pool.release(connection)
+                raise
+        return connection
+
+    @override
+    async def _release(self, connection: Connection) -> None:
+        """Release a connection to the pool."""
+        if isinstance(self.pool, Pool):
+            await self.pool.release(connection)
@@ -2,17 +2,44 @@
 import asyncio
 
 from pathlib import Path
+from typing import Any, Callable, Coroutine, Optional
 
 import typer
 from typing_extensions import Annotated
 
+from py_db_migrate.client import DEFAULT_SOCKET_PATH
 from py_db_migrate.configuration import Configuration, get_configuration
 from py_db_migrate.database.postgresql import PSql
 from py_db_migrate.logger import get_logger
+from py_db_migrate.service.blocking_watchdog import RETRIES, BlockingWatchdog
+from py_db_migrate.service.migration_analyzer import MigrationAnalyzer
+from py_db_migrate.service.migration_bundle import MigrationBundle
 from py_db_migrate.service.migration_down import MigrationDown
 from py_db_migrate.service.migration_files import MigrationFiles
+from py_db_migrate.service.migration_lint import LintIssue, MigrationLint
+from py_db_migrate.service.migration_mark import MigrationMark
+from py_db_migrate.service.migration_profiler import MigrationProfiler
+from py_db_migrate.service.migration_rehearsal import MigrationRehearsal
+from py_db_migrate.service.migration_reset import MigrationReset
+from py_db_migrate.service.migration_roundtrip import (
+    DEFAULT_WORKERS,
+    MigrationRoundtrip,
+    RoundtripResult,
+)
+from py_db_migrate.service.migration_server import MigrationServer
+from py_db_migrate.service.migration_squash import MigrationSquash
+from py_db_migrate.service.migration_status import MigrationStatus
+from py_db_migrate.service.migration_tenants import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_SHARED_SCHEMAS,
+    MigrationTenants,
+    TenantResult,
+)
 from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.migration_watch import MigrationWatch
+from py_db_migrate.service.replica_lag import ReplicaLagThrottle
 from py_db_migrate.service.start import Start
+from py_db_migrate.service.template_database import TemplateDatabase
 
 
 app = typer.Typer(help="Awesome CLI user manager.")
@@ -34,31 +61,140 @@ def start():
 
 
 @app.command("create")
-def create(name: Annotated[str, typer.Argument(..., help="Name of the SQL files.")]):
+def create(
+    name: Annotated[str, typer.Argument(..., help="Name of the SQL files.")],
+    python: Annotated[
+        bool,
+        typer.Option(
+            help="Create Python files with `async def up(conn)` and "
+            "`async def down(conn)` functions."
+        ),
+    ] = False,
+):
     """Create a new sql file."""
     migration_files: MigrationFiles = MigrationFiles()
     configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
     asyncio.run(
-        migration_files(folder_path=Path(configuration.migration_directory), name=name)
+        migration_files(
+            folder_path=Path(configuration.migration_directory),
+            name=name,
+            python=python,
+        )
     )
 
 
 @app.command("up")
-def migration_up():
+def migration_up(
+    rehearse: Annotated[
+        bool,
+        typer.Option(
+            help="Run the new migration files in a transaction that is rolled "
+            "back and report durations, locks and plans."
+        ),
+    ] = False,
+    profile_statements: Annotated[
+        bool,
+        typer.Option(
+            help="Run the statements one by one and report the slowest ones "
+            "with their wait events."
+        ),
+    ] = False,
+    profile_output: Annotated[
+        Optional[Path],
+        typer.Option(help="Path of the JSON file to write the statement profiles to."),
+    ] = None,
+    max_replica_lag: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Wait before each migration until the replication lag is under "
+            "these seconds."
+        ),
+    ] = None,
+    max_blocked_sessions: Annotated[
+        Optional[int],
+        typer.Option(help="Cancel a migration which blocks more sessions."),
+    ] = None,
+    max_blocking_ms: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Cancel a migration which blocks a session longer than these "
+            "milliseconds."
+        ),
+    ] = None,
+    blocking_retries: Annotated[
+        int,
+        typer.Option(help="The number of times to run a canceled migration again."),
+    ] = RETRIES,
+):
     """Run the new migration files."""
+    if rehearse and (profile_statements or profile_output):
+        logger.critical("--rehearse can't be used with statement profiling.")
+        raise typer.Exit(code=1)
+
     configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
     psql: PSql = PSql(**(configuration.database.model_dump()))
 
     migration_up: MigrationUp = MigrationUp(database=psql)
+    run: Callable[..., Coroutine[Any, Any, Any]] = migration_up
+    options: dict[str, Any] = {}
+    if rehearse:
+        migration_rehearsal: MigrationRehearsal = MigrationRehearsal(database=psql)
+        migration_up, run = migration_rehearsal, migration_rehearsal.rehearse
+    elif profile_statements or profile_output:
+        migration_profiler: MigrationProfiler = MigrationProfiler(database=psql)
+        migration_up, run = migration_profiler, migration_profiler.profile
+        options["output_path"] = profile_output
+    if max_replica_lag is not None:
+        migration_up.throttle = ReplicaLagThrottle(
+            database=PSql(**(configuration.database.model_dump())),
+            max_lag=max_replica_lag,
+            replicas=configuration.replicas,
+        )
+    if max_blocked_sessions is not None or max_blocking_ms is not None:
+        migration_up.watchdog = BlockingWatchdog(
+            database=PSql(**(configuration.database.model_dump())),
+            max_blocked_sessions=max_blocked_sessions,
+            max_blocking_ms=max_blocking_ms,
+            retries=blocking_retries,
+        )
+    try:
+        asyncio.run(
+            run(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                **options,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("watch")
+def migration_watch(
+    interval: Annotated[
+        float,
+        typer.Option(help="Seconds to wait between two checks of the folder."),
+    ] = 0.1,
+):
+    """Run the new migration files whenever the migration folder changes."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_watch: MigrationWatch = MigrationWatch(database=psql)
     try:
         asyncio.run(
-            migration_up(
+            migration_watch(
                 migration_folder=Path(configuration.migration_directory),
                 migration_table="pydbmigration",
+                interval=interval,
             )
         )
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
         logger.critical(str(e))
+        raise typer.Exit(code=1)
 
 
 @app.command("down")
@@ -77,6 +213,356 @@ def migration_down():
         )
     except Exception as e:
         logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("reset")
+def migration_reset(
+    rebuild: Annotated[
+        bool,
+        typer.Option(
+            help="Copy the database again from the template database of the "
+            "migration folder instead of truncating the tables."
+        ),
+    ] = False,
+    yes: Annotated[
+        bool,
+        typer.Option("--yes", help="Reset without asking for confirmation."),
+    ] = False,
+):
+    """Empty all tables of the database except the migration table."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    if not yes:
+        typer.confirm(
+            f"All data in {configuration.database.name} will be deleted. Continue?",
+            abort=True,
+        )
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_reset: MigrationReset = MigrationReset(database=psql)
+    try:
+        asyncio.run(
+            migration_reset(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                rebuild=rebuild,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("verify-roundtrip")
+def migration_roundtrip(
+    workers: Annotated[
+        int,
+        typer.Option(help="The number of disposable databases to verify in."),
+    ] = DEFAULT_WORKERS,
+):
+    """Verify that each migration can be run up, down and up again."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_roundtrip: MigrationRoundtrip = MigrationRoundtrip(database=psql)
+    try:
+        results: list[RoundtripResult] = asyncio.run(
+            migration_roundtrip(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                workers=workers,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+    if not all(result.ok for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command("status")
+def migration_status():
+    """Show which migration files were run and which are pending."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_status: MigrationStatus = MigrationStatus(database=psql)
+    try:
+        asyncio.run(
+            migration_status(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("serve")
+def migration_serve(
+    socket: Annotated[
+        Path,
+        typer.Option(help="Path of the Unix domain socket to listen on."),
+    ] = Path(DEFAULT_SOCKET_PATH),
+):
+    """Serve up, down, status and reset commands over a Unix domain socket."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_server: MigrationServer = MigrationServer(database=psql)
+    try:
+        asyncio.run(
+            migration_server(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                socket_path=socket,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("analyze")
+def migration_analyze(
+    large_table_size: Annotated[
+        int,
+        typer.Option(help="The size in MB from which a table is counted as large."),
+    ] = 1024,
+):
+    """Report the lock impact of the new migration files."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_analyzer: MigrationAnalyzer = MigrationAnalyzer(database=psql)
+    try:
+        asyncio.run(
+            migration_analyzer(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                large_table_size=large_table_size * 1024**2,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("lint")
+def migration_lint(
+    cache: Annotated[
+        Optional[Path],
+        typer.Option(help="Path of the cache file of the lint results."),
+    ] = Path(".py-db-migrate-lint-cache.json"),
+    no_cache: Annotated[
+        bool,
+        typer.Option("--no-cache", help="Lint all files without the cache."),
+    ] = False,
+):
+    """Check the migration files without connecting to the database."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+
+    migration_lint: MigrationLint = MigrationLint()
+    try:
+        issues: list[LintIssue] = asyncio.run(
+            migration_lint(
+                migration_folder=Path(configuration.migration_directory),
+                cache_path=None if no_cache else cache,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+    if any(issue.level == "error" for issue in issues):
+        raise typer.Exit(code=1)
+
+
+@app.command("bundle")
+def migration_bundle(
+    output: Annotated[
+        Path,
+        typer.Option(help="Path of the bundle to write."),
+    ] = Path("migrations.bundle"),
+    folder: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Migration folder to pack. The migration directory of the "
+            "configuration is used by default."
+        ),
+    ] = None,
+):
+    """Pack the migration files into a single indexed bundle.
+
+    Set the bundle as the migration directory to run up, down and status
+    from it.
+    """
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+
+    migration_bundle: MigrationBundle = MigrationBundle()
+    try:
+        asyncio.run(
+            migration_bundle(
+                migration_folder=folder or Path(configuration.migration_directory),
+                bundle_path=output,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("squash")
+def migration_squash(
+    before: Annotated[
+        str,
+        typer.Option(..., help="The name of the first migration that isn't squashed."),
+    ],
+):
+    """Squash the migrations before the given one into a baseline file."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+
+    migration_squash: MigrationSquash = MigrationSquash()
+    try:
+        asyncio.run(
+            migration_squash(
+                migration_folder=Path(configuration.migration_directory),
+                before=before,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("tenants")
+def migration_tenants(
+    pattern: Annotated[
+        Optional[str],
+        typer.Option(help="The LIKE pattern of the tenant schemas."),
+    ] = None,
+    query: Annotated[
+        Optional[str],
+        typer.Option(help="The query which returns the tenant schemas."),
+    ] = None,
+    concurrency: Annotated[
+        int,
+        typer.Option(help="The number of schemas that are migrated at a time."),
+    ] = DEFAULT_CONCURRENCY,
+    shared_schema: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help="A schema after the tenant schema in the search path. "
+            "[default: public]"
+        ),
+    ] = None,
+):
+    """Run the new migration files in each tenant schema.
+
+    The schemas which were migrated with the same migration files before
+    are skipped, so an interrupted run can be started again.
+    """
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_tenants: MigrationTenants = MigrationTenants(database=psql)
+    try:
+        results: list[TenantResult] = asyncio.run(
+            migration_tenants(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                schema_pattern=pattern,
+                schema_query=query,
+                concurrency=concurrency,
+                shared_schemas=(
+                    DEFAULT_SHARED_SCHEMAS
+                    if shared_schema is None
+                    else tuple(shared_schema)
+                ),
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+    if not all(result.ok for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command("template")
+def template_database(
+    create: Annotated[
+        Optional[str],
+        typer.Option(help="The name of a new database to copy from the template."),
+    ] = None,
+):
+    """Migrate a template database once per migration folder content."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    template_database: TemplateDatabase = TemplateDatabase(database=psql)
+
+    async def run() -> None:
+        template: str = await template_database(
+            migration_folder=Path(configuration.migration_directory),
+            migration_table="pydbmigration",
+        )
+        if create:
+            await template_database.create_database(name=create, template=template)
+
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command("mark-applied")
+def migration_mark(
+    names: Annotated[
+        Optional[list[str]],
+        typer.Argument(help="Names of the migrations to record."),
+    ] = None,
+    start: Annotated[
+        Optional[str],
+        typer.Option("--from", help="The first migration of the range to record."),
+    ] = None,
+    end: Annotated[
+        Optional[str],
+        typer.Option(
+            "--to",
+            "--up-to",
+            help="The last migration of the range to record. Without --from, "
+            "every migration up to it is recorded.",
+        ),
+    ] = None,
+    dry_run: Annotated[
+        bool, typer.Option(help="Print the migrations that would be recorded.")
+    ] = False,
+):
+    """Record migrations as applied without running them."""
+    configuration: Configuration = get_configuration(path=CONFIGURATION_FILE_PATH)
+    psql: PSql = PSql(**(configuration.database.model_dump()))
+
+    migration_mark: MigrationMark = MigrationMark(database=psql)
+    try:
+        asyncio.run(
+            migration_mark(
+                migration_folder=Path(configuration.migration_directory),
+                migration_table="pydbmigration",
+                names=tuple(names or ()),
+                start=start,
+                end=end,
+                dry_run=dry_run,
+            )
+        )
+    except Exception as e:
+        logger.critical(str(e))
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+"""Pytest fixtures for the test databases of the applications.
+
+The fixtures are registered as a pytest plugin. Each test gets its own
+database which is copied from the template database of the migration folder,
+so the migrations run once per folder content instead of once per database.
+"""
+import asyncio
+from pathlib import Path
+from typing import Iterator
+from uuid import uuid4
+
+import pytest
+
+from py_db_migrate.configuration import Configuration, get_configuration
+from py_db_migrate.database.postgresql import PSql
+from py_db_migrate.service.template_database import TemplateDatabase
+
+CONFIGURATION_FILE_PATH = Path("./py-db-migration.yaml")
+MIGRATION_TABLE = "pydbmigration"
+
+
+@pytest.fixture(scope="session")
+def py_db_migrate_configuration() -> Configuration:
+    """Return the configuration of the project.
+
+    Override this fixture to use another configuration in the tests.
+    """
+    return get_configuration(path=CONFIGURATION_FILE_PATH)
+
+
+@pytest.fixture(scope="session")
+def py_db_migrate_template(py_db_migrate_configuration: Configuration) -> str:
+    """Return the name of the template database of the migration folder."""
+    template_database: TemplateDatabase = TemplateDatabase(
+        database=PSql(**(py_db_migrate_configuration.database.model_dump()))
+    )
+    return asyncio.run(
+        template_database(
+            migration_folder=Path(py_db_migrate_configuration.migration_directory),
+            migration_table=MIGRATION_TABLE,
+        )
+    )
+
+
+@pytest.fixture
+def migrated_psql(
+    py_db_migrate_configuration: Configuration, py_db_migrate_template: str
+) -> Iterator[PSql]:
+    """Return a PSql of a new migrated database that is dropped after the test."""
+    template_database: TemplateDatabase = TemplateDatabase(
+        database=PSql(**(py_db_migrate_configuration.database.model_dump()))
+    )
+    name: str = f"pydbmigrate_test_{uuid4().hex}"
+    asyncio.run(
+        template_database.create_database(name=name, template=py_db_migrate_template)
+    )
+    try:
+        yield PSql(
+            **(py_db_migrate_configuration.database.model_dump() | {"name": name})
+        )
+    finally:
+        asyncio.run(template_database.drop_database(name=name))
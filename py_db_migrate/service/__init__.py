@@ -20,3 +20,23 @@ class TableNotFoundError(ValueError):
 
 class FolderNotFoundError(ValueError):
     """Raises when the folder couldn't be found."""
+
+
+class DuplicateMigrationError(ValueError):
+    """Raises when a migration has more than one up file."""
+
+
+class BundleError(ValueError):
+    """Raises when the migration bundle is invalid."""
+
+
+class IndexBuildError(ValueError):
+    """Raises when the indexes of a migration can't be built in parallel."""
+
+
+class OnlineRewriteError(ValueError):
+    """Raises when a table can't be rewritten online."""
+
+
+class CheckpointError(ValueError):
+    """Raises when a migration can't be resumed from its checkpoint."""
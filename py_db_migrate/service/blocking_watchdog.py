@@ -0,0 +1,123 @@
+"""Blocking query watchdog service module."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from pydantic import PrivateAttr
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service.service import SqlService
+
+POLL_INTERVAL: float = 0.1
+RETRIES: int = 3
+RETRY_DELAY: float = 10.0
+
+# The sessions which wait for a lock of the backend, or for a lock that the
+# backend waits for ahead of them, and the longest time that they wait since
+# the start of their lock wait.
+BLOCKED_SESSIONS_QUERY: str = (
+    "SELECT count(*) AS blocked, COALESCE(max(EXTRACT(EPOCH FROM "
+    "clock_timestamp() - {wait_start})), 0)::float8 * 1000 AS blocking_ms "
+    "FROM pg_stat_activity a {locks}WHERE $1 = ANY(pg_blocking_pids(a.pid))"
+)
+# pg_locks.waitstart is recorded since PostgreSQL 14. Until it is recorded, and
+# on older servers, the last state change of the session is used instead.
+WAITING_LOCKS: str = (
+    "LEFT JOIN (SELECT pid, min(waitstart) AS waitstart FROM pg_locks "
+    "WHERE NOT granted GROUP BY pid) l ON l.pid = a.pid "
+)
+WAITSTART_VERSION: int = 14
+
+
+class BlockingWatchdog(SqlService):
+    """BlockingWatchdog service class.
+
+    Attributes:
+        max_blocked_sessions: Cancel the migration if it blocks more sessions.
+        max_blocking_ms: Cancel the migration if it blocks a session longer
+            than these milliseconds.
+        retries: The number of times to run a canceled migration again.
+        retry_delay: Seconds to wait before running a canceled migration
+            again.
+        interval: Seconds between two checks.
+    """
+
+    max_blocked_sessions: int | None = None
+    max_blocking_ms: float | None = None
+    retries: int = RETRIES
+    retry_delay: float = RETRY_DELAY
+    interval: float = POLL_INTERVAL
+
+    _reason: str | None = PrivateAttr(default=None)
+
+    @property
+    def reason(self) -> str | None:
+        """Why the watchdog canceled the last watched migration."""
+        return self._reason
+
+    @staticmethod
+    def get_blocked_sessions_query(server_version: int) -> str:
+        """Get the query of the sessions that the backend blocks.
+
+        Arguments:
+            server_version: The major version of the server.
+
+        Returns:
+            The query which takes the process id of the backend.
+        """
+        if server_version < WAITSTART_VERSION:
+            return BLOCKED_SESSIONS_QUERY.format(wait_start="a.state_change", locks="")
+        return BLOCKED_SESSIONS_QUERY.format(
+            wait_start="COALESCE(l.waitstart, a.state_change)", locks=WAITING_LOCKS
+        )
+
+    @asynccontextmanager
+    async def __call__(self, pid: int) -> AsyncIterator[None]:
+        """Watch a migration backend until the context exits.
+
+        The backend is watched on another connection.
+
+        Arguments:
+            pid: The process id of the migration backend.
+
+        Returns:
+            A context manager.
+        """
+        self._reason = None
+        watcher: asyncio.Task = asyncio.create_task(self.watch(pid=pid))
+        try:
+            yield
+        finally:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+
+    async def watch(self, pid: int) -> None:
+        """Cancel the query of the backend once it blocks too much traffic.
+
+        Arguments:
+            pid: The process id of the migration backend.
+
+        Returns:
+            None.
+        """
+        max_blocked: int | None = self.max_blocked_sessions
+        max_ms: float | None = self.max_blocking_ms
+        database: Sql = self.database.clone()
+        async with database.session() as connection:
+            query: str = self.get_blocked_sessions_query(
+                server_version=connection.get_server_version().major
+            )
+            while self._reason is None:
+                await asyncio.sleep(self.interval)
+                record = await connection.fetchrow(query, pid)
+                blocked: int = record["blocked"]
+                if max_blocked is not None and blocked > max_blocked:
+                    self._reason = f"it blocked {blocked} sessions"
+                elif max_ms is not None and blocked and record["blocking_ms"] > max_ms:
+                    self._reason = (
+                        f"it blocked a session for {record['blocking_ms']:.0f} ms"
+                    )
+                else:
+                    continue
+                await connection.execute("SELECT pg_cancel_backend($1)", pid)
+                self.logger.warning(f"The migration is canceled since {self._reason}.")
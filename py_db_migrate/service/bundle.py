@@ -0,0 +1,225 @@
+"""Migration bundle format module.
+
+A bundle packs the files of a migration folder into a single file:
+
+    magic (8 bytes) | index length (8 bytes, little endian) | index | data
+
+The index is a JSON object whose `files` are sorted by name and hold the
+offset of the file in the data section, its size and its SHA-256 checksum.
+The files are stored as they are in the folder, so compressed files stay
+compressed.
+"""
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from hashlib import sha256
+from pathlib import Path
+from typing import BinaryIO
+
+from py_db_migrate.service import BundleError
+
+BUNDLE_MAGIC: bytes = b"PYDBMB\x00\x01"
+BUNDLE_HEADER: struct.Struct = struct.Struct("<8sQ")
+BUNDLE_VERSION: int = 1
+# The size of the chunks that the files are read and copied in, so a file
+# is never loaded into memory as a whole.
+BUNDLE_CHUNK_SIZE: int = 1024**2
+
+
+class MigrationBundleReader:
+    """Reader of a migration bundle.
+
+    The bundle is memory mapped, so only the index and the pages of the
+    files that are read are loaded from the disk.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map the bundle and read its index.
+
+        Arguments:
+            path: Path of the bundle.
+
+        Raises:
+            BundleError: If the file isn't a valid bundle.
+        """
+        self.path: Path = path
+        with open(path, mode="rb") as file:
+            self.stat: os.stat_result = os.fstat(file.fileno())
+            if self.stat.st_size < BUNDLE_HEADER.size:
+                raise BundleError(f"{path} isn't a migration bundle.")
+            self._map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_size = BUNDLE_HEADER.unpack_from(self._map)
+        if magic != BUNDLE_MAGIC:
+            self._map.close()
+            raise BundleError(f"{path} isn't a migration bundle.")
+        index_start: int = BUNDLE_HEADER.size
+        index_end: int = index_start + index_size
+        self._data_offset: int = index_end
+        try:
+            index: dict = json.loads(self._map[index_start:index_end])
+        except ValueError as e:
+            self._map.close()
+            raise BundleError(f"Index of {path} is corrupted.") from e
+        if index.get("version") != BUNDLE_VERSION:
+            self._map.close()
+            raise BundleError(f"{path} is written by another version.")
+
+        entries: list[list] = index["files"]
+        self.names: list[str] = [entry[0] for entry in entries]
+        self._entries: list[list] = entries
+
+    def find(self, name: str) -> int | None:
+        """Find the position of a file in the index by a binary search.
+
+        Arguments:
+            name: The name of the file with its extension.
+
+        Returns:
+            The position of the file, or None if it isn't in the bundle.
+        """
+        position: int = bisect_left(self.names, name)
+        if position < len(self.names) and self.names[position] == name:
+            return position
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        """Check whether the bundle has the given file."""
+        return self.find(name) is not None
+
+    def read(self, name: str) -> bytes:
+        """Read the contents of a file of the bundle.
+
+        Arguments:
+            name: The name of the file with its extension.
+
+        Returns:
+            The contents of the file as they are in the folder.
+
+        Raises:
+            FileNotFoundError: If the bundle doesn't have the file.
+            BundleError: If the checksum of the file doesn't match.
+        """
+        position: int | None = self.find(name)
+        if position is None:
+            raise FileNotFoundError(f"{name} couldn't be found in {self.path}.")
+        _, offset, size, checksum = self._entries[position]
+        start: int = self._data_offset + offset
+        end: int = start + size
+        contents: bytes = self._map[start:end]
+        if sha256(contents).hexdigest() != checksum:
+            raise BundleError(f"Checksum of {name} in {self.path} doesn't match.")
+        return contents
+
+    def close(self) -> None:
+        """Unmap the bundle."""
+        self._map.close()
+
+
+_readers: dict[Path, MigrationBundleReader] = {}
+
+
+def is_migration_bundle(path: Path) -> bool:
+    """Check whether the migration folder path points to a bundle.
+
+    Arguments:
+        path: Migration folder path.
+
+    Returns:
+        True if it is a file. Otherwise, False.
+    """
+    return path.is_file()
+
+
+def get_migration_bundle(path: Path) -> MigrationBundleReader:
+    """Get the reader of a bundle.
+
+    The readers are cached and a reader is opened again only if the bundle
+    is replaced or changed.
+
+    Arguments:
+        path: Path of the bundle.
+
+    Returns:
+        The reader of the bundle.
+
+    Raises:
+        BundleError: If the file isn't a valid bundle.
+    """
+    stat: os.stat_result = os.stat(path)
+    reader: MigrationBundleReader | None = _readers.get(path)
+    if reader is not None and (
+        reader.stat.st_ino,
+        reader.stat.st_mtime_ns,
+        reader.stat.st_size,
+    ) == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+        return reader
+    if reader is not None:
+        reader.close()
+    reader = MigrationBundleReader(path)
+    _readers[path] = reader
+    return reader
+
+
+def copy_file(path: Path, target: BinaryIO | None = None) -> tuple[int, str]:
+    """Read a file in chunks and copy it into the target if it is given.
+
+    Arguments:
+        path: Path of the file.
+        target: The file to write the chunks into.
+
+    Returns:
+        The size of the file and its SHA-256 checksum in hex format.
+    """
+    checksum = sha256()
+    size: int = 0
+    with open(path, mode="rb") as source:
+        while chunk := source.read(BUNDLE_CHUNK_SIZE):
+            checksum.update(chunk)
+            size += len(chunk)
+            if target is not None:
+                target.write(chunk)
+    return size, checksum.hexdigest()
+
+
+def write_migration_bundle(path: Path, folder: Path, names: list[str]) -> None:
+    """Write the given files of a folder into a bundle.
+
+    The files are read twice in chunks, first for the index and then to be
+    copied after it. So, only a chunk of a file is held in memory at a time.
+    The bundle is written next to the given path and moved onto it at the
+    end, so a running reader never sees a partly written bundle.
+
+    Arguments:
+        path: Path of the bundle.
+        folder: The folder of the files.
+        names: The names of the files with their extensions.
+
+    Returns:
+        None.
+
+    Raises:
+        BundleError: If a file is changed while the bundle is written.
+    """
+    entries: list[list] = []
+    offset: int = 0
+    for name in sorted(names):
+        size, checksum = copy_file(folder / name)
+        entries.append([name, offset, size, checksum])
+        offset += size
+    index: bytes = json.dumps({"version": BUNDLE_VERSION, "files": entries}).encode()
+
+    temporary_path: Path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(temporary_path, mode="wb") as file:
+            file.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, len(index)))
+            file.write(index)
+            for name, _, size, checksum in entries:
+                if copy_file(folder / name, target=file) != (size, checksum):
+                    raise BundleError(f"{name} is changed while it is bundled.")
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, path)
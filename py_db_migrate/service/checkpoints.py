@@ -0,0 +1,129 @@
+"""Checkpointed migration execution service module."""
+import hashlib
+from datetime import datetime, timezone
+
+from asyncpg.exceptions import ActiveSQLTransactionError
+from pydantic import validate_call
+from pypika import Query, Table
+
+from py_db_migrate.service import CheckpointError, EmptyFileError
+from py_db_migrate.service.replica_lag import ReplicaLagThrottle
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.sql_parser import SqlStatement, split_sql_statements
+from py_db_migrate.service.utils import quote_identifier
+
+CHECKPOINT_QUERY: str = (
+    "INSERT INTO {table} (name, checksum, statements) VALUES ($1, $2, $3) "
+    "ON CONFLICT (name) DO UPDATE SET statements = EXCLUDED.statements, "
+    "date = NOW() WHERE {table}.checksum = EXCLUDED.checksum"
+)
+
+
+def get_contents_checksum(contents: str) -> str:
+    """Get the checksum of the contents of a migration file.
+
+    Arguments:
+        contents: The contents of the file.
+
+    Returns:
+        The SHA-256 checksum in hex.
+    """
+    return hashlib.sha256(contents.encode()).hexdigest()
+
+
+class CheckpointedExecutor(SqlService):
+    """CheckpointedExecutor service class.
+
+    Attributes:
+        throttle: Waits for the replicas before each statement if it is given.
+    """
+
+    throttle: ReplicaLagThrottle | None = None
+
+    @validate_call
+    async def __call__(
+        self, migration_file: str, migration_table: str, contents: str
+    ) -> int:
+        """Run the statements of a file one by one and resume where it stopped.
+
+        Each statement is committed with its checkpoint in the checkpoint
+        table. A statement which can't run in a transaction block is run
+        by itself and its checkpoint is recorded right after it. When the
+        file is run again, the statements before the checkpoint are skipped
+        if the file is unchanged. Lastly, the file is recorded in the
+        migration table and its checkpoint is deleted in a transaction.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: SQL commands of the migration file.
+
+        Returns:
+            The number of the statements that are run.
+
+        Raises:
+            EmptyFileError: When the file doesn't include any SQL command.
+            CheckpointError: If the file is changed after some of its
+                statements were run.
+        """
+        statements: list[SqlStatement] = split_sql_statements(contents)
+        if not statements:
+            raise EmptyFileError(f"{migration_file} doesn't include any command.")
+
+        checksum: str = get_contents_checksum(contents)
+        table: str = quote_identifier(f"{migration_table}_checkpoints")
+        checkpoint_query: str = CHECKPOINT_QUERY.format(table=table)
+        async with self.database.session() as connection:
+            await connection.execute(  # nosec
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "name TEXT PRIMARY KEY, "
+                "checksum TEXT NOT NULL, "
+                "statements INTEGER NOT NULL, "
+                "date TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW())"
+            )
+            checkpoint = await connection.fetchrow(  # nosec
+                f"SELECT checksum, statements FROM {table} WHERE name = $1",
+                migration_file,
+            )
+            start: int = 0
+            if checkpoint is not None:
+                if checkpoint["checksum"] != checksum:
+                    raise CheckpointError(
+                        f"{migration_file} is changed after {checkpoint['statements']} "
+                        "of its statements were run. Restore the file, or undo "
+                        f"them and delete its row from {table}."
+                    )
+                start = checkpoint["statements"]
+                self.logger.info(
+                    f"{migration_file} is resumed from line "
+                    f"{statements[min(start, len(statements) - 1)].line}."
+                )
+
+            for position in range(start, len(statements)):
+                statement: SqlStatement = statements[position]
+                if self.throttle is not None:
+                    await self.throttle(before=f"{migration_file}:{statement.line}")
+                try:
+                    async with self.database() as transaction:
+                        await transaction.execute(statement.query)
+                        await transaction.execute(
+                            checkpoint_query, migration_file, checksum, position + 1
+                        )
+                except ActiveSQLTransactionError:
+                    await connection.execute(statement.query)
+                    await connection.execute(
+                        checkpoint_query, migration_file, checksum, position + 1
+                    )
+
+            async with self.database() as transaction:
+                await transaction.execute(
+                    str(
+                        Query.into(Table(migration_table))
+                        .columns("date", "name")
+                        .insert(datetime.now(tz=timezone.utc), migration_file)
+                    )
+                )
+                await transaction.execute(  # nosec
+                    f"DELETE FROM {table} WHERE name = $1", migration_file
+                )
+        return len(statements) - start
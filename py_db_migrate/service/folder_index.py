@@ -0,0 +1,45 @@
+"""Migration folder index service module."""
+from pathlib import Path
+
+import aiofiles.os
+from pydantic import PrivateAttr, validate_call
+
+from py_db_migrate.service.service import Service
+from py_db_migrate.service.utils import get_migration_file_names
+
+
+class MigrationFolderIndex(Service):
+    """MigrationFolderIndex service class.
+
+    The names of the migration files are cached for each folder until the
+    folder changes.
+    """
+
+    _entries: dict[Path, tuple[tuple[int, int, int], tuple[str, ...]]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    @validate_call
+    async def __call__(self, folder: Path) -> tuple[str, ...]:
+        """Get the names of the up migration files of the folder.
+
+        The folder is scanned again only if its modification time, size or
+        inode is changed. Adding, removing or renaming a file changes the
+        modification time of its folder, and writing a bundle changes the
+        modification time of the bundle.
+
+        Arguments:
+            folder: Folder or bundle to search migration files.
+
+        Returns:
+            The sorted names of the up migration files without their extension.
+        """
+        stat = await aiofiles.os.stat(folder)
+        version: tuple[int, int, int] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        entry = self._entries.get(folder)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        names: tuple[str, ...] = await get_migration_file_names(folder=folder)
+        self._entries[folder] = (version, names)
+        return names
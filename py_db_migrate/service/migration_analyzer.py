@@ -0,0 +1,250 @@
+"""Migration analyzer service module."""
+from pathlib import Path
+
+from pydantic import BaseModel, validate_call
+
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.utils import (
+    get_migration_file_path,
+    quote_table_name,
+    stream_sql_statements,
+)
+from py_db_migrate.service.sql_parser import (
+    LockLevel,
+    StatementImpact,
+    classify_statement,
+)
+
+LOCK_WEIGHTS: dict[LockLevel, int] = {
+    LockLevel.NONE: 0,
+    LockLevel.ACCESS_SHARE: 0,
+    LockLevel.ROW_SHARE: 0,
+    LockLevel.ROW_EXCLUSIVE: 1,
+    LockLevel.SHARE_UPDATE_EXCLUSIVE: 1,
+    LockLevel.SHARE: 10,
+    LockLevel.SHARE_ROW_EXCLUSIVE: 10,
+    LockLevel.EXCLUSIVE: 10,
+    LockLevel.ACCESS_EXCLUSIVE: 100,
+}
+
+
+class TableSize(BaseModel):
+    """TableSize model.
+
+    Attributes:
+        rows: Estimated row count of the table from pg_class.
+        size: Total size of the table with its indexes in bytes.
+    """
+
+    rows: int = 0
+    size: int = 0
+
+
+class StatementRisk(BaseModel):
+    """StatementRisk model.
+
+    Attributes:
+        migration_file: The name of the migration file of the statement.
+        impact: The static classification of the statement.
+        rows: Estimated row count of the touched tables.
+        size: Total size of the touched tables in bytes.
+        score: Risk score of the statement used for ranking.
+        level: Risk level of the statement. (HIGH, MEDIUM or LOW)
+    """
+
+    migration_file: str
+    impact: StatementImpact
+    rows: int
+    size: int
+    score: float
+    level: str
+
+
+def format_size(size: int) -> str:
+    """Format the given size in bytes in a human readable way.
+
+    Arguments:
+        size: Size in bytes.
+
+    Returns:
+        The formatted size.
+    """
+    value: float = float(size)
+    for unit in ("B", "kB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+class MigrationAnalyzer(SqlService):
+    """MigrationAnalyzer service class."""
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_folder: Path,
+        migration_table: str,
+        large_table_size: int = 1024**3,
+    ) -> list[StatementRisk]:
+        """Analyze the lock impact of the pending migrations.
+
+        Firstly, find the pending migration files without creating the
+        migration table and split the SQL and the compressed SQL files into
+        statements. Then, classify each statement by its lock level and
+        rewrite risk, and join the touched tables with their live size
+        estimates. Lastly, rank the statements by their risk score.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            large_table_size: The size in bytes from which a table is large.
+
+        Returns:
+            The risks of the pending statements from the riskiest one.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+        """
+        migration_up: MigrationUp = MigrationUp(database=self.database)
+        migration_files: tuple[
+            str, ...
+        ] = await migration_up.get_pending_migration_files(
+            migration_folder=migration_folder,
+            migration_table=migration_table,
+            create_table=False,
+        )
+
+        impacts: list[tuple[str, StatementImpact]] = []
+        for migration_file in migration_files:
+            path: Path = await get_migration_file_path(
+                folder=migration_folder, name=migration_file
+            )
+            if path.suffix == ".py":
+                self.logger.warning(f"{migration_file} is not SQL, it is skipped.")
+                continue
+            async for statement in stream_sql_statements(path=path):
+                impacts.append((migration_file, classify_statement(statement)))
+
+        table_sizes: dict[str, TableSize] = await self.get_table_sizes(
+            tables=sorted({table for _, impact in impacts for table in impact.tables})
+        )
+
+        risks: list[StatementRisk] = [
+            self.get_statement_risk(
+                migration_file=migration_file,
+                impact=impact,
+                table_sizes=table_sizes,
+                large_table_size=large_table_size,
+            )
+            for migration_file, impact in impacts
+        ]
+        risks.sort(key=lambda risk: risk.score, reverse=True)
+        for risk in risks:
+            self.log_risk(risk)
+        return risks
+
+    @validate_call
+    async def get_table_sizes(self, tables: list[str]) -> dict[str, TableSize]:
+        """Get row and size estimates of the given tables from pg_class.
+
+        Tables that don't exist yet, such as the ones created by a pending
+        migration, are not included in the result.
+
+        Arguments:
+            tables: Names of the tables which may be schema qualified.
+
+        Returns:
+            The estimates by the name of the table.
+        """
+        if not tables:
+            return {}
+
+        names: str = ", ".join(quote_table_name(table) for table in tables)
+        query_result: list[dict[str, int]] = await self.database.fetch(  # nosec
+            "SELECT t.ordinality, "
+            "greatest(c.reltuples, 0)::bigint AS rows, "
+            "pg_total_relation_size(c.oid) AS size "
+            f"FROM unnest(ARRAY[{names}]::text[]) WITH ORDINALITY AS t(name) "
+            "JOIN pg_class c ON c.oid = to_regclass(t.name)"
+        )
+        return {
+            tables[row["ordinality"] - 1]: TableSize(rows=row["rows"], size=row["size"])
+            for row in query_result
+        }
+
+    @staticmethod
+    @validate_call
+    def get_statement_risk(
+        migration_file: str,
+        impact: StatementImpact,
+        table_sizes: dict[str, TableSize],
+        large_table_size: int,
+    ) -> StatementRisk:
+        """Score the risk of a statement by its lock and the table sizes.
+
+        Statements which block writes on a large table are HIGH if they also
+        rewrite or scan the table, or if they block reads. The other
+        statements which block writes are MEDIUM.
+
+        Arguments:
+            migration_file: The name of the migration file of the statement.
+            impact: The static classification of the statement.
+            table_sizes: The estimates of the existing tables.
+            large_table_size: The size in bytes from which a table is large.
+
+        Returns:
+            The risk of the statement.
+        """
+        sizes: list[TableSize] = [
+            table_sizes.get(table, TableSize()) for table in impact.tables
+        ]
+        rows: int = sum(size.rows for size in sizes)
+        size: int = sum(size.size for size in sizes)
+        heavy: bool = impact.rewrite or impact.scan
+
+        score: float = (
+            LOCK_WEIGHTS[impact.lock] * (1 + size / 1024**2) * (10 if heavy else 1)
+        )
+
+        blocks_writes: bool = impact.lock >= LockLevel.SHARE
+        large: bool = size >= large_table_size
+        exclusive: bool = impact.lock == LockLevel.ACCESS_EXCLUSIVE
+        level: str = "LOW"
+        if blocks_writes and large and (heavy or exclusive):
+            level = "HIGH"
+        elif blocks_writes or (heavy and large):
+            level = "MEDIUM"
+
+        return StatementRisk(
+            migration_file=migration_file,
+            impact=impact,
+            rows=rows,
+            size=size,
+            score=score,
+            level=level,
+        )
+
+    def log_risk(self, risk: StatementRisk) -> None:
+        """Log the risk of a statement as a line of the report.
+
+        Arguments:
+            risk: The risk to log.
+
+        Returns:
+            None.
+        """
+        impact: StatementImpact = risk.impact
+        effects: list[str] = [impact.lock.label]
+        if impact.rewrite:
+            effects.append("rewrite")
+        if impact.scan:
+            effects.append("scan")
+        tables: str = ", ".join(impact.tables) or "-"
+        self.logger.info(
+            f"{risk.level:<6} {' + '.join(effects)} on {tables} "
+            f"({format_size(risk.size)}, ~{risk.rows} rows) "
+            f"{risk.migration_file}:{impact.statement.line} "
+            f"`{impact.statement.query.splitlines()[0]}`"
+        )
@@ -0,0 +1,52 @@
+"""Migration bundle service module."""
+import asyncio
+from pathlib import Path
+
+import aiofiles.os
+from pydantic import validate_call
+
+from py_db_migrate.service import FolderNotFoundError
+from py_db_migrate.service.bundle import write_migration_bundle
+from py_db_migrate.service.service import Service
+from py_db_migrate.service.utils import get_migration_file_entries
+
+
+class MigrationBundle(Service):
+    """MigrationBundle service class."""
+
+    @validate_call
+    async def __call__(self, migration_folder: Path, bundle_path: Path) -> list[str]:
+        """Pack the migration files of the folder into a single bundle.
+
+        The bundle can be used as the migration directory of `up`, `down` and
+        `status`. Then, only the index of the bundle and the files that are
+        run are read instead of scanning and opening the whole folder. The
+        files are copied in chunks, so large seed files aren't loaded into
+        memory.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            bundle_path: Path of the bundle to write.
+
+        Returns:
+            The names of the bundled files.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+            BundleError: If a file is changed while the bundle is written.
+        """
+        if not await aiofiles.os.path.isdir(migration_folder):
+            raise FolderNotFoundError(
+                f"Migration folder {migration_folder} couldn't be found."
+            )
+
+        names: list[str] = await get_migration_file_entries(folder=migration_folder)
+        await asyncio.to_thread(
+            write_migration_bundle,
+            path=bundle_path,
+            folder=migration_folder,
+            names=names,
+        )
+
+        self.logger.info(f"{len(names)} files are bundled into {bundle_path}.")
+        return names
@@ -1,17 +1,21 @@
 """Migration down service module."""
 from pathlib import Path
 
-import aiofiles
-import aiofiles.os
 from pydantic import validate_call
 from pypika import Order, Query, Table
 
+from py_db_migrate.database.postgresql import retry_transient
 from py_db_migrate.service import EmptyFileError
 from py_db_migrate.service.migration_validator import (
     MigrationTableAndFolderValidator,
 )
 from py_db_migrate.service.service import SqlService
-from py_db_migrate.service.utils import check_existence_of_file
+from py_db_migrate.service.utils import (
+    execute_compressed_migration_file,
+    get_migration_file_path,
+    get_python_migration_function,
+    read_migration_file_contents,
+)
 
 
 class EmptyTableError(ValueError):
@@ -22,7 +26,7 @@ class MigrationDown(SqlService):
     """Migration service class."""
 
     @validate_call
-    async def __call__(self, migration_folder: Path, migration_table: str) -> None:
+    async def __call__(self, migration_folder: Path, migration_table: str) -> str:
         """Delete the latest migration.
 
         Firstly, check whether the migration folder and migration table
@@ -36,7 +40,7 @@ class MigrationDown(SqlService):
             migration_table: The name of the table that holds migrated files.
 
         Returns:
-            None.
+            The name of the down file that is run.
 
         Raises:
             FolderNotFoundError: If the migration folder doesn't exist.
@@ -54,18 +58,14 @@ class MigrationDown(SqlService):
             migration_table=migration_table,
         )
 
-        migration_down_file: str = (
-            await self._get_down_file_of_the_latest_migrated_file(
+        migration_down_file: str = await retry_transient(
+            lambda: self._get_down_file_of_the_latest_migrated_file(
                 migration_table=migration_table
-            )
+            ),
+            can_retry=self.database.can_retry,
         )
 
-        if not (
-            await check_existence_of_file(
-                migration_folder / f"{migration_down_file}.sql"
-            )
-        ):
-            raise FileNotFoundError(f"{migration_down_file} couldn't be found.")
+        await get_migration_file_path(folder=migration_folder, name=migration_down_file)
 
         await self.migrate_down(
             migration_folder=migration_folder,
@@ -73,6 +73,7 @@ class MigrationDown(SqlService):
             migration_table=migration_table,
         )
         self.logger.info(f"{migration_down_file} is running.")
+        return migration_down_file
 
     @validate_call
     async def _get_down_file_of_the_latest_migrated_file(
@@ -113,7 +114,9 @@ class MigrationDown(SqlService):
     ) -> None:
         """Down the migration of the given file.
 
-        Firstly, try to execute the given -down.sql commands and then delete
+        Firstly, try to execute the given -down.sql commands, the statements
+        of a compressed down file one by one, or the `down` function of a
+        -down.py file with the connection, and then delete
         the name of the latest migrated file from migration table. Transaction
         is used for canceling if something goes wrong.
 
@@ -130,19 +133,37 @@ class MigrationDown(SqlService):
             EmptyFileError: When the file doesn't include any SQL command.
         """
         migration_tb: Table = Table(migration_table)
-        async with aiofiles.open(
-            file=migration_folder / f"{migration_file}.sql",
-            mode="r",
-        ) as file:
-            contents = await file.read()
-            try:
-                async with self.database() as connection:
-                    await connection.execute(contents)
-                    query = (
+        path: Path = await get_migration_file_path(
+            folder=migration_folder, name=migration_file
+        )
+        if path.suffix != ".sql":
+            async with self.database() as connection:
+                if path.suffix == ".py":
+                    await get_python_migration_function(path=path, name="down")(
+                        connection
+                    )
+                else:
+                    await execute_compressed_migration_file(
+                        connection=connection, migration_file=migration_file, path=path
+                    )
+                await connection.execute(
+                    str(
                         Query.from_(migration_tb)
                         .delete()
                         .where(migration_tb.name == f"{migration_file[:-4]}up")
                     )
-                    await connection.execute(str(query))
-            except AttributeError as e:
-                raise EmptyFileError from e
+                )
+            return
+
+        contents: str = await read_migration_file_contents(path=path)
+        try:
+            async with self.database() as connection:
+                await connection.execute(contents)
+                query = (
+                    Query.from_(migration_tb)
+                    .delete()
+                    .where(migration_tb.name == f"{migration_file[:-4]}up")
+                )
+                await connection.execute(str(query))
+        except AttributeError as e:
+            raise EmptyFileError from e
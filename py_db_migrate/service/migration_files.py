@@ -10,12 +10,24 @@ from py_db_migrate.service.service import Service
 
 from py_db_migrate.service.utils import check_existence_of_file
 
+SQL_PLACEHOLDER: str = "/* Insert your SQL commands here. */"
+
+PYTHON_TEMPLATES: dict[str, str] = {
+    direction: f'"""Migrate {direction}."""\n'
+    "from py_db_migrate.service import EmptyFileError\n\n\n"
+    f"async def {direction}(conn):\n"
+    '    raise EmptyFileError("Insert your migration here.")\n'
+    for direction in ("up", "down")
+}
+
 
 class MigrationFiles(Service):
     """MigrationFiles class."""
 
     @validate_call
-    async def __call__(self, folder_path: Path, name: str) -> None:
+    async def __call__(
+        self, folder_path: Path, name: str, python: bool = False
+    ) -> None:
         """Run the main logic of the class.
 
         After finding the formatted name, insert two sql files by adding
@@ -24,6 +36,7 @@ class MigrationFiles(Service):
         Arguments:
             folder_path: Folder to add new files.
             name: Name of the migration files to create.
+            python: Create `-up.py` and `-down.py` files instead.
 
         Returns:
             None.
@@ -34,24 +47,33 @@ class MigrationFiles(Service):
             await self.create_migration_folder(path=folder_path)
             self.logger.info(f"{folder_path} folder is created.")
 
-        await self.add_migration_files(folder_path=folder_path, name=formatted_name)
+        await self.add_migration_files(
+            folder_path=folder_path, name=formatted_name, python=python
+        )
         self.logger.info("New migration files are added.")
 
     @staticmethod
     @validate_call
-    async def add_migration_files(folder_path: Path, name: str) -> None:
+    async def add_migration_files(
+        folder_path: Path, name: str, python: bool = False
+    ) -> None:
         """Add migration files to the given folder.
 
         Arguments:
             folder_path: Folder to add new files.
             name: Name of the migration files to create.
+            python: Add Python files with `up` and `down` functions.
 
         Returns:
             None.
         """
-        for new_file_name in (f"{name}-up.sql", f"{name}-down.sql"):
+        for direction in ("up", "down"):
+            extension: str = "py" if python else "sql"
+            new_file_name: str = f"{name}-{direction}.{extension}"
             async with open(file=folder_path.joinpath(new_file_name), mode="w") as file:
-                await file.write("/* Insert your SQL commands here. */")
+                await file.write(
+                    PYTHON_TEMPLATES[direction] if python else SQL_PLACEHOLDER
+                )
 
     @staticmethod
     @validate_call
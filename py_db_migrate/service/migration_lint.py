@@ -0,0 +1,438 @@
+"""Migration lint service module."""
+import ast
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from importlib.util import find_spec
+from pathlib import Path
+
+import aiofiles
+from pydantic import BaseModel, validate_call
+
+from py_db_migrate.service import FolderNotFoundError
+from py_db_migrate.service.migration_files import SQL_PLACEHOLDER
+from py_db_migrate.service.service import Service
+from py_db_migrate.service.sql_parser import (
+    LockLevel,
+    SqlStatement,
+    StatementImpact,
+    classify_statement,
+    find_syntax_errors,
+    get_created_table,
+    get_directives,
+    split_sql_statements,
+)
+from py_db_migrate.service.utils import (
+    check_existence_of_file,
+    get_migration_file_names,
+    get_migration_file_path,
+)
+
+LINT_CACHE_VERSION: int = 1
+POOL_THRESHOLD: int = 256
+DEFAULT_WORKERS: int = os.cpu_count() or 1
+
+Problem = tuple[int | None, str, str]
+
+
+class LintIssue(BaseModel):
+    """LintIssue model.
+
+    Attributes:
+        file: The name of the migration file.
+        line: The line number of the issue. None if it is about the file.
+        level: The level of the issue. (error or warning)
+        message: The description of the issue.
+    """
+
+    file: str
+    line: int | None = None
+    level: str
+    message: str
+
+
+def find_dangerous_statements(statements: list[SqlStatement]) -> list[Problem]:
+    """Find the statements which hold long locks on existing tables or delete data.
+
+    The tables which are created in the same file are not counted as
+    existing tables.
+
+    Arguments:
+        statements: The statements of a migration file.
+
+    Returns:
+        The warnings of the statements.
+    """
+    problems: list[Problem] = []
+    created_tables: set[str] = set()
+    for statement in statements:
+        if created_table := get_created_table(statement):
+            created_tables.add(created_table)
+            continue
+
+        impact: StatementImpact = classify_statement(statement)
+        tables: list[str] = [
+            table for table in impact.tables if table not in created_tables
+        ]
+        keyword: str = statement.keyword
+        message: str | None = None
+        if tables and impact.lock >= LockLevel.SHARE and impact.rewrite:
+            message = f"{impact.lock.label} lock while rewriting {tables[0]}."
+        elif tables and impact.lock >= LockLevel.SHARE and impact.scan:
+            message = f"{impact.lock.label} lock while scanning {tables[0]}."
+            if keyword == "CREATE":
+                message += " Use CREATE INDEX CONCURRENTLY."
+        elif keyword == "TRUNCATE" or re.match(
+            r"DROP\s+(?:TABLE|MATERIALIZED\s+VIEW)\b", statement.query, re.IGNORECASE
+        ):
+            message = "The statement deletes the data of a table."
+        elif keyword == "ALTER" and re.search(
+            r"\bDROP\s+COLUMN\b", statement.query, re.IGNORECASE
+        ):
+            message = "The statement deletes the data of a column."
+        elif keyword in ("UPDATE", "DELETE") and not re.search(
+            r"\bWHERE\b", statement.query, re.IGNORECASE
+        ):
+            message = f"{keyword} without WHERE changes every row."
+        if message:
+            problems.append((statement.line, "warning", message))
+    return problems
+
+
+def get_syntax_backend() -> str:
+    """Get the name of the checker of the syntax of SQL files.
+
+    Returns:
+        `pglast` if it is installed, otherwise `builtin`.
+    """
+    return "pglast" if find_spec("pglast") is not None else "builtin"
+
+
+def lint_sql(contents: str) -> list[Problem]:
+    """Lint the contents of a SQL migration file.
+
+    If pglast is installed, the statements are checked by the parser of
+    PostgreSQL only. Otherwise, the checks of `find_syntax_errors` are used.
+
+    Arguments:
+        contents: The contents of the file.
+
+    Returns:
+        The problems of the file.
+    """
+    if contents.strip() == SQL_PLACEHOLDER:
+        return [(None, "error", "The file still has the placeholder comment.")]
+
+    syntax_errors: list[tuple[int, str]]
+    try:
+        import pglast
+    except ImportError:
+        syntax_errors = find_syntax_errors(contents)
+    else:
+        try:
+            pglast.parse_sql(contents)
+        except pglast.parser.ParseError as e:
+            syntax_errors = [(contents.count("\n", 0, e.location) + 1, str(e))]
+        else:
+            syntax_errors = []
+    if syntax_errors:
+        return [(line, "error", message) for line, message in syntax_errors]
+
+    statements: list[SqlStatement] = split_sql_statements(contents)
+    if not statements:
+        return [(None, "error", "The file doesn't include any SQL command.")]
+    if "online-rewrite" in get_directives(contents):
+        # The statements alter a copy of the table which isn't in use.
+        return []
+    return find_dangerous_statements(statements)
+
+
+def lint_python(name: str, contents: str) -> list[Problem]:
+    """Lint the contents of a Python migration file.
+
+    Arguments:
+        name: The name of the file.
+        contents: The contents of the file.
+
+    Returns:
+        The problems of the file.
+    """
+    try:
+        module: ast.Module = ast.parse(contents, filename=name)
+    except SyntaxError as e:
+        return [(e.lineno, "error", f"Syntax error. {e.msg}")]
+
+    function: str = "down" if name.endswith("-down.py") else "up"
+    definition: ast.AsyncFunctionDef | None = next(
+        (
+            node
+            for node in module.body
+            if isinstance(node, ast.AsyncFunctionDef) and node.name == function
+        ),
+        None,
+    )
+    if definition is None:
+        return [(None, "error", f"The file doesn't define `async def {function}`.")]
+    if is_placeholder_function(definition):
+        return [(None, "error", "The file still raises the placeholder error.")]
+    return []
+
+
+def is_placeholder_function(definition: ast.AsyncFunctionDef) -> bool:
+    """Check whether the function only raises the error of the template.
+
+    The Python templates of `create` raise `EmptyFileError` until the
+    migration is written.
+
+    Arguments:
+        definition: The definition of the up or down function.
+
+    Returns:
+        True if the function only raises `EmptyFileError`.
+    """
+    body: list[ast.stmt] = [
+        node
+        for node in definition.body
+        if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant))
+    ]
+    if len(body) != 1 or not isinstance(body[0], ast.Raise):
+        return False
+    error: ast.expr | None = body[0].exc
+    if isinstance(error, ast.Call):
+        error = error.func
+    return (isinstance(error, ast.Name) and error.id == "EmptyFileError") or (
+        isinstance(error, ast.Attribute) and error.attr == "EmptyFileError"
+    )
+
+
+def read_file(path: Path, backend: str) -> tuple[str, str]:
+    """Read a migration file and get its key in the cache.
+
+    Arguments:
+        path: Path of the file.
+        backend: The name of the syntax checker.
+
+    Returns:
+        The contents of the file and the SHA-256 checksum of the syntax
+        checker, the name and the contents.
+    """
+    contents: str = path.read_text()
+    key: str = sha256(f"{backend}\0{path.name}\0{contents}".encode()).hexdigest()
+    return contents, key
+
+
+def lint_files(files: list[tuple[str, str]]) -> list[list[Problem]]:
+    """Lint the given migration files.
+
+    It is run in the worker processes, so it only takes and returns plain
+    objects.
+
+    Arguments:
+        files: The names and the contents of the files.
+
+    Returns:
+        The problems of each file in the same order.
+    """
+    return [
+        lint_python(name, contents) if name.endswith(".py") else lint_sql(contents)
+        for name, contents in files
+    ]
+
+
+class MigrationLint(Service):
+    """MigrationLint service class."""
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_folder: Path,
+        cache_path: Path | None = None,
+        workers: int = DEFAULT_WORKERS,
+    ) -> list[LintIssue]:
+        """Lint all migration files without connecting to the database.
+
+        Every up file should have a down file. The files which still have
+        the placeholder of `create`, which don't include any command, which
+        have syntax errors or which have dangerous statements are reported.
+        The files are linted in a process pool when there are many of them,
+        and the results are cached by the contents of the files and the syntax
+        checker.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            cache_path: Path of the cache file. Nothing is cached if None.
+            workers: The number of worker processes.
+
+        Returns:
+            The issues sorted by the file and the line.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+        """
+        if not await check_existence_of_file(migration_folder):
+            raise FolderNotFoundError(
+                f"Migration folder {migration_folder} couldn't be found."
+            )
+
+        issues: list[LintIssue] = []
+        paths: list[Path] = []
+        for up_file in await get_migration_file_names(folder=migration_folder):
+            paths.append(
+                await get_migration_file_path(folder=migration_folder, name=up_file)
+            )
+            down_file: str = f"{up_file[:-3]}-down"
+            try:
+                paths.append(
+                    await get_migration_file_path(
+                        folder=migration_folder, name=down_file
+                    )
+                )
+            except FileNotFoundError:
+                issues.append(
+                    LintIssue(
+                        file=up_file, level="error", message=f"{down_file} is missing."
+                    )
+                )
+
+        for path in paths:
+            if path.suffix not in (".sql", ".py"):
+                self.logger.warning(f"{path.name} is compressed, it is skipped.")
+        paths = [path for path in paths if path.suffix in (".sql", ".py")]
+        backend: str = get_syntax_backend()
+        # The files are read and hashed in threads, so the cache is checked
+        # without waiting for the files one by one.
+        contents_and_keys: list[tuple[str, str]] = await asyncio.gather(
+            *(asyncio.to_thread(read_file, path, backend) for path in paths)
+        )
+        files: list[tuple[str, str]] = [
+            (path.name, contents)
+            for path, (contents, _) in zip(paths, contents_and_keys)
+        ]
+        keys: list[str] = [key for _, key in contents_and_keys]
+
+        cache: dict[str, list[Problem]] = await self.read_cache(cache_path=cache_path)
+        missing: list[int] = [
+            index for index, key in enumerate(keys) if key not in cache
+        ]
+        problems: list[list[Problem]] = await self.lint_files(
+            files=[files[index] for index in missing], workers=workers
+        )
+        cache.update(
+            (keys[index], problem) for index, problem in zip(missing, problems)
+        )
+        await self.write_cache(
+            cache_path=cache_path, cache={key: cache[key] for key in keys}
+        )
+
+        for (name, _), key in zip(files, keys):
+            issues.extend(
+                LintIssue(file=name, line=line, level=level, message=message)
+                for line, level, message in cache[key]
+            )
+        issues.sort(key=lambda issue: (issue.file, issue.line or 0))
+        for issue in issues:
+            self.log_issue(issue)
+        return issues
+
+    @validate_call
+    async def lint_files(
+        self,
+        files: list[tuple[str, str]],
+        workers: int = DEFAULT_WORKERS,
+        pool_threshold: int = POOL_THRESHOLD,
+    ) -> list[list[Problem]]:
+        """Lint the files in a process pool if there are many of them.
+
+        Arguments:
+            files: The names and the contents of the files.
+            workers: The number of worker processes.
+            pool_threshold: The number of files from which a pool is used.
+
+        Returns:
+            The problems of each file in the same order.
+        """
+        if workers < 2 or len(files) < pool_threshold:
+            return lint_files(files)
+
+        batch_size: int = -(-len(files) // (workers * 4))
+        batches: list[list[tuple[str, str]]] = [
+            files[start:end]
+            for start, end in zip(
+                range(0, len(files), batch_size),
+                range(batch_size, len(files) + batch_size, batch_size),
+            )
+        ]
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results: list[list[list[Problem]]] = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, lint_files, batch)
+                    for batch in batches
+                )
+            )
+        return [problem for result in results for problem in result]
+
+    @validate_call
+    async def read_cache(self, cache_path: Path | None) -> dict[str, list[Problem]]:
+        """Read the problems of the files linted before.
+
+        The cache is ignored if it can't be read or it is written by another
+        version of the linter.
+
+        Arguments:
+            cache_path: Path of the cache file.
+
+        Returns:
+            The problems by the checksum of the name and the contents.
+        """
+        if cache_path is None or not await check_existence_of_file(cache_path):
+            return {}
+        try:
+            async with aiofiles.open(cache_path, mode="r") as file:
+                cache: dict = json.loads(await file.read())
+        except (OSError, ValueError):
+            return {}
+        if cache.get("version") != LINT_CACHE_VERSION:
+            return {}
+        return {
+            key: [tuple(problem) for problem in problems]
+            for key, problems in cache["files"].items()
+        }
+
+    @validate_call
+    async def write_cache(
+        self, cache_path: Path | None, cache: dict[str, list[Problem]]
+    ) -> None:
+        """Write the problems of the current files to the cache.
+
+        Arguments:
+            cache_path: Path of the cache file.
+            cache: The problems by the checksum of the name and the contents.
+
+        Returns:
+            None.
+        """
+        if cache_path is None:
+            return
+        async with aiofiles.open(cache_path, mode="w") as file:
+            await file.write(
+                json.dumps({"version": LINT_CACHE_VERSION, "files": cache})
+            )
+
+    def log_issue(self, issue: LintIssue) -> None:
+        """Log an issue as a line of the report.
+
+        Arguments:
+            issue: The issue to log.
+
+        Returns:
+            None.
+        """
+        location: str = (
+            issue.file if issue.line is None else f"{issue.file}:{issue.line}"
+        )
+        log = self.logger.error if issue.level == "error" else self.logger.warning
+        log(f"{location} {issue.message}")
@@ -0,0 +1,190 @@
+"""Migration mark service module."""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from pydantic import validate_call
+from pypika import Query, Table
+
+from py_db_migrate.service import TableNotFoundError
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.migration_validator import (
+    MigrationTableAndFolderValidator,
+)
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.utils import get_up_file_name
+
+
+class MigrationMark(SqlService):
+    """MigrationMark service class."""
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_folder: Path,
+        migration_table: str,
+        names: tuple[str, ...] = (),
+        start: str | None = None,
+        end: str | None = None,
+        dry_run: bool = False,
+    ) -> tuple[str, ...]:
+        """Record migrations as applied without running them.
+
+        Firstly, select the migration files from the migration folder by the
+        given names and the inclusive range. Then, skip the ones which were
+        recorded before and write the rest to the migration table on a single
+        connection with one COPY. The dates of the rows follow the order of
+        the files, so `down` rolls them back in the reverse order. A file that
+        comes before a recorded migration is dated just before it.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            names: The names of the migrations to record.
+            start: The first migration of the range to record. If it is not
+                given, the range starts from the first migration.
+            end: The last migration of the range to record. If it is not
+                given, the range ends with the last migration.
+            dry_run: Only log the migrations that would be recorded.
+
+        Returns:
+            The names of the recorded migrations.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+            FileNotFoundError: If a given migration couldn't be found.
+            ValueError: If no migration is selected.
+        """
+        if not names and start is None and end is None:
+            raise ValueError("Give migration names or a range to record.")
+
+        migration_up: MigrationUp = MigrationUp(database=self.database)
+        migration_files: tuple[
+            str, ...
+        ] = await migration_up.get_existing_migration_files_from_migration_folder(
+            folder=migration_folder
+        )
+        selected_files: list[str] = self.select_migration_files(
+            migration_files=migration_files, names=names, start=start, end=end
+        )
+
+        validator: MigrationTableAndFolderValidator = MigrationTableAndFolderValidator(
+            database=self.database
+        )
+        migrated_dates: dict[str, datetime] = {}
+        try:
+            await validator(
+                migration_folder=migration_folder,
+                migration_table=migration_table,
+            )
+            rows = await self.database.fetch(
+                str(Query.from_(Table(migration_table)).select("name", "date"))
+            )
+            migrated_dates = {row["name"]: row["date"] for row in rows}
+        except TableNotFoundError:
+            if not dry_run:
+                await migration_up.create_migration_table(name=migration_table)
+                self.logger.info(f"Migration table:{migration_table} is created.")
+
+        marked_files: tuple[str, ...] = tuple(
+            migration_file
+            for migration_file in selected_files
+            if migration_file not in migrated_dates
+        )
+
+        if dry_run:
+            for migration_file in marked_files:
+                self.logger.info(f"{migration_file} would be recorded.")
+            return marked_files
+
+        dates: list[datetime] = self.get_mark_dates(
+            marked_files=marked_files,
+            migrated_dates=migrated_dates,
+            now=datetime.now(tz=timezone.utc),
+        )
+        async with self.database() as connection:
+            await connection.copy_records_to_table(
+                migration_table,
+                records=list(zip(dates, marked_files)),
+                columns=["date", "name"],
+            )
+        self.logger.info(f"{len(marked_files)} migrations are recorded as applied.")
+        return marked_files
+
+    @staticmethod
+    def get_mark_dates(
+        marked_files: tuple[str, ...],
+        migrated_dates: dict[str, datetime],
+        now: datetime,
+    ) -> list[datetime]:
+        """Date the marked files in the order of the migration files.
+
+        A marked file is dated just before the earliest recorded migration
+        which comes after it, so `down` doesn't roll it back before that
+        migration. The rest are dated from now on.
+
+        Arguments:
+            marked_files: The names of the marked files in the running order.
+            migrated_dates: The dates of the recorded migrations by name.
+            now: The date of the files which come after every recorded one.
+
+        Returns:
+            The dates of the marked files.
+        """
+        dates: list[datetime] = []
+        for index, migration_file in enumerate(marked_files):
+            later_dates: list[datetime] = [
+                date for name, date in migrated_dates.items() if name > migration_file
+            ]
+            if later_dates:
+                gap: int = len(marked_files) - index
+                dates.append(min(later_dates) - timedelta(microseconds=gap))
+            else:
+                dates.append(now + timedelta(microseconds=index))
+        return dates
+
+    @staticmethod
+    @validate_call
+    def select_migration_files(
+        migration_files: tuple[str, ...],
+        names: tuple[str, ...],
+        start: str | None,
+        end: str | None,
+    ) -> list[str]:
+        """Select the migration files by the given names and range.
+
+        Arguments:
+            migration_files: The names of the existing migration files.
+            names: The names of the migrations to select.
+            start: The first migration of the range.
+            end: The last migration of the range.
+
+        Returns:
+            The selected migration files in the running order.
+
+        Raises:
+            FileNotFoundError: If a given migration couldn't be found.
+        """
+        selected_names: set[str] = {get_up_file_name(name) for name in names}
+        boundaries: list[str] = [
+            get_up_file_name(name) for name in (start, end) if name
+        ]
+        for name in selected_names.union(boundaries):
+            if name not in migration_files:
+                raise FileNotFoundError(f"{name} couldn't be found.")
+
+        first: str | None = get_up_file_name(start) if start else None
+        last: str | None = get_up_file_name(end) if end else None
+        in_range: bool = start is not None or end is not None
+
+        def is_selected(migration_file: str) -> bool:
+            if migration_file in selected_names:
+                return True
+            if not in_range or (first is not None and migration_file < first):
+                return False
+            return last is None or migration_file <= last
+
+        return [
+            migration_file
+            for migration_file in migration_files
+            if is_selected(migration_file)
+        ]
@@ -0,0 +1,218 @@
+"""Migration statement profiler service module."""
+import asyncio
+import json
+from collections import Counter
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import aiofiles
+from pydantic import BaseModel, PrivateAttr, validate_call
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service import EmptyFileError
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.sql_parser import SqlStatement, split_sql_statements
+
+SAMPLE_INTERVAL: float = 0.05
+TOP_STATEMENTS: int = 10
+
+WAIT_EVENT_QUERY: str = (
+    "SELECT wait_event_type, wait_event FROM pg_stat_activity WHERE pid = $1"
+)
+
+
+class StatementProfile(BaseModel):
+    """StatementProfile model.
+
+    Attributes:
+        migration_file: The name of the migration file of the statement.
+        line: The line number of the statement in its file.
+        query: The profiled statement.
+        duration: Execution time of the statement in seconds.
+        waits: The number of samples of each wait event while the statement
+            runs. The samples without a wait event are counted as CPU.
+    """
+
+    migration_file: str
+    line: int
+    query: str
+    duration: float
+    waits: dict[str, int] = {}
+
+
+class MigrationProfiler(MigrationUp):
+    """MigrationProfiler service class."""
+
+    _profiles: list[StatementProfile] = PrivateAttr(default_factory=list)
+    _monitor: Sql | None = PrivateAttr(default=None)
+    _interval: float = PrivateAttr(default=SAMPLE_INTERVAL)
+
+    @validate_call
+    async def profile(
+        self,
+        migration_folder: Path,
+        migration_table: str,
+        prefetch: int = 4,
+        output_path: Path | None = None,
+        top: int = TOP_STATEMENTS,
+        interval: float = SAMPLE_INTERVAL,
+    ) -> list[StatementProfile]:
+        """Run the new migration files statement by statement and profile them.
+
+        The statements of the SQL files are executed one by one in the
+        transaction of their file. While a statement runs, the wait event of
+        its backend is sampled from pg_stat_activity on another connection.
+        The slowest statements are reported at the end, even if a migration
+        fails.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            prefetch: The number of files to read ahead.
+            output_path: Path of the JSON file to write the profiles to.
+            top: The number of the slowest statements to report.
+            interval: Seconds between two samples of the wait events.
+
+        Returns:
+            The profiles of the statements in the running order.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+            MigrationError: If the problem occurs while migrating.
+        """
+        self._profiles = []
+        self._interval = interval
+        monitor: Sql = self.database.clone()
+        async with monitor.session():
+            self._monitor = monitor
+            try:
+                await self(
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                    prefetch=prefetch,
+                )
+            finally:
+                self._monitor = None
+                self.log_profiles(top=top)
+                if output_path is not None:
+                    await self.write_profiles(output_path=output_path)
+        return self._profiles
+
+    async def execute_migration(
+        self, connection: Any, migration_file: str, contents: str
+    ) -> None:
+        """Execute and profile the statements of a migration file one by one.
+
+        Arguments:
+            connection: The database connection of the migration.
+            migration_file: The name of the migration file.
+            contents: SQL commands of the migration file.
+
+        Returns:
+            None.
+
+        Raises:
+            EmptyFileError: When the file doesn't include any SQL command.
+        """
+        statements: list[SqlStatement] = split_sql_statements(contents)
+        if not statements:
+            raise EmptyFileError(f"{migration_file} doesn't include any command.")
+
+        pid: int = connection.get_server_pid()
+        for statement in statements:
+            waits: Counter[str] = Counter()
+            done: asyncio.Event = asyncio.Event()
+            sampler: asyncio.Task = asyncio.create_task(
+                self.sample_wait_events(pid=pid, waits=waits, done=done)
+            )
+            start: float = perf_counter()
+            try:
+                await connection.execute(statement.query)
+            finally:
+                duration: float = perf_counter() - start
+                done.set()
+                await sampler
+                self._profiles.append(
+                    StatementProfile(
+                        migration_file=migration_file,
+                        line=statement.line,
+                        query=statement.query,
+                        duration=duration,
+                        waits=dict(waits.most_common()),
+                    )
+                )
+
+    async def sample_wait_events(
+        self, pid: int, waits: Counter[str], done: asyncio.Event
+    ) -> None:
+        """Count the wait events of a backend until the statement is done.
+
+        Arguments:
+            pid: The process id of the backend which runs the statement.
+            waits: The counter to add the samples to.
+            done: The event which is set when the statement is done.
+
+        Returns:
+            None.
+        """
+        if self._monitor is None:
+            return
+        async with self._monitor.session() as connection:
+            while True:
+                try:
+                    await asyncio.wait_for(done.wait(), timeout=self._interval)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                record = await connection.fetchrow(WAIT_EVENT_QUERY, pid)
+                if record is None:
+                    continue
+                waits[
+                    f"{record['wait_event_type']}:{record['wait_event']}"
+                    if record["wait_event"]
+                    else "CPU"
+                ] += 1
+
+    @validate_call
+    async def write_profiles(self, output_path: Path) -> None:
+        """Write the profiles of the statements to a JSON file.
+
+        Arguments:
+            output_path: Path of the JSON file.
+
+        Returns:
+            None.
+        """
+        async with aiofiles.open(output_path, mode="w") as file:
+            await file.write(
+                json.dumps(
+                    [profile.model_dump() for profile in self._profiles], indent=2
+                )
+            )
+        self.logger.info(f"Statement profiles are written to {output_path}.")
+
+    def log_profiles(self, top: int) -> None:
+        """Log the slowest statements.
+
+        Arguments:
+            top: The number of statements to log.
+
+        Returns:
+            None.
+        """
+        if not self._profiles:
+            return
+        self.logger.info("Slowest statements:")
+        for profile in sorted(
+            self._profiles, key=lambda profile: profile.duration, reverse=True
+        )[:top]:
+            waits: str = ", ".join(
+                f"{event} {count}" for event, count in profile.waits.items()
+            )
+            suffix: str = f" waits: {waits}" if waits else ""
+            self.logger.info(
+                f"  {profile.duration * 1000:.1f} ms "
+                f"{profile.migration_file}:{profile.line} "
+                f"`{profile.query.splitlines()[0]}`{suffix}"
+            )
@@ -0,0 +1,283 @@
+"""Migration rehearsal service module."""
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from asyncpg.exceptions import PostgresError
+from pydantic import BaseModel, PrivateAttr, validate_call
+
+from py_db_migrate.service import EmptyFileError
+from py_db_migrate.service.migration_up import MigrationError, MigrationUp
+from py_db_migrate.service.sql_parser import SqlStatement, split_sql_statements
+
+EXPLAINED_STATEMENTS: tuple[str, ...] = ("UPDATE", "DELETE")
+
+LOCKS_QUERY: str = (
+    "SELECT locktype, mode, "
+    "coalesce(relation::regclass::text, locktype) AS target "
+    "FROM pg_locks "
+    "WHERE pid = pg_backend_pid() "
+    "AND granted "
+    "AND locktype NOT IN ('virtualxid', 'transactionid') "
+    "AND relation IS DISTINCT FROM 'pg_locks'::regclass"
+)
+
+
+class StatementRehearsal(BaseModel):
+    """StatementRehearsal model.
+
+    Attributes:
+        query: The rehearsed statement.
+        line: The line number of the statement in its file.
+        duration: Execution time of the statement in seconds.
+        plan: EXPLAIN output of the statement if it is an UPDATE or a DELETE.
+    """
+
+    query: str
+    line: int
+    duration: float
+    plan: str | None = None
+
+
+class FileRehearsal(BaseModel):
+    """FileRehearsal model.
+
+    Attributes:
+        name: The name of the migration file.
+        duration: Execution time of the file in seconds.
+        statements: The rehearsal results of the statements of the file.
+        locks: The locks that the rehearsal transaction holds after the file
+            is run, including the locks of the files before it.
+    """
+
+    name: str
+    duration: float
+    statements: list[StatementRehearsal]
+    locks: list[str]
+
+
+class MigrationRehearsal(MigrationUp):
+    """MigrationRehearsal service class."""
+
+    _statements: list[StatementRehearsal] = PrivateAttr(default_factory=list)
+
+    @validate_call
+    async def rehearse(
+        self, migration_folder: Path, migration_table: str
+    ) -> list[FileRehearsal]:
+        """Rehearse the pending migrations.
+
+        All pending files are run through `migrate_file` on a single
+        connection inside a transaction that is always rolled back. So,
+        nothing is committed to the database, including the migration table
+        if it doesn't exist yet. Since the locks are held until the end of
+        the transaction, and a lock that is held already isn't listed again,
+        the locks of each file are reported with the locks of the files
+        before it.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The rehearsal results of the pending files in the running order.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+            MigrationError: If the problem occurs while migrating.
+        """
+        rehearsals: list[FileRehearsal] = []
+        async with self.database.session() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                migration_files: tuple[
+                    str, ...
+                ] = await self.get_pending_migration_files(
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                )
+                for migration_file in migration_files:
+                    rehearsal: FileRehearsal = await self.rehearse_file(
+                        migration_folder=migration_folder,
+                        migration_file=migration_file,
+                        migration_table=migration_table,
+                    )
+                    self.log_rehearsal(rehearsal)
+                    rehearsals.append(rehearsal)
+            finally:
+                await transaction.rollback()
+        self.logger.info("Rehearsal is rolled back.")
+        return rehearsals
+
+    @validate_call
+    async def rehearse_file(
+        self,
+        migration_folder: Path,
+        migration_file: str,
+        migration_table: str,
+    ) -> FileRehearsal:
+        """Rehearse the given migration file.
+
+        Arguments:
+            migration_folder: The path of the migration folder.
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+
+        Returns:
+            The rehearsal result of the file.
+
+        Raises:
+            MigrationError: If the problem occurs while migrating.
+        """
+        self._statements = []
+        start: float = perf_counter()
+        try:
+            await self.migrate_file(
+                migration_folder=migration_folder,
+                migration_file=migration_file,
+                migration_table=migration_table,
+            )
+        except (EmptyFileError, PostgresError) as e:
+            raise MigrationError(
+                f"Problem occurred. Check {migration_file}.\n`{str(e)}`"
+            )
+        duration: float = perf_counter() - start
+
+        return FileRehearsal(
+            name=migration_file,
+            duration=duration,
+            statements=self._statements,
+            locks=sorted(await self.get_locks()),
+        )
+
+    async def run_with_checkpoints(
+        self,
+        migration_file: str,
+        migration_table: str,
+        contents: str,
+        directives: dict[str, list[str]],
+    ) -> bool:
+        """Don't commit the statements one by one while rehearsing.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: SQL commands of the migration file.
+            directives: The directives of the migration file.
+
+        Returns:
+            False.
+        """
+        return False
+
+    async def rewrite_table(
+        self,
+        migration_file: str,
+        migration_table: str,
+        contents: str,
+        directives: dict[str, list[str]],
+    ) -> bool:
+        """Don't rewrite the table online while rehearsing.
+
+        The statements alter the table in the rehearsal transaction instead,
+        so the rehearsal shows the locks that the online rewrite avoids.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: SQL commands of the migration file.
+            directives: The directives of the migration file.
+
+        Returns:
+            False.
+        """
+        return False
+
+    async def build_indexes(
+        self, migration_file: str, contents: str, directives: dict[str, list[str]]
+    ) -> bool:
+        """Don't build the indexes on other connections while rehearsing.
+
+        The other connections would commit the indexes, so they are built in
+        the rehearsal transaction by `execute_migration` instead.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            contents: SQL commands of the migration file.
+            directives: The directives of the migration file.
+
+        Returns:
+            False.
+        """
+        return False
+
+    async def execute_migration(
+        self, connection: Any, migration_file: str, contents: str
+    ) -> None:
+        """Execute the statements of a migration file one by one.
+
+        UPDATE and DELETE statements are explained before they run.
+
+        Arguments:
+            connection: The database connection of the migration.
+            migration_file: The name of the migration file.
+            contents: SQL commands of the migration file.
+
+        Returns:
+            None.
+
+        Raises:
+            EmptyFileError: When the file doesn't include any SQL command.
+        """
+        statements: list[SqlStatement] = split_sql_statements(contents)
+        if not statements:
+            raise EmptyFileError(f"{migration_file} doesn't include any command.")
+
+        for statement in statements:
+            plan: str | None = None
+            if statement.keyword in EXPLAINED_STATEMENTS:
+                plan = "\n".join(
+                    row[0]
+                    for row in await connection.fetch(f"EXPLAIN {statement.query}")
+                )
+            start: float = perf_counter()
+            await connection.execute(statement.query)
+            self._statements.append(
+                StatementRehearsal(
+                    query=statement.query,
+                    line=statement.line,
+                    duration=perf_counter() - start,
+                    plan=plan,
+                )
+            )
+
+    async def get_locks(self) -> set[str]:
+        """Get the granted locks of the current session.
+
+        Returns:
+            The locks in `<mode> on <target>` format.
+        """
+        query_result: list[dict[str, str]] = await self.database.fetch(LOCKS_QUERY)
+        return {f"{row['mode']} on {row['target']}" for row in query_result}
+
+    def log_rehearsal(self, rehearsal: FileRehearsal) -> None:
+        """Log the rehearsal result of a file.
+
+        Arguments:
+            rehearsal: The rehearsal result to log.
+
+        Returns:
+            None.
+        """
+        self.logger.info(f"{rehearsal.name} took {rehearsal.duration * 1000:.1f} ms.")
+        for statement in rehearsal.statements:
+            self.logger.info(
+                f"  line {statement.line}: {statement.duration * 1000:.1f} ms "
+                f"`{statement.query.splitlines()[0]}`"
+            )
+            if statement.plan:
+                for plan_line in statement.plan.splitlines():
+                    self.logger.info(f"    {plan_line}")
+        for lock in rehearsal.locks:
+            self.logger.info(f"  lock: {lock}")
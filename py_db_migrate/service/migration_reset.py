@@ -0,0 +1,158 @@
+"""Migration reset service module."""
+from pathlib import Path
+
+from pydantic import validate_call
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.template_database import TemplateDatabase
+from py_db_migrate.service.utils import quote_identifier, quote_table_name
+
+# The databases to connect while the database is copied. The first one which
+# isn't the copied database is used.
+MAINTENANCE_DATABASES: tuple[str, ...] = ("postgres", "template1")
+
+# The tables of the extensions are skipped, since their rows are inserted by
+# the extensions instead of the migrations.
+USER_TABLES_QUERY: str = (
+    "SELECT format('%I.%I', n.nspname, c.relname) AS name "
+    "FROM pg_class c "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace "
+    "WHERE c.relkind IN ('r', 'p') "
+    "AND NOT c.relispartition "
+    "AND n.nspname NOT IN ('pg_catalog', 'information_schema') "
+    "AND n.nspname NOT LIKE 'pg\\_%' "
+    "AND NOT EXISTS (SELECT 1 FROM pg_depend d "
+    "WHERE d.classid = 'pg_class'::regclass AND d.objid = c.oid "
+    "AND d.deptype = 'e') "
+)
+
+OWNER_QUERY: str = "SELECT datdba::regrole::text FROM pg_database WHERE datname = $1"
+
+# The statements which give the privileges and the settings of the database
+# to its copy.
+DATABASE_SETUP_QUERY: str = (
+    "SELECT 1 AS step, format('REVOKE ALL ON DATABASE %I FROM PUBLIC', datname) "
+    "AS query FROM pg_database WHERE datname = $1 AND datacl IS NOT NULL "
+    "UNION ALL "
+    "SELECT 2, format('GRANT %s ON DATABASE %I TO %s%s', a.privilege_type, "
+    "d.datname, CASE WHEN a.grantee = 0 THEN 'PUBLIC' "
+    "ELSE a.grantee::regrole::text END, "
+    "CASE WHEN a.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END) "
+    "FROM pg_database d, aclexplode(d.datacl) a WHERE d.datname = $1 "
+    "UNION ALL "
+    "SELECT 3, format('ALTER DATABASE %I SET %s = %L', d.datname, "
+    "split_part(c.setting, '=', 1), "
+    "substr(c.setting, strpos(c.setting, '=') + 1)) "
+    "FROM pg_database d JOIN pg_db_role_setting s "
+    "ON s.setdatabase = d.oid AND s.setrole = 0, unnest(s.setconfig) c(setting) "
+    "WHERE d.datname = $1 "
+    "ORDER BY step"
+)
+
+
+class MigrationReset(SqlService):
+    """MigrationReset service class."""
+
+    @validate_call
+    async def __call__(
+        self, migration_folder: Path, migration_table: str, rebuild: bool = False
+    ) -> None:
+        """Reset the database without running the down migrations.
+
+        By default, all user tables except the migration table and the tables
+        of the extensions are emptied by a single
+        `TRUNCATE ... RESTART IDENTITY CASCADE`, so the schema stays migrated.
+        The rows inserted by the migrations are removed as well. If rebuild is
+        given, the database is copied again from the template database of the
+        migration folder, so the migrations only run when the folder changes.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            rebuild: Copy the database from the template database.
+
+        Returns:
+            None.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+            MigrationError: If the problem occurs while migrating.
+        """
+        if rebuild:
+            template: str = await self.rebuild_database(
+                migration_folder=migration_folder, migration_table=migration_table
+            )
+            self.logger.info(f"Database is rebuilt from {template}.")
+            return
+
+        tables: list[str] = await self.truncate_tables(migration_table=migration_table)
+        self.logger.info(f"{len(tables)} tables are truncated.")
+
+    @validate_call
+    async def truncate_tables(self, migration_table: str) -> list[str]:
+        """Truncate all user tables except the migration table.
+
+        Arguments:
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The names of the truncated tables.
+        """
+        tables: list[str] = [
+            row["name"]
+            for row in await self.database.fetch_records(  # nosec
+                f"{USER_TABLES_QUERY}AND c.oid IS DISTINCT FROM "
+                f"to_regclass({quote_table_name(migration_table)})"
+            )
+        ]
+        if tables:
+            await self.database.execute(
+                f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"
+            )
+        return tables
+
+    @validate_call
+    async def rebuild_database(
+        self, migration_folder: Path, migration_table: str
+    ) -> str:
+        """Replace the database with a copy of the template database.
+
+        The template database is built or reused by `TemplateDatabase` on a
+        maintenance database. Then, the database is dropped with its sessions
+        and created again from the template with its owner, privileges and
+        settings. If the migrations fail, the database isn't touched.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The name of the template database.
+        """
+        name: str = self.database.name
+        maintenance_name: str = next(
+            database for database in MAINTENANCE_DATABASES if database != name
+        )
+        maintenance: Sql = self.database.clone(name=maintenance_name)
+        template: str = await TemplateDatabase(
+            database=maintenance, logger=self.logger
+        )(migration_folder=migration_folder, migration_table=migration_table)
+
+        async with maintenance.session() as connection:
+            owner: str | None = await connection.fetchval(OWNER_QUERY, name)
+            queries: list[str] = [
+                row["query"]
+                for row in await connection.fetch(DATABASE_SETUP_QUERY, name)
+            ]
+            await connection.execute(
+                f"DROP DATABASE IF EXISTS {quote_identifier(name)} WITH (FORCE)"
+            )
+            owner_clause: str = f" OWNER {owner}" if owner else ""
+            await connection.execute(
+                f"CREATE DATABASE {quote_identifier(name)}{owner_clause} "
+                f"TEMPLATE {quote_identifier(template)}"
+            )
+            for query in queries:
+                await connection.execute(query)
+        return template
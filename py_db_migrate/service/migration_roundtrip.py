@@ -0,0 +1,378 @@
+"""Migration round-trip verification service module."""
+import asyncio
+import os
+from pathlib import Path
+from uuid import uuid4
+
+from pydantic import BaseModel, validate_call
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service.migration_down import MigrationDown
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.utils import get_migration_file_names, quote_identifier
+
+DEFAULT_WORKERS: int = os.cpu_count() or 1
+
+USER_NAMESPACE: str = (
+    "n.nspname NOT IN ('pg_catalog', 'information_schema') "
+    "AND n.nspname NOT LIKE 'pg\\_%'"
+)
+
+SCHEMA_QUERY: str = (
+    "SELECT 'schema' AS kind, n.nspname AS definition "
+    f"FROM pg_namespace n WHERE {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'relation ' || c.relkind::text, c.oid::regclass::text "
+    "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+    f"WHERE c.relkind IN ('r', 'p', 'v', 'm', 'S', 'f') AND {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'column', c.oid::regclass::text || '.' || quote_ident(a.attname) "
+    "|| ' ' || format_type(a.atttypid, a.atttypmod) "
+    "|| CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END "
+    "|| coalesce(' DEFAULT ' || pg_get_expr(d.adbin, d.adrelid), '') "
+    "FROM pg_attribute a "
+    "JOIN pg_class c ON c.oid = a.attrelid "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace "
+    "LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+    "WHERE a.attnum > 0 AND NOT a.attisdropped "
+    f"AND c.relkind IN ('r', 'p', 'v', 'm', 'f') AND {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'index', pg_get_indexdef(c.oid) "
+    "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+    f"WHERE c.relkind IN ('i', 'I') AND {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'constraint', co.conrelid::regclass::text || ' ' "
+    "|| quote_ident(co.conname) || ' ' || pg_get_constraintdef(co.oid) "
+    "FROM pg_constraint co JOIN pg_namespace n ON n.oid = co.connamespace "
+    f"WHERE {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'view', c.oid::regclass::text || ' ' || pg_get_viewdef(c.oid) "
+    "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+    f"WHERE c.relkind IN ('v', 'm') AND {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'trigger', pg_get_triggerdef(t.oid) "
+    "FROM pg_trigger t "
+    "JOIN pg_class c ON c.oid = t.tgrelid "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace "
+    f"WHERE NOT t.tgisinternal AND {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'function', p.oid::regprocedure::text "
+    "FROM pg_proc p JOIN pg_namespace n ON n.oid = p.pronamespace "
+    f"WHERE {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'type ' || t.typtype::text, t.oid::regtype::text "
+    "FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace "
+    f"WHERE t.typtype IN ('e', 'd') AND {USER_NAMESPACE} "
+    "UNION ALL "
+    "SELECT 'enum', e.enumtypid::regtype::text || ' ' || e.enumlabel "
+    "FROM pg_enum e "
+    "UNION ALL "
+    "SELECT 'extension', extname FROM pg_extension"
+)
+
+
+class RoundtripResult(BaseModel):
+    """RoundtripResult model.
+
+    Attributes:
+        name: The name of the up migration file.
+        error: The problem that occurred while running the migration.
+        differences: The schema objects which are removed (-) or added (+)
+            after running up and down compared to the schema before up.
+    """
+
+    name: str
+    error: str | None = None
+    differences: list[str] = []
+
+    @property
+    def ok(self) -> bool:
+        """Whether the round trip of the migration succeeded."""
+        return self.error is None and not self.differences
+
+
+class MigrationRoundtrip(SqlService):
+    """MigrationRoundtrip service class.
+
+    The database of the service is used as the maintenance database which
+    the worker databases are created from.
+    """
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_folder: Path,
+        migration_table: str,
+        workers: int = DEFAULT_WORKERS,
+    ) -> list[RoundtripResult]:
+        """Verify that each migration can be run up, down and up again.
+
+        The migrations are split into contiguous chunks, and each chunk is
+        verified concurrently in its own disposable database. The migrations
+        are run only once in a snapshot database, and each worker database is
+        copied from the snapshot as soon as the snapshot reaches the first
+        migration of its chunk. Then, for each migration of the chunk, the
+        schema is captured, the migration is run up and down, the schema is
+        compared with the captured one and the migration is run up again.
+        Once a migration can't be run up, the rest of its chunk is skipped.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            workers: The number of worker databases.
+
+        Returns:
+            The results of the migrations in the running order.
+        """
+        migration_files: tuple[str, ...] = await get_migration_file_names(
+            folder=migration_folder
+        )
+        workers = max(1, min(workers, len(migration_files)))
+        chunk_size: int = -(-len(migration_files) // workers)
+        prefix: str = f"pydbmigrate_roundtrip_{uuid4().hex[:8]}"
+        snapshot: str = f"{prefix}_snapshot"
+
+        tasks: list[asyncio.Task[list[RoundtripResult]]] = []
+        skipped: list[RoundtripResult] = []
+        await self.database.execute(f"CREATE DATABASE {quote_identifier(snapshot)}")
+        try:
+            applied: int = 0
+            for index, start in enumerate(range(0, len(migration_files), chunk_size)):
+                error: str | None = await self.create_worker(
+                    worker=f"{prefix}_{index}",
+                    snapshot=snapshot,
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                    migration_files=migration_files[applied:start],
+                )
+                if error is not None:
+                    skipped = [
+                        RoundtripResult(name=name, error=error)
+                        for name in migration_files[start:]
+                    ]
+                    break
+                applied = start
+                end: int = start + chunk_size
+                tasks.append(
+                    asyncio.create_task(
+                        self.verify_chunk(
+                            worker=f"{prefix}_{index}",
+                            migration_folder=migration_folder,
+                            migration_table=migration_table,
+                            chunk=migration_files[start:end],
+                        )
+                    )
+                )
+            chunks: list[list[RoundtripResult]] = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await self.database.execute(
+                f"DROP DATABASE IF EXISTS {quote_identifier(snapshot)}"
+            )
+
+        results: list[RoundtripResult] = [
+            result for chunk in chunks for result in chunk
+        ]
+        results.extend(skipped)
+        for result in results:
+            self.log_result(result)
+        self.logger.info(
+            f"{sum(result.ok for result in results)} of {len(results)} "
+            "migrations are verified."
+        )
+        return results
+
+    @validate_call
+    async def create_worker(
+        self,
+        worker: str,
+        snapshot: str,
+        migration_folder: Path,
+        migration_table: str,
+        migration_files: tuple[str, ...],
+    ) -> str | None:
+        """Run the next migrations in the snapshot and copy it to a worker.
+
+        `CREATE DATABASE ... TEMPLATE` needs the snapshot without any
+        session, so the session of the migrations is closed before the copy.
+
+        Arguments:
+            worker: The name of the worker database.
+            snapshot: The name of the snapshot database.
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            migration_files: The migrations between the previous chunk and
+                the chunk of the worker.
+
+        Returns:
+            The reason to skip the rest of the migrations if a migration
+            fails, otherwise None.
+        """
+        database: Sql = self.database.clone(name=snapshot)
+        migration_up: MigrationUp = MigrationUp(database=database)
+        async with database.session():
+            await migration_up.create_migration_table(name=migration_table)
+            for migration_file in migration_files:
+                try:
+                    await migration_up.migrate_file(
+                        migration_folder=migration_folder,
+                        migration_file=migration_file,
+                        migration_table=migration_table,
+                    )
+                except Exception as e:
+                    return f"Skipped, {migration_file} failed. `{e}`"
+
+        await self.database.execute(
+            f"CREATE DATABASE {quote_identifier(worker)} "
+            f"TEMPLATE {quote_identifier(snapshot)}"
+        )
+        return None
+
+    @validate_call
+    async def verify_chunk(
+        self,
+        worker: str,
+        migration_folder: Path,
+        migration_table: str,
+        chunk: tuple[str, ...],
+    ) -> list[RoundtripResult]:
+        """Verify a chunk of migrations in a worker database and drop it.
+
+        Arguments:
+            worker: The name of the worker database.
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            chunk: The names of the migrations of the chunk in order.
+
+        Returns:
+            The results of the migrations of the chunk.
+        """
+        try:
+            database: Sql = self.database.clone(name=worker)
+            async with database.session():
+                results: list[RoundtripResult] = []
+                for migration_file in chunk:
+                    result, applied = await self.verify_file(
+                        database=database,
+                        migration_folder=migration_folder,
+                        migration_file=migration_file,
+                        migration_table=migration_table,
+                    )
+                    results.append(result)
+                    if not applied:
+                        break
+                last: RoundtripResult = results[-1]
+                verified: int = len(results)
+                results.extend(
+                    RoundtripResult(name=name, error=f"Skipped, {last.name} failed.")
+                    for name in chunk[verified:]
+                )
+                return results
+        finally:
+            await self.database.execute(
+                f"DROP DATABASE IF EXISTS {quote_identifier(worker)}"
+            )
+
+    async def verify_file(
+        self,
+        database: Sql,
+        migration_folder: Path,
+        migration_file: str,
+        migration_table: str,
+    ) -> tuple[RoundtripResult, bool]:
+        """Run a migration up, down and up again and compare the schemas.
+
+        Arguments:
+            database: The worker database.
+            migration_folder: Migration folder path.
+            migration_file: The name of the up migration file.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The result of the migration, and whether the migration is applied
+            to the worker database at the end.
+        """
+        migration_up: MigrationUp = MigrationUp(database=database)
+        migration_down: MigrationDown = MigrationDown(database=database)
+        before: set[str] = await self.get_schema(database=database)
+
+        try:
+            await migration_up.migrate_file(
+                migration_folder=migration_folder,
+                migration_file=migration_file,
+                migration_table=migration_table,
+            )
+        except Exception as e:
+            return (
+                RoundtripResult(name=migration_file, error=f"Up failed. `{e}`"),
+                False,
+            )
+
+        try:
+            await migration_down.migrate_down(
+                migration_folder=migration_folder,
+                migration_file=f"{migration_file[:-3]}-down",
+                migration_table=migration_table,
+            )
+        except Exception as e:
+            return (
+                RoundtripResult(name=migration_file, error=f"Down failed. `{e}`"),
+                True,
+            )
+
+        after: set[str] = await self.get_schema(database=database)
+        differences: list[str] = sorted(f"- {item}" for item in before - after)
+        differences.extend(sorted(f"+ {item}" for item in after - before))
+
+        try:
+            await migration_up.migrate_file(
+                migration_folder=migration_folder,
+                migration_file=migration_file,
+                migration_table=migration_table,
+            )
+        except Exception as e:
+            return (
+                RoundtripResult(
+                    name=migration_file,
+                    error=f"Second up failed. `{e}`",
+                    differences=differences,
+                ),
+                False,
+            )
+        return RoundtripResult(name=migration_file, differences=differences), True
+
+    @staticmethod
+    async def get_schema(database: Sql) -> set[str]:
+        """Capture the user schema objects of the database.
+
+        Arguments:
+            database: The database to capture.
+
+        Returns:
+            The schema objects in `<kind> <definition>` format.
+        """
+        return {
+            f"{row['kind']} {row['definition']}"
+            for row in await database.fetch_records(SCHEMA_QUERY)
+        }
+
+    def log_result(self, result: RoundtripResult) -> None:
+        """Log the result of a migration.
+
+        Arguments:
+            result: The result to log.
+
+        Returns:
+            None.
+        """
+        if result.ok:
+            self.logger.info(f"ok {result.name}")
+            return
+        self.logger.error(f"failed {result.name} {result.error or ''}")
+        for difference in result.differences:
+            self.logger.error(f"  {difference}")
@@ -0,0 +1,190 @@
+"""Migration server service module."""
+import asyncio
+import json
+import os
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from asyncpg import Pool
+from pydantic import PrivateAttr, validate_call
+
+from py_db_migrate.database.postgresql import PoolPSql, PSql
+from py_db_migrate.service.folder_index import MigrationFolderIndex
+from py_db_migrate.service.migration_down import MigrationDown
+from py_db_migrate.service.migration_reset import MigrationReset
+from py_db_migrate.service.migration_status import MigrationState, MigrationStatus
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.service import SqlService
+
+DEFAULT_POOL_SIZE: int = 4
+
+
+class MigrationServer(SqlService):
+    """MigrationServer service class.
+
+    Attributes:
+        database: The database which the pool of the server connects to.
+        pool_size: The maximum number of connections of the pool.
+    """
+
+    database: PSql
+    pool_size: int = DEFAULT_POOL_SIZE
+
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _pool: PoolPSql | None = PrivateAttr(default=None)
+    _index: MigrationFolderIndex = PrivateAttr(default_factory=MigrationFolderIndex)
+
+    @property
+    def pool(self) -> PoolPSql:
+        """The database of the warm connection pool while serving."""
+        if self._pool is None:
+            raise RuntimeError("The server isn't running.")
+        return self._pool
+
+    @validate_call
+    async def __call__(
+        self, migration_folder: Path, migration_table: str, socket_path: Path
+    ) -> None:
+        """Serve the migration commands over a Unix domain socket.
+
+        A connection pool is kept open while serving, and the names of the
+        migration files are cached until the folder changes. Each request is
+        a line of JSON like `{"command": "up"}` and it is answered with a line
+        like `{"ok": true, "result": ...}` or `{"ok": false, "error": ...}`.
+        Requests are run one by one, so migrations never overlap.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            socket_path: Path of the Unix domain socket to listen on.
+
+        Returns:
+            None.
+        """
+        async with await self.database.create_pool(max_size=self.pool_size) as pool:
+            self._pool = PoolPSql(pool=pool)
+            server: asyncio.AbstractServer = await asyncio.start_unix_server(
+                partial(
+                    self.handle_connection,
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                ),
+                path=socket_path,
+            )
+            self.logger.info(f"Listening on {socket_path}.")
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                self._pool = None
+                if socket_path.exists():
+                    os.unlink(socket_path)
+
+    async def handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        migration_folder: Path,
+        migration_table: str,
+    ) -> None:
+        """Answer the requests of a client until it closes the connection.
+
+        Arguments:
+            reader: Stream to read the requests.
+            writer: Stream to write the responses.
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            None.
+        """
+        try:
+            while line := await reader.readline():
+                response: dict[str, Any] = await self.handle_request(
+                    line=line,
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                )
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(
+        self, line: bytes, migration_folder: Path, migration_table: str
+    ) -> dict[str, Any]:
+        """Run the command of a request.
+
+        Arguments:
+            line: The JSON line of the request.
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The response of the request.
+        """
+        handlers: dict[str, Callable[[Path, str], Awaitable[Any]]] = {
+            "up": self.up,
+            "down": self.down,
+            "status": self.status,
+            "reset": self.reset,
+        }
+        try:
+            command: str = json.loads(line)["command"]
+        except (ValueError, TypeError, KeyError):
+            return {"ok": False, "error": "Request should be {'command': ...}."}
+        if command not in handlers:
+            return {"ok": False, "error": f"Unknown command {command}."}
+
+        async with self._lock:
+            try:
+                result: Any = await handlers[command](migration_folder, migration_table)
+            except Exception as e:
+                self.logger.error(str(e))
+                return {"ok": False, "error": str(e)}
+        return {"ok": True, "result": result}
+
+    async def up(
+        self, migration_folder: Path, migration_table: str
+    ) -> list[dict[str, Any]]:
+        """Run the new migrations and return the status."""
+        await MigrationUp(database=self.pool, index=self._index)(
+            migration_folder=migration_folder, migration_table=migration_table
+        )
+        return await self.status(migration_folder, migration_table)
+
+    async def down(
+        self, migration_folder: Path, migration_table: str
+    ) -> list[dict[str, Any]]:
+        """Roll back the latest migration and return the status."""
+        await MigrationDown(database=self.pool)(
+            migration_folder=migration_folder, migration_table=migration_table
+        )
+        return await self.status(migration_folder, migration_table)
+
+    async def status(
+        self, migration_folder: Path, migration_table: str
+    ) -> list[dict[str, Any]]:
+        """Return the states of the migrations."""
+        states: list[MigrationState] = await MigrationStatus(
+            database=self.pool, index=self._index
+        )(migration_folder=migration_folder, migration_table=migration_table)
+        return [state.model_dump(mode="json") for state in states]
+
+    async def reset(
+        self, migration_folder: Path, migration_table: str
+    ) -> list[dict[str, Any]]:
+        """Rebuild the database from its template and return the status.
+
+        The rebuild drops the connections to the database, so the connections
+        of the pool are replaced after it.
+        """
+        await MigrationReset(database=self.database)(
+            migration_folder=migration_folder,
+            migration_table=migration_table,
+            rebuild=True,
+        )
+        if isinstance(self.pool.pool, Pool):
+            await self.pool.pool.expire_connections()
+        return await self.status(migration_folder, migration_table)
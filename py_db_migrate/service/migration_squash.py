@@ -0,0 +1,187 @@
+"""Migration squash service module."""
+from pathlib import Path
+
+import aiofiles
+import aiofiles.os
+from pydantic import validate_call
+
+from py_db_migrate.service.service import Service
+from py_db_migrate.service.sql_parser import (
+    get_directives,
+    remove_directives,
+    split_sql_statements,
+)
+from py_db_migrate.service.utils import (
+    check_existence_of_file,
+    get_migration_file_names,
+    get_up_file_name,
+)
+
+
+class MigrationSquash(Service):
+    """MigrationSquash service class."""
+
+    @validate_call
+    async def __call__(self, migration_folder: Path, before: str) -> str:
+        """Squash the migrations before the given one into a baseline file.
+
+        Firstly, find the migrations which sort before the given migration.
+        Then, write their up files in the running order, and their down files
+        in the reverse order into a single baseline file pair. The header of
+        the baseline up file lists the squashed migrations, so the databases
+        where they were run before adopt the baseline without running it.
+        Lastly, delete the squashed files. The files are checked before
+        anything is written, so the folder isn't changed if one of them can't
+        be squashed.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            before: The name of the first migration that is kept.
+
+        Returns:
+            The name of the baseline up file.
+
+        Raises:
+            FileNotFoundError: If there is no migration before the given one.
+            ValueError: If one of the squashed migrations isn't a plain SQL file,
+                doesn't have a down file or has an execution directive.
+        """
+        before = get_up_file_name(before)[:-3]
+        squashed_files: list[str] = [
+            migration_file
+            for migration_file in await get_migration_file_names(
+                folder=migration_folder
+            )
+            if migration_file[:-3] < before
+        ]
+        if not squashed_files:
+            raise FileNotFoundError(f"There is no migration before {before}.")
+        down_files: list[str] = [
+            f"{squashed_file[:-3]}-down" for squashed_file in squashed_files
+        ]
+        for squashed_file, down_file in zip(squashed_files, down_files):
+            if not await check_existence_of_file(
+                migration_folder / f"{squashed_file}.sql"
+            ):
+                raise ValueError(
+                    f"{squashed_file} isn't a plain SQL file and can't be squashed."
+                )
+            if not await check_existence_of_file(migration_folder / f"{down_file}.sql"):
+                raise ValueError(
+                    f"{down_file} couldn't be found, so {squashed_file} can't be "
+                    "squashed."
+                )
+            for migration_file in (squashed_file, down_file):
+                await self.check_directives(
+                    migration_folder=migration_folder, migration_file=migration_file
+                )
+
+        baseline: str = f"{squashed_files[-1][:-3]}-baseline"
+        await self.write_baseline_up_file(
+            migration_folder=migration_folder,
+            baseline_file=f"{baseline}-up",
+            squashed_files=squashed_files,
+        )
+        await self.concatenate_files(
+            migration_folder=migration_folder,
+            target_file=f"{baseline}-down",
+            header="",
+            source_files=down_files[::-1],
+        )
+
+        for removed_file in squashed_files + down_files:
+            await aiofiles.os.remove(migration_folder / f"{removed_file}.sql")
+
+        self.logger.info(
+            f"{len(squashed_files)} migrations are squashed into {baseline}-up."
+        )
+        return f"{baseline}-up"
+
+    @staticmethod
+    @validate_call
+    async def check_directives(migration_folder: Path, migration_file: str) -> None:
+        """Check that the migration file can run in the baseline transaction.
+
+        The baseline runs in a single transaction, so the files which change
+        how they are run, like `no-transaction` or `parallel-indexes` files,
+        can't be squashed. Only the baseline directives are allowed.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_file: The name of the migration file.
+
+        Returns:
+            None.
+
+        Raises:
+            ValueError: If the file has an execution directive.
+        """
+        async with aiofiles.open(
+            file=migration_folder / f"{migration_file}.sql", mode="r"
+        ) as file:
+            directives: dict[str, list[str]] = get_directives(await file.read())
+        if names := sorted(set(directives) - {"baseline"}):
+            raise ValueError(
+                f"{migration_file} has the {', '.join(names)} directives and "
+                "can't be squashed."
+            )
+
+    @validate_call
+    async def write_baseline_up_file(
+        self, migration_folder: Path, baseline_file: str, squashed_files: list[str]
+    ) -> None:
+        """Write the baseline up file with the list of squashed migrations.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            baseline_file: The name of the baseline up file.
+            squashed_files: The names of the squashed up files in order.
+
+        Returns:
+            None.
+        """
+        header: str = "".join(
+            f"-- py-db-migrate:baseline {squashed_file}\n"
+            for squashed_file in squashed_files
+        )
+        await self.concatenate_files(
+            migration_folder=migration_folder,
+            target_file=baseline_file,
+            header=header,
+            source_files=squashed_files,
+        )
+
+    @staticmethod
+    @validate_call
+    async def concatenate_files(
+        migration_folder: Path, target_file: str, header: str, source_files: list[str]
+    ) -> None:
+        """Concatenate the given migration files into a new one.
+
+        Each file is preceded by a comment with its name, and a semicolon is
+        added if its last statement isn't terminated. The baseline directives
+        of the files are removed, so they don't join the header of the new
+        file.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            target_file: The name of the file to write.
+            header: Text to write at the beginning of the file.
+            source_files: The names of the files to concatenate in order.
+
+        Returns:
+            None.
+        """
+        async with aiofiles.open(
+            file=migration_folder / f"{target_file}.sql", mode="w"
+        ) as target:
+            await target.write(header)
+            for source_file in source_files:
+                async with aiofiles.open(
+                    file=migration_folder / f"{source_file}.sql", mode="r"
+                ) as source:
+                    contents: str = remove_directives(await source.read()).rstrip()
+                await target.write(f"\n-- {source_file}\n{contents}")
+                if split_sql_statements(contents) and not contents.endswith(";"):
+                    await target.write(";")
+                await target.write("\n")
@@ -0,0 +1,129 @@
+"""Migration status service module."""
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel, validate_call
+from pypika import Query, Table
+
+from py_db_migrate.database.postgresql import retry_transient
+from py_db_migrate.service import TableNotFoundError
+from py_db_migrate.service.folder_index import MigrationFolderIndex
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.migration_validator import (
+    MigrationTableAndFolderValidator,
+)
+from py_db_migrate.service.service import SqlService
+
+
+class MigrationState(BaseModel):
+    """MigrationState model.
+
+    Attributes:
+        name: The name of the up migration file.
+        date: The date when the migration was run. None if it is pending.
+        missing: True if the migration was run but its file is missing.
+    """
+
+    name: str
+    date: datetime | None = None
+    missing: bool = False
+
+
+class MigrationStatus(SqlService):
+    """MigrationStatus service class.
+
+    Attributes:
+        index: Caches the names of the migration files between the runs if it
+            is given.
+    """
+
+    index: MigrationFolderIndex | None = None
+
+    @validate_call
+    async def __call__(
+        self, migration_folder: Path, migration_table: str
+    ) -> list[MigrationState]:
+        """Report which migrations were run and which are pending.
+
+        All migration files are pending if the migration table doesn't exist.
+        Migrations which were run but whose files are missing in the folder
+        are reported at the end.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The states of the migrations in the running order.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+        """
+        validator: MigrationTableAndFolderValidator = MigrationTableAndFolderValidator(
+            database=self.database
+        )
+        dates: dict[str, datetime] = {}
+        try:
+            await validator(
+                migration_folder=migration_folder,
+                migration_table=migration_table,
+            )
+            dates = await retry_transient(
+                lambda: self.get_migration_dates(table=migration_table),
+                can_retry=self.database.can_retry,
+            )
+        except TableNotFoundError:
+            pass
+
+        migration_up: MigrationUp = MigrationUp(
+            database=self.database, index=self.index
+        )
+        migration_files: tuple[
+            str, ...
+        ] = await migration_up.get_existing_migration_files_from_migration_folder(
+            folder=migration_folder
+        )
+
+        states: list[MigrationState] = [
+            MigrationState(name=migration_file, date=dates.pop(migration_file, None))
+            for migration_file in migration_files
+        ]
+        states.extend(
+            MigrationState(name=name, date=date, missing=True)
+            for name, date in sorted(dates.items(), key=lambda item: item[1])
+        )
+        for state in states:
+            self.log_state(state)
+        return states
+
+    @validate_call
+    async def get_migration_dates(self, table: str) -> dict[str, datetime]:
+        """Get the run dates of the migrated files.
+
+        Arguments:
+            table: The name of the migration table.
+
+        Returns:
+            The run date of each migrated file by its name.
+        """
+        query = Query.from_(Table(table)).select("name", "date")
+        return {
+            row["name"]: row["date"]
+            for row in await self.database.fetch_records(str(query))
+        }
+
+    def log_state(self, state: MigrationState) -> None:
+        """Log the state of a migration as a line of the report.
+
+        Arguments:
+            state: The state to log.
+
+        Returns:
+            None.
+        """
+        if state.date is None:
+            self.logger.info(f"pending {state.name}")
+        elif state.missing:
+            self.logger.warning(f"missing {state.name} (run at {state.date})")
+        else:
+            self.logger.info(f"applied {state.name} (run at {state.date})")
@@ -0,0 +1,310 @@
+"""Schema-per-tenant migration service module."""
+import asyncio
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import BaseModel, validate_call
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service.migration_roundtrip import USER_NAMESPACE
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.utils import (
+    get_migration_folder_checksum,
+    quote_identifier,
+)
+
+DEFAULT_CONCURRENCY: int = 8
+
+# The schemas after the tenant schema in the search path, so the extensions,
+# types and functions installed in them can be used without a schema.
+DEFAULT_SHARED_SCHEMAS: tuple[str, ...] = ("public",)
+
+SCHEMAS_QUERY: str = (
+    "SELECT n.nspname FROM pg_namespace n "
+    f"WHERE n.nspname LIKE $1 AND {USER_NAMESPACE} "
+    "ORDER BY n.nspname"
+)
+
+
+class TenantResult(BaseModel):
+    """TenantResult model.
+
+    Attributes:
+        schema_name: The name of the tenant schema.
+        error: The problem that occurred while migrating the schema.
+        skipped: Whether the schema was migrated with the same files before.
+    """
+
+    schema_name: str
+    error: str | None = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether the schema is migrated."""
+        return self.error is None
+
+
+class MigrationTenants(SqlService):
+    """MigrationTenants service class."""
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_folder: Path,
+        migration_table: str,
+        schema_pattern: str | None = None,
+        schema_query: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        shared_schemas: tuple[str, ...] = DEFAULT_SHARED_SCHEMAS,
+    ) -> list[TenantResult]:
+        """Run the new migration files in each tenant schema.
+
+        Firstly, find the tenant schemas by a LIKE pattern or by a query
+        which returns their names in its first column. Then, skip the schemas
+        which were migrated with the same migration files before, so an
+        interrupted rollout resumes with the unfinished schemas. Lastly,
+        migrate the other schemas on a limited number of connections. Each
+        schema is the first schema of the search path while it is migrated,
+        followed by the shared schemas, so the objects of the migrations and
+        its own migration table are created in it. A schema is recorded in
+        the progress table once all of its migrations succeed.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files
+                in each schema. The progress table is named after it.
+            schema_pattern: The LIKE pattern of the tenant schemas.
+            schema_query: The query which returns the tenant schemas.
+            concurrency: The number of schemas that are migrated at a time.
+            shared_schemas: The schemas after the tenant schema in the search
+                path.
+
+        Returns:
+            The results of the schemas in the order of their names.
+
+        Raises:
+            ValueError: If neither or both of the pattern and the query are
+                given.
+        """
+        if (schema_pattern is None) == (schema_query is None):
+            raise ValueError("Either a schema pattern or a query is needed.")
+
+        checksum: str = await get_migration_folder_checksum(folder=migration_folder)
+        progress_table: str = await self.create_progress_table(
+            name=f"{migration_table}_tenants"
+        )
+        schemas: list[str] = await self.get_schemas(
+            schema_pattern=schema_pattern, schema_query=schema_query
+        )
+        finished: set[str] = await self.get_finished_schemas(
+            progress_table=progress_table, checksum=checksum
+        )
+
+        results: dict[str, TenantResult] = {
+            schema: TenantResult(schema_name=schema, skipped=True)
+            for schema in schemas
+            if schema in finished
+        }
+        pending: Iterator[str] = (
+            schema for schema in schemas if schema not in finished
+        )
+        await asyncio.gather(
+            *(
+                self.run_worker(
+                    schemas=pending,
+                    results=results,
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                    progress_table=progress_table,
+                    checksum=checksum,
+                    shared_schemas=shared_schemas,
+                )
+                for _ in range(max(1, concurrency))
+            )
+        )
+
+        ordered: list[TenantResult] = [results[schema] for schema in schemas]
+        for result in ordered:
+            self.log_result(result)
+        self.logger.info(
+            f"{sum(result.ok for result in ordered)} of {len(ordered)} schemas "
+            f"are migrated, {sum(result.skipped for result in ordered)} of them "
+            "before."
+        )
+        return ordered
+
+    @validate_call
+    async def create_progress_table(self, name: str) -> str:
+        """Create the table that records the migrated schemas.
+
+        Arguments:
+            name: The name of the progress table.
+
+        Returns:
+            The schema qualified and quoted name of the table, so it can be
+            used while the search path is set to a tenant schema.
+        """
+        async with self.database.session() as connection:
+            await connection.execute(  # nosec
+                f"CREATE TABLE IF NOT EXISTS {quote_identifier(name)} ("
+                "schema_name TEXT PRIMARY KEY, "
+                "checksum TEXT NOT NULL, "
+                "date TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW())"
+            )
+            schema: str = await connection.fetchval("SELECT current_schema()")
+        return f"{quote_identifier(schema)}.{quote_identifier(name)}"
+
+    @validate_call
+    async def get_schemas(
+        self, schema_pattern: str | None, schema_query: str | None
+    ) -> list[str]:
+        """Find the tenant schemas.
+
+        Arguments:
+            schema_pattern: The LIKE pattern of the tenant schemas.
+            schema_query: The query which returns the tenant schemas.
+
+        Returns:
+            The sorted names of the schemas.
+        """
+        async with self.database.session() as connection:
+            if schema_query is not None:
+                records = await connection.fetch(schema_query)
+            else:
+                records = await connection.fetch(SCHEMAS_QUERY, schema_pattern)
+        return sorted({record[0] for record in records})
+
+    @validate_call
+    async def get_finished_schemas(
+        self, progress_table: str, checksum: str
+    ) -> set[str]:
+        """Get the schemas which are migrated with the current files.
+
+        Arguments:
+            progress_table: The qualified name of the progress table.
+            checksum: The checksum of the migration folder.
+
+        Returns:
+            The names of the schemas.
+        """
+        async with self.database.session() as connection:
+            records = await connection.fetch(  # nosec
+                f"SELECT schema_name FROM {progress_table} WHERE checksum = $1",
+                checksum,
+            )
+        return {record["schema_name"] for record in records}
+
+    async def run_worker(
+        self,
+        schemas: Iterator[str],
+        results: dict[str, TenantResult],
+        migration_folder: Path,
+        migration_table: str,
+        progress_table: str,
+        checksum: str,
+        shared_schemas: tuple[str, ...],
+    ) -> None:
+        """Migrate the schemas one by one on a single connection.
+
+        The workers share the iterator of the pending schemas, so each
+        schema is taken by a single worker. If the connection is lost, a
+        new one is opened for the next schema.
+
+        Arguments:
+            schemas: The shared iterator of the pending schemas.
+            results: The results of the schemas by their names.
+            migration_folder: Migration folder path.
+            migration_table: The name of the migration table of each schema.
+            progress_table: The qualified name of the progress table.
+            checksum: The checksum of the migration folder.
+            shared_schemas: The schemas after the tenant schema in the search
+                path.
+
+        Returns:
+            None.
+        """
+        database: Sql = self.database.clone()
+        schema: str | None = next(schemas, None)
+        while schema is not None:
+            async with database.session() as connection:
+                while schema is not None and not connection.is_closed():
+                    results[schema] = await self.migrate_schema(
+                        database=database,
+                        connection=connection,
+                        schema=schema,
+                        migration_folder=migration_folder,
+                        migration_table=migration_table,
+                        progress_table=progress_table,
+                        checksum=checksum,
+                        shared_schemas=shared_schemas,
+                    )
+                    schema = next(schemas, None)
+
+    async def migrate_schema(
+        self,
+        database: Sql,
+        connection: Any,
+        schema: str,
+        migration_folder: Path,
+        migration_table: str,
+        progress_table: str,
+        checksum: str,
+        shared_schemas: tuple[str, ...],
+    ) -> TenantResult:
+        """Run the new migration files in a tenant schema.
+
+        Arguments:
+            database: The database of the worker with its pinned connection.
+            connection: The pinned connection of the worker.
+            schema: The name of the tenant schema.
+            migration_folder: Migration folder path.
+            migration_table: The name of the migration table of the schema.
+            progress_table: The qualified name of the progress table.
+            checksum: The checksum of the migration folder.
+            shared_schemas: The schemas after the tenant schema in the search
+                path.
+
+        Returns:
+            The result of the schema.
+        """
+        search_path: str = ", ".join(
+            quote_identifier(name) for name in (schema, *shared_schemas)
+        )
+        try:
+            await connection.execute(f"RESET ALL; SET search_path TO {search_path}")
+            # The clones of the database, like the connections which build
+            # indexes in parallel, use the search path of the tenant too.
+            database.search_path = search_path
+            migration_up: MigrationUp = MigrationUp(database=database)
+            # The migration table is created in the tenant schema before it is
+            # read, so the one of a shared schema isn't found instead.
+            await migration_up.create_migration_table(name=migration_table)
+            await migration_up(
+                migration_folder=migration_folder, migration_table=migration_table
+            )
+            await connection.execute(  # nosec
+                f"INSERT INTO {progress_table} (schema_name, checksum) "
+                "VALUES ($1, $2) ON CONFLICT (schema_name) DO UPDATE "
+                "SET checksum = EXCLUDED.checksum, date = NOW()",
+                schema,
+                checksum,
+            )
+        except Exception as e:
+            return TenantResult(schema_name=schema, error=str(e))
+        return TenantResult(schema_name=schema)
+
+    def log_result(self, result: TenantResult) -> None:
+        """Log the result of a schema.
+
+        Arguments:
+            result: The result to log.
+
+        Returns:
+            None.
+        """
+        if result.error is not None:
+            self.logger.error(f"{result.schema_name} failed. {result.error}")
+        elif not result.skipped:
+            self.logger.info(f"{result.schema_name} is migrated.")
@@ -1,24 +1,54 @@
 """Migration service module."""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from posix import DirEntry
-from typing import Iterable
+from typing import Any, AsyncContextManager, AsyncIterator, Iterator
 
-import aiofiles
-import aiofiles.os
-
-from asyncpg.exceptions import PostgresError
+from asyncpg.exceptions import (
+    PostgresError,
+    QueryCanceledError,
+    UndefinedTableError,
+)
 from pydantic import validate_call
 from pypika import Query, Table
 
+from py_db_migrate.database.postgresql import CONNECTION_LOST_ERRORS, retry_transient
 from py_db_migrate.service import (
+    CheckpointError,
     EmptyFileError,
-    TableNotFoundError,
+    FolderNotFoundError,
+    IndexBuildError,
+    OnlineRewriteError,
+)
+from py_db_migrate.service.blocking_watchdog import BlockingWatchdog
+from py_db_migrate.service.checkpoints import CheckpointedExecutor
+from py_db_migrate.service.folder_index import MigrationFolderIndex
+from py_db_migrate.service.online_rewrite import (
+    DEFAULT_BATCH_DELAY,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_LOCK_TIMEOUT,
+    OnlineRewriter,
 )
-from py_db_migrate.service.migration_validator import (
-    MigrationTableAndFolderValidator,
+from py_db_migrate.service.parallel_indexes import (
+    SESSION_SETTINGS,
+    ParallelIndexBuilder,
 )
+from py_db_migrate.service.replica_lag import ReplicaLagThrottle
 from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.sql_parser import get_directives
+from py_db_migrate.service.utils import (
+    COMPRESSED_FILE_EXTENSIONS,
+    check_existence_of_file,
+    execute_compressed_migration_file,
+    get_migration_file_names,
+    get_migration_file_path,
+    get_python_migration_function,
+    read_migration_file_contents,
+    read_sql_migration_file,
+)
 
 
 class MigrationError(ValueError):
@@ -26,69 +56,157 @@ class MigrationError(ValueError):
 
 
 class MigrationUp(SqlService):
-    """MigrationUp service class."""
+    """MigrationUp service class.
+
+    Attributes:
+        throttle: Waits for the replicas before each migration and each batch
+            of an online rewrite if it is given.
+        watchdog: Cancels a migration which blocks other sessions and runs it
+            again later if it is given.
+        index: Caches the names of the migration files between the runs if it
+            is given. Otherwise, the folder is scanned in each run.
+    """
+
+    throttle: ReplicaLagThrottle | None = None
+    watchdog: BlockingWatchdog | None = None
+    index: MigrationFolderIndex | None = None
 
     @validate_call
-    async def __call__(self, migration_folder: Path, migration_table: str) -> None:
+    async def __call__(
+        self, migration_folder: Path, migration_table: str, prefetch: int = 4
+    ) -> list[str]:
         """Run missing migrations.
 
-        Firstly, check whether the migration folder exists or not. If it doesn't
-        exist, raise an exception. Next, check whether the migration table exists
-        or not. If it doesn't exist, create a table. Then, find the name of
-        the migrated files from database and find the available migration files
-        from the migration folder. Then, find the files that weren't migrated
-        before and try to run them.
+        Firstly, scan the migration folder while connecting to the database.
+        This step is retried on transient errors, but the migrations aren't.
+        If the folder doesn't exist, raise an exception. Next, find the names
+        of the migrated files from database, creating the migration table if
+        it doesn't exist. Then, find the files that weren't migrated before
+        and try to run them. The next files are read while the current one
+        is running.
 
         Arguments:
             migration_folder: Migration folder path.
             migration_table: The name of the table that holds migrated files.
+            prefetch: The number of files to read ahead.
 
         Returns:
-            None.
+            The names of the migrated files in the running order.
 
         Raises:
             FolderNotFoundError: If the migration folder couldn't be found.
             MigrationError: If the problem occurs while migrating.
         """
-        validator: MigrationTableAndFolderValidator = MigrationTableAndFolderValidator(
-            database=self.database
+        migrated_files: list[str] = []
+        migration_files: tuple[str, ...] = await retry_transient(
+            lambda: self.get_pending_migration_files(
+                migration_folder=migration_folder, migration_table=migration_table
+            ),
+            can_retry=self.database.can_retry,
         )
-        try:
-            await validator(
-                migration_folder=migration_folder,
-                migration_table=migration_table,
+
+        async for migration_file, contents in self.prefetch_migration_files(
+            migration_folder=migration_folder,
+            migration_files=migration_files,
+            prefetch=prefetch,
+        ):
+            if self.throttle is not None:
+                await self.throttle(before=migration_file)
+            try:
+                await self.migrate_file_with_retries(
+                    migration_folder=migration_folder,
+                    migration_file=migration_file,
+                    migration_table=migration_table,
+                    contents=contents,
+                )
+                self.logger.info(f"{migration_file} is running.")
+                migrated_files.append(migration_file)
+            except CONNECTION_LOST_ERRORS as e:
+                # The file is recorded in the same transaction, so the next
+                # run knows whether it was committed or not.
+                raise MigrationError(
+                    f"Connection was lost while running {migration_file}. Run "
+                    "the migrations again to continue.\n"
+                    f"`{e.__class__.__name__}: {str(e)}`"
+                )
+            except (
+                CheckpointError,
+                EmptyFileError,
+                IndexBuildError,
+                OnlineRewriteError,
+                PostgresError,
+            ) as e:
+                raise MigrationError(
+                    f"Problem occurred. Check {migration_file}.\n`{str(e)}`"
+                )
+        if self.throttle is not None and self.throttle.waited:
+            self.logger.info(
+                f"Waited {self.throttle.waited:.1f} s for the replicas in total."
             )
+        return migrated_files
 
-        except TableNotFoundError:
-            await self.create_migration_table(name=migration_table)
-            self.logger.info(f"Migration table:{migration_table} is created.")
+    @validate_call
+    async def get_pending_migration_files(
+        self, migration_folder: Path, migration_table: str, create_table: bool = True
+    ) -> tuple[str, ...]:
+        """Find the migration files that weren't migrated before.
 
-        migrated_files_from_db: list[str] = await self.get_migrated_file_names_from_db(
-            table=migration_table
-        )
+        The migration folder is scanned while connecting to the database.
+        If the folder doesn't exist, raise an exception. Then, fetch the names
+        of the migrated files, creating the migration table if it doesn't
+        exist, and compare them with the available migration files from the
+        migration folder.
 
-        migration_files_from_folder: tuple[
-            str, ...
-        ] = await self.get_existing_migration_files_from_migration_folder(
-            folder=migration_folder
-        )
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            create_table: Create the migration table if it doesn't exist.
+                Otherwise, all files are pending without the table.
+
+        Returns:
+            The names of the pending migration files in the running order.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+        """
+
+        async def scan_migration_folder() -> tuple[str, ...]:
+            if not await check_existence_of_file(migration_folder):
+                raise FolderNotFoundError(
+                    f"Migration folder {migration_folder} couldn't be found."
+                )
+            return await self.get_existing_migration_files_from_migration_folder(
+                folder=migration_folder
+            )
 
+        async with AsyncExitStack() as stack:
+            # Both are awaited to the end, so the session is always closed
+            # by the stack even if the scan fails.
+            scan_result: tuple[str, ...] | BaseException
+            session_result: Any
+            scan_result, session_result = await asyncio.gather(
+                scan_migration_folder(),
+                stack.enter_async_context(self.database.session()),
+                return_exceptions=True,
+            )
+            if isinstance(scan_result, BaseException):
+                raise scan_result
+            if isinstance(session_result, BaseException):
+                raise session_result
+            migration_files_from_folder: tuple[str, ...] = scan_result
+            migrated_files_from_db: set[str] = set(
+                await self.fetch_or_create_migration_table(
+                    name=migration_table, create=create_table
+                )
+            )
+
+        pending_migration_files: list[str] = []
         for migration_file_from_folder in migration_files_from_folder:
             if migration_file_from_folder in migrated_files_from_db:
                 self.logger.info(f"{migration_file_from_folder} has been run before.")
                 continue
-            try:
-                await self.migrate_file(
-                    migration_folder=migration_folder,
-                    migration_file=migration_file_from_folder,
-                    migration_table=migration_table,
-                )
-                self.logger.info(f"{migration_file_from_folder} is running.")
-            except (EmptyFileError, PostgresError) as e:
-                raise MigrationError(
-                    f"Problem occurred. Check {migration_file_from_folder}.\n"
-                    f"`{str(e)}`"
-                )
+            pending_migration_files.append(migration_file_from_folder)
+        return tuple(pending_migration_files)
 
     @validate_call
     async def create_migration_table(self, name: str) -> None:
@@ -107,46 +225,485 @@ class MigrationUp(SqlService):
             "name TEXT NOT NULL)"
         )
 
+    @validate_call
+    async def fetch_or_create_migration_table(
+        self, name: str, create: bool = True
+    ) -> list[str]:
+        """Get names of the migrated files, creating the table if it is missing.
+
+        The names are fetched optimistically, so only the first run needs
+        another round trip to create the table. In a transaction, the fetch
+        is run in a savepoint to keep the transaction usable if it fails.
+
+        Arguments:
+            name: The name of the migration table.
+            create: Create the table if it is missing. Otherwise, a missing
+                table has no migrated files.
+
+        Returns:
+            The list of the names of migrated files ordered by time.
+        """
+        query = Query.from_(Table(name)).select("name").orderby("date")
+        async with self.database.session() as connection:
+            try:
+                if connection.is_in_transaction():
+                    async with connection.transaction():
+                        records = await connection.fetch(str(query))
+                else:
+                    records = await connection.fetch(str(query))
+            except UndefinedTableError:
+                if not create:
+                    return []
+                await self.create_migration_table(name=name)
+                self.logger.info(f"Migration table:{name} is created.")
+                return []
+        return [record["name"] for record in records]
+
+    async def prefetch_migration_files(
+        self, migration_folder: Path, migration_files: tuple[str, ...], prefetch: int
+    ) -> AsyncIterator[tuple[str, str | None]]:
+        """Read the migration files ahead of time in a dedicated thread pool.
+
+        At most `prefetch` files are read ahead, so the memory is bounded
+        while the reads overlap with the running migration.
+
+        Arguments:
+            migration_folder: The path of the migration folder.
+            migration_files: The names of the migration files in order.
+            prefetch: The number of files to read ahead.
+
+        Returns:
+            The names of the files with their SQL contents, or with None if
+            they are not SQL files.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max(1, prefetch), thread_name_prefix="py-db-migrate-read"
+        )
+        reads: deque[tuple[str, asyncio.Future]] = deque()
+        remaining: Iterator[str] = iter(migration_files)
+
+        def read_next() -> None:
+            migration_file: str | None = next(remaining, None)
+            if migration_file is not None:
+                reads.append(
+                    (
+                        migration_file,
+                        loop.run_in_executor(
+                            executor,
+                            read_sql_migration_file,
+                            migration_folder,
+                            migration_file,
+                        ),
+                    )
+                )
+
+        try:
+            for _ in range(max(1, prefetch)):
+                read_next()
+            while reads:
+                migration_file, read = reads.popleft()
+                contents: str | None = await read
+                read_next()
+                yield migration_file, contents
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def migrate_file_with_retries(
+        self,
+        migration_folder: Path,
+        migration_file: str,
+        migration_table: str,
+        contents: str | None = None,
+    ) -> None:
+        """Migrate the given file, and run it again if the watchdog cancels it.
+
+        Arguments:
+            migration_folder: The path of the migration folder.
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: The SQL contents of the file if it is read before.
+
+        Returns:
+            None.
+
+        Raises:
+            MigrationError: If the watchdog cancels every attempt.
+        """
+        attempt: int = 0
+        while True:
+            try:
+                await self.migrate_file(
+                    migration_folder=migration_folder,
+                    migration_file=migration_file,
+                    migration_table=migration_table,
+                    contents=contents,
+                )
+                return
+            except QueryCanceledError:
+                if self.watchdog is None or self.watchdog.reason is None:
+                    raise
+                if attempt == self.watchdog.retries:
+                    raise MigrationError(
+                        f"{migration_file} is canceled {attempt + 1} times. The "
+                        f"last time, {self.watchdog.reason}."
+                    )
+                attempt += 1
+                self.logger.warning(
+                    f"{migration_file} is canceled since {self.watchdog.reason}. "
+                    f"Retrying in {self.watchdog.retry_delay:g} s "
+                    f"({attempt}/{self.watchdog.retries})."
+                )
+                await asyncio.sleep(self.watchdog.retry_delay)
+
+    def watch_blocking(self, connection: Any) -> AsyncContextManager[None]:
+        """Watch the migration connection by the watchdog if it is given.
+
+        Arguments:
+            connection: The database connection of the migration.
+
+        Returns:
+            A context manager which watches the connection until it exits.
+        """
+        if self.watchdog is None:
+            return nullcontext()
+        return self.watchdog(pid=connection.get_server_pid())
+
     @validate_call
     async def migrate_file(
-        self, migration_folder: Path, migration_file: str, migration_table: str
+        self,
+        migration_folder: Path,
+        migration_file: str,
+        migration_table: str,
+        contents: str | None = None,
     ) -> None:
         """Migrate the given file.
 
-        Firstly, try to execute the given sql commands and then insert
+        Firstly, try to execute the given sql commands, or the `up` function
+        of a Python migration file with the connection, and then insert
         the information of this file to the migration table. Transaction
-        is used for canceling if something goes wrong.
+        is used for canceling if something goes wrong. A baseline file whose
+        squashed migrations were run before isn't executed, it replaces
+        their rows in the migration table instead.
 
         Arguments:
             migration_folder: The path of the migration folder.
             migration_file: The name of the migration file.
             migration_table: The name of the migration table
                 that we store migrated files in the db.
+            contents: The SQL contents of the file if it is read before.
 
         Returns:
             None.
 
         Raise:
             EmptyFileError: When the file doesn't include any SQL command.
+            FileNotFoundError: When the file couldn't be found.
         """
         now: datetime = datetime.now(tz=timezone.utc)
-        async with aiofiles.open(
-            file=migration_folder / f"{migration_file}.sql",
-            mode="r",
-        ) as file:
-            contents = await file.read()
-            try:
-                async with self.database() as connection:
-                    await connection.execute(contents)
-                    query = (
-                        Query.into(Table(migration_table))
-                        .columns("date", "name")
-                        .insert(now, migration_file)
-                    )
-                    await connection.execute(str(query))
+        path: Path = migration_folder / f"{migration_file}.sql"
+        if contents is None:
+            path = await get_migration_file_path(
+                folder=migration_folder, name=migration_file
+            )
+            contents = (
+                await self.read_migration_file(
+                    migration_folder=migration_folder, migration_file=migration_file
+                )
+                if path.suffix == ".sql"
+                else ""
+            )
+        directives: dict[str, list[str]] = get_directives(contents)
+        squashed_files: list[str] = directives.get("baseline", [])
+        if not squashed_files and await self.rewrite_table(
+            migration_file=migration_file,
+            migration_table=migration_table,
+            contents=contents,
+            directives=directives,
+        ):
+            return
+        if not squashed_files and await self.run_with_checkpoints(
+            migration_file=migration_file,
+            migration_table=migration_table,
+            contents=contents,
+            directives=directives,
+        ):
+            return
+        indexes_built: bool = not squashed_files and await self.build_indexes(
+            migration_file=migration_file, contents=contents, directives=directives
+        )
+        async with self.database() as connection, self.watch_blocking(connection):
+            if squashed_files and await self.adopt_baseline(
+                connection=connection,
+                migration_file=migration_file,
+                migration_table=migration_table,
+                squashed_files=squashed_files,
+            ):
+                return
+            if indexes_built:
+                pass
+            elif path.suffix == ".py":
+                await get_python_migration_function(path=path, name="up")(connection)
+            elif path.name.endswith(COMPRESSED_FILE_EXTENSIONS):
+                await execute_compressed_migration_file(
+                    connection=connection, migration_file=migration_file, path=path
+                )
+            else:
+                await self.execute_migration(
+                    connection=connection,
+                    migration_file=migration_file,
+                    contents=contents,
+                )
+            query = (
+                Query.into(Table(migration_table))
+                .columns("date", "name")
+                .insert(now, migration_file)
+            )
+            await connection.execute(str(query))
+
+    async def run_with_checkpoints(
+        self,
+        migration_file: str,
+        migration_table: str,
+        contents: str,
+        directives: dict[str, list[str]],
+    ) -> bool:
+        """Run the file without a transaction if it has the directive.
+
+        `-- py-db-migrate:no-transaction` runs the statements one by one and
+        records a checkpoint after each of them, so an interrupted file is
+        resumed from its first unfinished statement.
 
-            except AttributeError as e:
-                raise EmptyFileError from e
+        Arguments:
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: SQL commands of the migration file.
+            directives: The directives of the migration file.
+
+        Returns:
+            True if the file is run and recorded. False if the file doesn't
+            have the directive.
+
+        Raises:
+            CheckpointError: If the file is changed after some of its
+                statements were run.
+        """
+        if "no-transaction" not in directives:
+            return False
+        await CheckpointedExecutor(
+            database=self.database, logger=self.logger, throttle=self.throttle
+        )(
+            migration_file=migration_file,
+            migration_table=migration_table,
+            contents=contents,
+        )
+        return True
+
+    async def rewrite_table(
+        self,
+        migration_file: str,
+        migration_table: str,
+        contents: str,
+        directives: dict[str, list[str]],
+    ) -> bool:
+        """Rewrite the table online if the file has the directive.
+
+        `-- py-db-migrate:online-rewrite <table>` applies the ALTER TABLE
+        statements of the file to a copy of the table which replaces it at the
+        end. The `rewrite-batch-size`, `rewrite-batch-delay` and
+        `rewrite-lock-timeout` directives tune the copy and the swap.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: SQL commands of the migration file.
+            directives: The directives of the migration file.
+
+        Returns:
+            True if the table is rewritten and the file is recorded. False if
+            the file doesn't have the directive.
+
+        Raises:
+            OnlineRewriteError: If the directives are invalid or the table
+                can't be rewritten online.
+        """
+        if "online-rewrite" not in directives:
+            return False
+        try:
+            batch_size: int = int(
+                directives.get("rewrite-batch-size", [DEFAULT_BATCH_SIZE])[-1]
+            )
+            batch_delay: float = float(
+                directives.get("rewrite-batch-delay", [DEFAULT_BATCH_DELAY])[-1]
+            )
+        except ValueError:
+            raise OnlineRewriteError(
+                f"{migration_file} needs numbers in its rewrite-batch-size and "
+                "rewrite-batch-delay directives."
+            )
+        await OnlineRewriter(
+            database=self.database, logger=self.logger, throttle=self.throttle
+        )(
+            migration_file=migration_file,
+            migration_table=migration_table,
+            contents=contents,
+            table=directives["online-rewrite"][-1],
+            batch_size=batch_size,
+            batch_delay=batch_delay,
+            lock_timeout=directives.get("rewrite-lock-timeout", [DEFAULT_LOCK_TIMEOUT])[
+                -1
+            ],
+        )
+        return True
+
+    async def build_indexes(
+        self, migration_file: str, contents: str, directives: dict[str, list[str]]
+    ) -> bool:
+        """Build the indexes of the file in parallel if it has the directive.
+
+        `-- py-db-migrate:parallel-indexes <N>` builds the indexes on up to N
+        connections at a time. The `maintenance-work-mem` and
+        `max-parallel-maintenance-workers` directives set the same named
+        settings of these connections.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            contents: SQL commands of the migration file.
+            directives: The directives of the migration file.
+
+        Returns:
+            True if the indexes are built. False if the file doesn't have
+            the directive.
+
+        Raises:
+            IndexBuildError: If the directive is invalid or a statement
+                doesn't create an index.
+        """
+        if "parallel-indexes" not in directives:
+            return False
+        try:
+            parallelism: int = int(directives["parallel-indexes"][-1])
+        except ValueError:
+            raise IndexBuildError(
+                f"{migration_file} needs the number of connections in its "
+                "parallel-indexes directive."
+            )
+        await ParallelIndexBuilder(database=self.database, logger=self.logger)(
+            migration_file=migration_file,
+            contents=contents,
+            parallelism=parallelism,
+            settings={
+                setting: directives[directive][-1]
+                for directive, setting in SESSION_SETTINGS.items()
+                if directive in directives
+            },
+        )
+        return True
+
+    async def adopt_baseline(
+        self,
+        connection: Any,
+        migration_file: str,
+        migration_table: str,
+        squashed_files: list[str],
+    ) -> bool:
+        """Record the baseline file if its squashed migrations were run before.
+
+        The rows of the squashed migrations are replaced with a single row of
+        the baseline file which has the date of the latest squashed migration.
+
+        Arguments:
+            connection: The database connection of the migration.
+            migration_file: The name of the baseline file.
+            migration_table: The name of the migration table.
+            squashed_files: The names of the migrations that the baseline
+                file replaces.
+
+        Returns:
+            True if the baseline file is recorded. False if none of the
+            squashed migrations were run before.
+
+        Raises:
+            MigrationError: If only some of the squashed migrations were run.
+        """
+        table: Table = Table(migration_table)
+        rows = await connection.fetch(
+            str(
+                Query.from_(table)
+                .select("name", "date")
+                .where(table.name.isin(squashed_files))
+            )
+        )
+        if not rows:
+            return False
+
+        migrated_files: set[str] = {row["name"] for row in rows}
+        missing_files: list[str] = [
+            squashed_file
+            for squashed_file in squashed_files
+            if squashed_file not in migrated_files
+        ]
+        if missing_files:
+            raise MigrationError(
+                f"{migration_file} can't be adopted since {missing_files[0]} and "
+                f"{len(missing_files) - 1} other squashed migrations weren't run."
+            )
+
+        await connection.execute(
+            str(Query.from_(table).delete().where(table.name.isin(squashed_files)))
+        )
+        await connection.execute(
+            str(
+                Query.into(table)
+                .columns("date", "name")
+                .insert(max(row["date"] for row in rows), migration_file)
+            )
+        )
+        self.logger.info(
+            f"{migration_file} is recorded as the baseline of "
+            f"{len(squashed_files)} migrations."
+        )
+        return True
+
+    @validate_call
+    async def read_migration_file(
+        self, migration_folder: Path, migration_file: str
+    ) -> str:
+        """Read the contents of the given migration file.
+
+        Arguments:
+            migration_folder: The path of the migration folder.
+            migration_file: The name of the migration file.
+
+        Returns:
+            The contents of the file.
+        """
+        return await read_migration_file_contents(
+            path=migration_folder / f"{migration_file}.sql"
+        )
+
+    async def execute_migration(
+        self, connection: Any, migration_file: str, contents: str
+    ) -> None:
+        """Execute the contents of a migration file.
+
+        The given connection is already in the transaction of the migration.
+
+        Arguments:
+            connection: The database connection of the migration.
+            migration_file: The name of the migration file.
+            contents: SQL commands of the migration file.
+
+        Returns:
+            None.
+
+        Raises:
+            EmptyFileError: When the file doesn't include any SQL command.
+        """
+        try:
+            await connection.execute(contents)
+        except AttributeError as e:
+            raise EmptyFileError from e
 
     @validate_call
     async def get_existing_migration_files_from_migration_folder(
@@ -163,15 +720,10 @@ class MigrationUp(SqlService):
         Raises:
             FileNotFoundError: If there is no file.
         """
-        entries: Iterable[DirEntry] = await aiofiles.os.scandir(path=folder)
-        files: tuple[str, ...] = tuple(
-            sorted(
-                [
-                    entry.name[:-4]
-                    for entry in entries
-                    if entry.is_file() and entry.name.endswith("-up.sql")
-                ]
-            )
+        files: tuple[str, ...] = (
+            await get_migration_file_names(folder=folder)
+            if self.index is None
+            else await self.index(folder=folder)
         )
         if not files:
             self.logger.critical(f"There is no file found in {folder}.")
@@ -193,6 +745,4 @@ class MigrationUp(SqlService):
         """
         query = Query.from_(Table(table)).select("name").orderby("date")
 
-        query_result: list[dict[str, str]] = await self.database.fetch(str(query))
-
-        return [row["name"] for row in query_result]
+        return [row["name"] async for row in self.database.stream(str(query))]
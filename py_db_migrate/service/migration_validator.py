@@ -44,18 +44,19 @@ class MigrationTableAndFolderValidator(SqlService):
     async def check_existence_of_migration_table(self, name: str) -> bool:
         """Check whether the migration table exists or not.
 
+        `to_regclass` resolves the name like the queries on the table do,
+        without scanning information_schema.
+
         Arguments:
             name: The name of the table to search.
 
         Returns:
             True if exists. Otherwise, False.
         """
+        literal: str = "'" + name.replace("'", "''") + "'"
         exist: bool = (  # nosec
             await self.database.fetch(
-                "SELECT EXISTS (SELECT 1 "
-                "FROM information_schema.tables "
-                " WHERE table_schema = 'public' "
-                f"AND table_name = '{name}' )"
+                f"SELECT to_regclass({literal}) IS NOT NULL AS exists"
             )
         )[0]["exists"]
         return exist
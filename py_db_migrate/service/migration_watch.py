@@ -0,0 +1,100 @@
+"""Migration watch service module."""
+import asyncio
+from pathlib import Path
+
+from pydantic import validate_call
+
+from py_db_migrate.service import FolderNotFoundError
+from py_db_migrate.service.migration_up import MigrationError, MigrationUp
+from py_db_migrate.service.utils import get_migration_folder_snapshot
+
+
+class MigrationWatch(MigrationUp):
+    """MigrationWatch service class."""
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_folder: Path,
+        migration_table: str,
+        interval: float = 0.1,
+        max_checks: int | None = None,
+    ) -> None:
+        """Watch the migration folder and run the new migrations.
+
+        A single connection is kept open while watching. If it is lost, such
+        as when the server restarts, a new one is opened and the pending
+        migrations are run again. The folder is
+        polled by comparing the modification times and sizes of the
+        migration files, and the pending migrations are run with the logic
+        of `MigrationUp` whenever it changes. A failed migration doesn't stop
+        watching, it is tried again after the next change in the folder.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+            interval: Seconds to wait between two checks of the folder.
+            max_checks: Stop after checking the folder this many times.
+                Watch until cancelled if it is None.
+
+        Returns:
+            None.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+        """
+        snapshot: dict[str, tuple[int, int]] | None = None
+        checks: int = 0
+        self.logger.info(f"Watching {migration_folder} for new migrations.")
+        while True:
+            async with self.database.session() as connection:
+                while not connection.is_closed():
+                    current: dict[
+                        str, tuple[int, int]
+                    ] = await get_migration_folder_snapshot(folder=migration_folder)
+                    if current != snapshot:
+                        snapshot = current
+                        await self.run_pending_migrations(
+                            migration_folder=migration_folder,
+                            migration_table=migration_table,
+                        )
+
+                    checks += 1
+                    if max_checks is not None and checks >= max_checks:
+                        return
+                    await asyncio.sleep(interval)
+            self.logger.warning("The connection is lost, a new one is opened.")
+            snapshot = None
+
+    @validate_call
+    async def run_pending_migrations(
+        self, migration_folder: Path, migration_table: str
+    ) -> None:
+        """Run the pending migrations and log the problem instead of raising.
+
+        Any error of a migration, such as the error of a Python migration
+        file, is logged, so it doesn't stop watching.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            None.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+        """
+        try:
+            await super().__call__(
+                migration_folder=migration_folder,
+                migration_table=migration_table,
+            )
+        except FileNotFoundError:
+            pass
+        except FolderNotFoundError:
+            raise
+        except MigrationError as e:
+            self.logger.error(str(e))
+        except Exception as e:
+            self.logger.error(f"{e.__class__.__name__}: {e}")
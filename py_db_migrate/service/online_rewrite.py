@@ -0,0 +1,608 @@
+"""Online table rewrite service module."""
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
+
+from asyncpg.exceptions import LockNotAvailableError
+from pydantic import BaseModel, validate_call
+from pypika import Query, Table
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service import EmptyFileError, OnlineRewriteError
+from py_db_migrate.service.replica_lag import ReplicaLagThrottle
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.sql_parser import (
+    ALTER_TABLE_PATTERN,
+    SqlStatement,
+    get_altered_table,
+    split_sql_statements,
+)
+from py_db_migrate.service.utils import quote_identifier
+
+DEFAULT_BATCH_SIZE: int = 10000
+DEFAULT_BATCH_DELAY: float = 0.0
+DEFAULT_LOCK_TIMEOUT: str = "5s"
+SWAP_ATTEMPTS: int = 5
+SWAP_DELAY: float = 1.0
+TRIGGER_NAME: str = "py_db_migrate_online_rewrite"
+
+TABLE_QUERY: str = (
+    "SELECT c.oid, n.nspname, c.relname, c.relkind::text FROM pg_class c "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE c.oid = to_regclass($1)"
+)
+PRIMARY_KEY_QUERY: str = (
+    "SELECT a.attname FROM pg_index i JOIN pg_attribute a "
+    "ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+    "WHERE i.indrelid = $1 AND i.indisprimary"
+)
+DEPENDENTS_QUERY: str = (
+    "SELECT conrelid::regclass::text AS name FROM pg_constraint "
+    "WHERE confrelid = $1 AND contype = 'f' AND conrelid <> $1 "
+    "UNION SELECT r.ev_class::regclass::text FROM pg_depend d "
+    "JOIN pg_rewrite r ON r.oid = d.objid "
+    "WHERE d.classid = 'pg_rewrite'::regclass AND d.refobjid = $1 "
+    "AND r.ev_class <> $1"
+)
+COLUMNS_QUERY: str = (
+    "SELECT attname, format_type(atttypid, atttypmod) AS type FROM pg_attribute "
+    "WHERE attrelid = to_regclass($1) AND attnum > 0 AND NOT attisdropped "
+    "AND attgenerated = '' ORDER BY attnum"
+)
+FOREIGN_KEYS_QUERY: str = (
+    "SELECT conname, pg_get_constraintdef(oid) AS definition FROM pg_constraint "
+    "WHERE conrelid = to_regclass($1) AND contype = 'f'"
+)
+INDEXES_QUERY: str = (
+    "SELECT c.relname, i.indisunique, "
+    "substring(pg_get_indexdef(i.indexrelid) FROM ' USING .*$') AS definition "
+    "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+    "WHERE i.indrelid = to_regclass($1) ORDER BY c.relname"
+)
+GRANTEE: str = "CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE a.grantee::regrole::text END"
+GRANT_OPTION: str = "CASE WHEN a.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END"
+# The statements which give the owner, the privileges, the row level security,
+# the policies and the triggers of the table ($1) to the table which replaces
+# it by its name. The privileges of the columns are given if the columns of
+# the shadow table ($2) have them. The trigger of the rewrite ($3) is skipped.
+TABLE_SETUP_QUERY: str = (
+    "SELECT 1 AS step, format('ALTER TABLE %s OWNER TO %s', c.oid::regclass, "
+    "c.relowner::regrole) AS query FROM pg_class c WHERE c.oid = to_regclass($1) "
+    "UNION ALL "
+    "SELECT 2, format('GRANT %s ON TABLE %s TO %s%s', a.privilege_type, "
+    f"c.oid::regclass, {GRANTEE}, {GRANT_OPTION}) "
+    "FROM pg_class c, aclexplode(c.relacl) a WHERE c.oid = to_regclass($1) "
+    "UNION ALL "
+    "SELECT 3, format('GRANT %s (%I) ON TABLE %s TO %s%s', a.privilege_type, "
+    f"t.attname, t.attrelid::regclass, {GRANTEE}, {GRANT_OPTION}) "
+    "FROM pg_attribute t, aclexplode(t.attacl) a "
+    "WHERE t.attrelid = to_regclass($1) AND NOT t.attisdropped "
+    "AND EXISTS (SELECT 1 FROM pg_attribute s WHERE s.attrelid = to_regclass($2) "
+    "AND s.attname = t.attname AND NOT s.attisdropped) "
+    "UNION ALL "
+    "SELECT 4, format('ALTER TABLE %s ENABLE ROW LEVEL SECURITY', c.oid::regclass) "
+    "FROM pg_class c WHERE c.oid = to_regclass($1) AND c.relrowsecurity "
+    "UNION ALL "
+    "SELECT 5, format('ALTER TABLE %s FORCE ROW LEVEL SECURITY', c.oid::regclass) "
+    "FROM pg_class c WHERE c.oid = to_regclass($1) AND c.relforcerowsecurity "
+    "UNION ALL "
+    "SELECT 6, format('CREATE POLICY %I ON %s AS %s FOR %s TO %s%s%s', p.polname, "
+    "p.polrelid::regclass, "
+    "CASE WHEN p.polpermissive THEN 'PERMISSIVE' ELSE 'RESTRICTIVE' END, "
+    "CASE p.polcmd WHEN 'r' THEN 'SELECT' WHEN 'a' THEN 'INSERT' "
+    "WHEN 'w' THEN 'UPDATE' WHEN 'd' THEN 'DELETE' ELSE 'ALL' END, "
+    "(SELECT string_agg(CASE WHEN r = 0 THEN 'PUBLIC' ELSE r::regrole::text END, "
+    "', ') FROM unnest(p.polroles) r), "
+    "' USING (' || pg_get_expr(p.polqual, p.polrelid) || ')', "
+    "' WITH CHECK (' || pg_get_expr(p.polwithcheck, p.polrelid) || ')') "
+    "FROM pg_policy p WHERE p.polrelid = to_regclass($1) "
+    "UNION ALL "
+    "SELECT 7, pg_get_triggerdef(t.oid) FROM pg_trigger t "
+    "WHERE t.tgrelid = to_regclass($1) AND NOT t.tgisinternal AND t.tgname <> $3 "
+    "UNION ALL "
+    "SELECT 8, format('ALTER TABLE %s %s TRIGGER %I', t.tgrelid::regclass, "
+    "CASE t.tgenabled WHEN 'D' THEN 'DISABLE' WHEN 'R' THEN 'ENABLE REPLICA' "
+    "ELSE 'ENABLE ALWAYS' END, t.tgname) FROM pg_trigger t "
+    "WHERE t.tgrelid = to_regclass($1) AND NOT t.tgisinternal AND t.tgname <> $3 "
+    "AND t.tgenabled <> 'O' "
+    "ORDER BY step"
+)
+
+
+class RewriteTable(BaseModel):
+    """RewriteTable model.
+
+    Attributes:
+        schema_name: The schema of the table.
+        name: The name of the table.
+        primary_key: The primary key column of the table.
+    """
+
+    schema_name: str
+    name: str
+    primary_key: str
+
+    def qualify(self, name: str) -> str:
+        """Qualify and quote a name in the schema of the table."""
+        return f"{quote_identifier(self.schema_name)}.{quote_identifier(name)}"
+
+    @property
+    def qualified(self) -> str:
+        """The qualified and quoted name of the table."""
+        return self.qualify(self.name)
+
+    @property
+    def shadow(self) -> str:
+        """The qualified and quoted name of the shadow table."""
+        return self.qualify(f"_{self.name}_new"[:63])
+
+    @property
+    def function(self) -> str:
+        """The qualified and quoted name of the trigger function."""
+        return self.qualify(f"_{self.name}_sync"[:63])
+
+
+class OnlineRewriter(SqlService):
+    """OnlineRewriter service class.
+
+    Attributes:
+        throttle: Waits for the replicas before each batch if it is given.
+    """
+
+    throttle: ReplicaLagThrottle | None = None
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_file: str,
+        migration_table: str,
+        contents: str,
+        table: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay: float = DEFAULT_BATCH_DELAY,
+        lock_timeout: str = DEFAULT_LOCK_TIMEOUT,
+    ) -> int:
+        """Apply the ALTER TABLE statements of a file without locking the table.
+
+        Firstly, create a shadow table like the table and apply the
+        statements to it. A trigger copies the changes of the table to the
+        shadow table while its rows are copied in batches, each batch in its
+        own transaction. Lastly, swap the tables and record the migration in a
+        transaction which waits for the lock of the table at most the lock
+        timeout, and retry it a few times if the lock isn't acquired.
+
+        The leftovers of an interrupted rewrite are dropped when the file is
+        run again.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            contents: SQL commands of the migration file.
+            table: The name of the table to rewrite.
+            batch_size: The number of rows to copy in a transaction.
+            batch_delay: Seconds to wait between two batches.
+            lock_timeout: The lock timeout of the swap.
+
+        Returns:
+            The number of the copied rows.
+
+        Raises:
+            EmptyFileError: When the file doesn't include any SQL command.
+            OnlineRewriteError: If the table or the statements can't be
+                rewritten online.
+        """
+        statements: list[SqlStatement] = split_sql_statements(contents)
+        if not statements:
+            raise EmptyFileError(f"{migration_file} doesn't include any command.")
+
+        async with self.database.session() as connection:
+            source: RewriteTable = await self.inspect_table(
+                connection=connection, table=table
+            )
+            queries: list[str] = self.get_shadow_queries(
+                migration_file=migration_file, source=source, statements=statements
+            )
+            columns: dict[str, str] = await self.create_shadow_table(
+                source=source, queries=queries
+            )
+            try:
+                rows: int = await self.copy_rows(
+                    connection=connection,
+                    source=source,
+                    columns=columns,
+                    batch_size=batch_size,
+                    batch_delay=batch_delay,
+                )
+                self.logger.info(f"{rows} rows of {source.qualified} are copied.")
+                await connection.execute(f"ANALYZE {source.shadow}")  # nosec
+                foreign_keys: list[str] = await self.swap_tables_with_retries(
+                    source=source,
+                    columns=columns,
+                    migration_file=migration_file,
+                    migration_table=migration_table,
+                    lock_timeout=lock_timeout,
+                )
+            except BaseException:
+                await self.clean_up(source=source)
+                raise
+
+            for foreign_key in foreign_keys:
+                await connection.execute(  # nosec
+                    f"ALTER TABLE {source.qualified} "
+                    f"VALIDATE CONSTRAINT {quote_identifier(foreign_key)}"
+                )
+        self.logger.info(f"{source.qualified} is swapped with its rewrite.")
+        return rows
+
+    async def clean_up(self, source: RewriteTable) -> None:
+        """Drop the leftovers of a failed rewrite on a new connection.
+
+        The connection of the rewrite may be lost or in the middle of a
+        batch. If the leftovers can't be dropped, they are dropped when the
+        file is run again.
+
+        Arguments:
+            source: The table to rewrite.
+
+        Returns:
+            None.
+        """
+        try:
+            database: Sql = self.database.clone()
+            async with database.session() as connection:
+                await self.drop_leftovers(connection=connection, source=source)
+        except Exception as e:
+            self.logger.warning(
+                f"Leftovers of the rewrite of {source.qualified} couldn't be "
+                f"dropped. `{e.__class__.__name__}: {e}`"
+            )
+
+    async def inspect_table(self, connection: Any, table: str) -> RewriteTable:
+        """Check that the table can be rewritten online.
+
+        Arguments:
+            connection: The database connection.
+            table: The name of the table.
+
+        Returns:
+            The table to rewrite.
+
+        Raises:
+            OnlineRewriteError: If the table doesn't exist, isn't a plain
+                table with a single column primary key, or other tables and
+                views depend on it.
+        """
+        record = await connection.fetchrow(TABLE_QUERY, table)
+        if record is None or record["relkind"] != "r":
+            raise OnlineRewriteError(f"{table} isn't a table.")
+        primary_key = await connection.fetch(PRIMARY_KEY_QUERY, record["oid"])
+        if len(primary_key) != 1:
+            raise OnlineRewriteError(
+                f"{table} needs a single column primary key to be rewritten online."
+            )
+        dependents = await connection.fetch(DEPENDENTS_QUERY, record["oid"])
+        if dependents:
+            raise OnlineRewriteError(
+                f"{table} can't be swapped since "
+                f"{', '.join(row['name'] for row in dependents)} depend on it."
+            )
+        return RewriteTable(
+            schema_name=record["nspname"],
+            name=record["relname"],
+            primary_key=primary_key[0]["attname"],
+        )
+
+    def get_shadow_queries(
+        self, migration_file: str, source: RewriteTable, statements: list[SqlStatement]
+    ) -> list[str]:
+        """Point the ALTER TABLE statements of the file to the shadow table.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            source: The table to rewrite.
+            statements: The statements of the file.
+
+        Returns:
+            The statements which alter the shadow table.
+
+        Raises:
+            OnlineRewriteError: If a statement doesn't alter the table.
+        """
+        names: set[str] = {source.name, f"{source.schema_name}.{source.name}"}
+        queries: list[str] = []
+        for statement in statements:
+            if get_altered_table(statement) not in names:
+                raise OnlineRewriteError(
+                    f"{migration_file}:{statement.line} doesn't alter "
+                    f"{source.qualified}. Files which rewrite a table online can "
+                    "only alter that table."
+                )
+            match = ALTER_TABLE_PATTERN.match(statement.query)
+            start: int = match.start(1)
+            end: int = match.end(1)
+            queries.append(
+                f"{statement.query[:start]}{source.shadow}{statement.query[end:]}"
+            )
+        return queries
+
+    async def create_shadow_table(
+        self, source: RewriteTable, queries: list[str]
+    ) -> dict[str, str]:
+        """Create the shadow table and the trigger which keeps it up to date.
+
+        Arguments:
+            source: The table to rewrite.
+            queries: The statements which alter the shadow table.
+
+        Returns:
+            The types of the columns to copy in the shadow table by their
+            names.
+
+        Raises:
+            OnlineRewriteError: If the statements drop the primary key column.
+        """
+        async with self.database() as connection:
+            await self.drop_leftovers(connection=connection, source=source)
+            await connection.execute(  # nosec
+                f"CREATE TABLE {source.shadow} (LIKE {source.qualified} INCLUDING ALL)"
+            )
+            for query in queries:
+                await connection.execute(query)
+
+            source_columns: set[str] = {
+                record["attname"]
+                for record in await connection.fetch(COLUMNS_QUERY, source.qualified)
+            }
+            columns: dict[str, str] = {
+                record["attname"]: record["type"]
+                for record in await connection.fetch(COLUMNS_QUERY, source.shadow)
+                if record["attname"] in source_columns
+            }
+            if source.primary_key not in columns:
+                raise OnlineRewriteError(
+                    f"The primary key column of {source.qualified} can't be dropped "
+                    "online."
+                )
+
+            pk: str = quote_identifier(source.primary_key)
+            names: str = ", ".join(quote_identifier(column) for column in columns)
+            values: str = ", ".join(
+                f"NEW.{quote_identifier(column)}::{column_type}"
+                for column, column_type in columns.items()
+            )
+            updates: str = ", ".join(
+                f"{quote_identifier(column)} = EXCLUDED.{quote_identifier(column)}"
+                for column in columns
+                if column != source.primary_key
+            )
+            conflict_action: str = (
+                f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            )
+            await connection.execute(  # nosec
+                f"CREATE FUNCTION {source.function}() RETURNS trigger "
+                "LANGUAGE plpgsql AS $rewrite$\n"
+                "BEGIN\n"
+                "    IF TG_OP IN ('UPDATE', 'DELETE') THEN\n"
+                f"        DELETE FROM {source.shadow} WHERE {pk} = "
+                f"OLD.{pk}::{columns[source.primary_key]};\n"
+                "    END IF;\n"
+                "    IF TG_OP IN ('INSERT', 'UPDATE') THEN\n"
+                f"        INSERT INTO {source.shadow} ({names}) "
+                f"OVERRIDING SYSTEM VALUE VALUES ({values}) ON CONFLICT ({pk}) "
+                f"{conflict_action};\n"
+                "    END IF;\n"
+                "    RETURN NULL;\n"
+                "END\n"
+                "$rewrite$"
+            )
+            await connection.execute(  # nosec
+                f"CREATE TRIGGER {TRIGGER_NAME} AFTER INSERT OR UPDATE OR DELETE "
+                f"ON {source.qualified} FOR EACH ROW "
+                f"EXECUTE FUNCTION {source.function}()"
+            )
+        return columns
+
+    async def drop_leftovers(self, connection: Any, source: RewriteTable) -> None:
+        """Drop the shadow table and the trigger of an interrupted rewrite.
+
+        Arguments:
+            connection: The database connection.
+            source: The table to rewrite.
+
+        Returns:
+            None.
+        """
+        await connection.execute(  # nosec
+            f"DROP TRIGGER IF EXISTS {TRIGGER_NAME} ON {source.qualified}; "
+            f"DROP FUNCTION IF EXISTS {source.function}(); "
+            f"DROP TABLE IF EXISTS {source.shadow}"
+        )
+
+    async def copy_rows(
+        self,
+        connection: Any,
+        source: RewriteTable,
+        columns: dict[str, str],
+        batch_size: int,
+        batch_delay: float,
+    ) -> int:
+        """Copy the rows of the table to the shadow table in batches.
+
+        The rows of a batch are locked while they are copied, so a change of
+        them waits for the batch and is copied by the trigger after it.
+
+        Arguments:
+            connection: The database connection.
+            source: The table to rewrite.
+            columns: The types of the columns to copy by their names.
+            batch_size: The number of rows to copy in a transaction.
+            batch_delay: Seconds to wait between two batches.
+
+        Returns:
+            The number of the copied rows.
+        """
+        pk: str = quote_identifier(source.primary_key)
+        names: str = ", ".join(quote_identifier(column) for column in columns)
+        values: str = ", ".join(
+            f"{quote_identifier(column)}::{column_type}"
+            for column, column_type in columns.items()
+        )
+
+        def get_query(where: str) -> str:
+            return (  # nosec
+                f"WITH batch AS (SELECT * FROM {source.qualified} {where} "
+                f"ORDER BY {pk} LIMIT {batch_size} FOR SHARE), "
+                f"copied AS (INSERT INTO {source.shadow} ({names}) "
+                f"OVERRIDING SYSTEM VALUE SELECT {values} FROM batch "
+                f"ON CONFLICT ({pk}) DO NOTHING) "
+                f"SELECT count(*) AS rows, "
+                f"(SELECT {pk} FROM batch ORDER BY {pk} DESC LIMIT 1) AS last "
+                "FROM batch"
+            )
+
+        record = await connection.fetchrow(get_query(""))
+        rows: int = record["rows"]
+        next_query: str = get_query(f"WHERE {pk} > $1")
+        while record["rows"] == batch_size:
+            await asyncio.sleep(batch_delay)
+            if self.throttle is not None:
+                await self.throttle(before=f"the next batch of {source.qualified}")
+            record = await connection.fetchrow(next_query, record["last"])
+            rows += record["rows"]
+        return rows
+
+    async def swap_tables_with_retries(
+        self,
+        source: RewriteTable,
+        columns: dict[str, str],
+        migration_file: str,
+        migration_table: str,
+        lock_timeout: str,
+    ) -> list[str]:
+        """Swap the tables, retrying a few times if the lock isn't acquired.
+
+        Arguments:
+            source: The table to rewrite.
+            columns: The types of the copied columns by their names.
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            lock_timeout: The lock timeout of the swap.
+
+        Returns:
+            The names of the foreign keys to validate.
+        """
+        for attempt in range(1, SWAP_ATTEMPTS + 1):
+            try:
+                return await self.swap_tables(
+                    source=source,
+                    columns=columns,
+                    migration_file=migration_file,
+                    migration_table=migration_table,
+                    lock_timeout=lock_timeout,
+                )
+            except LockNotAvailableError:
+                if attempt == SWAP_ATTEMPTS:
+                    raise
+                self.logger.warning(
+                    f"{source.qualified} couldn't be locked in {lock_timeout}. "
+                    f"Retrying the swap ({attempt}/{SWAP_ATTEMPTS})."
+                )
+                await asyncio.sleep(SWAP_DELAY)
+        raise ValueError("SWAP_ATTEMPTS must be positive.")
+
+    async def swap_tables(
+        self,
+        source: RewriteTable,
+        columns: dict[str, str],
+        migration_file: str,
+        migration_table: str,
+        lock_timeout: str,
+    ) -> list[str]:
+        """Replace the table with the shadow table and record the migration.
+
+        The sequences of the columns are moved to the shadow table, its
+        indexes get the names of the matching indexes of the table, and the
+        foreign keys of the table are added to it without validating them.
+        The owner, the privileges, the row level security, the policies and
+        the triggers of the table are given to the shadow table once it is
+        renamed, so the triggers don't run while the rows are copied.
+
+        Arguments:
+            source: The table to rewrite.
+            columns: The types of the copied columns by their names.
+            migration_file: The name of the migration file.
+            migration_table: The name of the migration table.
+            lock_timeout: The lock timeout of the swap.
+
+        Returns:
+            The names of the foreign keys to validate.
+        """
+        async with self.database() as connection:
+            await connection.execute(
+                "SELECT set_config('lock_timeout', $1, true)", lock_timeout
+            )
+            await connection.execute(  # nosec
+                f"LOCK TABLE {source.qualified} IN ACCESS EXCLUSIVE MODE"
+            )
+
+            for column in columns:
+                sequence: str | None = await connection.fetchval(
+                    "SELECT pg_get_serial_sequence($1, $2)", source.qualified, column
+                )
+                shadow_sequence: str | None = await connection.fetchval(
+                    "SELECT pg_get_serial_sequence($1, $2)", source.shadow, column
+                )
+                if sequence is not None and shadow_sequence is None:
+                    await connection.execute(  # nosec
+                        f"ALTER SEQUENCE {sequence} OWNED BY "
+                        f"{source.shadow}.{quote_identifier(column)}"
+                    )
+                elif sequence is not None and shadow_sequence != sequence:
+                    await connection.execute(  # nosec
+                        "SELECT setval(to_regclass($1), last_value, is_called) "
+                        f"FROM {sequence}",
+                        shadow_sequence,
+                    )
+
+            foreign_keys = await connection.fetch(FOREIGN_KEYS_QUERY, source.qualified)
+            indexes: dict[tuple[bool, str], str] = {
+                (record["indisunique"], record["definition"]): record["relname"]
+                for record in await connection.fetch(INDEXES_QUERY, source.qualified)
+            }
+            renames: list[tuple[str, str]] = []
+            for record in await connection.fetch(INDEXES_QUERY, source.shadow):
+                key: tuple[bool, str] = (record["indisunique"], record["definition"])
+                if key in indexes:
+                    renames.append((record["relname"], indexes.pop(key)))
+            setup_queries: list[str] = [
+                record["query"]
+                for record in await connection.fetch(
+                    TABLE_SETUP_QUERY, source.qualified, source.shadow, TRIGGER_NAME
+                )
+            ]
+
+            await connection.execute(  # nosec
+                f"DROP TABLE {source.qualified}; "
+                f"DROP FUNCTION {source.function}(); "
+                f"ALTER TABLE {source.shadow} RENAME TO {quote_identifier(source.name)}"
+            )
+            for shadow_name, name in renames:
+                await connection.execute(  # nosec
+                    f"ALTER INDEX {source.qualify(shadow_name)} "
+                    f"RENAME TO {quote_identifier(name)}"
+                )
+            for query in setup_queries:
+                await connection.execute(query)
+            for foreign_key in foreign_keys:
+                await connection.execute(  # nosec
+                    f"ALTER TABLE {source.qualified} ADD CONSTRAINT "
+                    f"{quote_identifier(foreign_key['conname'])} "
+                    f"{foreign_key['definition']} NOT VALID"
+                )
+            await connection.execute(
+                str(
+                    Query.into(Table(migration_table))
+                    .columns("date", "name")
+                    .insert(datetime.now(tz=timezone.utc), migration_file)
+                )
+            )
+        return [foreign_key["conname"] for foreign_key in foreign_keys]
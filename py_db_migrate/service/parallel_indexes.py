@@ -0,0 +1,213 @@
+"""Parallel index build service module."""
+import asyncio
+from time import perf_counter
+from typing import Iterator
+
+from pydantic import validate_call
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service import EmptyFileError, IndexBuildError
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.sql_parser import (
+    SqlStatement,
+    get_indexed_table,
+    split_sql_statements,
+)
+from py_db_migrate.service.utils import quote_identifier
+
+# The settings which can be given by directives for the build sessions.
+SESSION_SETTINGS: dict[str, str] = {
+    "maintenance-work-mem": "maintenance_work_mem",
+    "max-parallel-maintenance-workers": "max_parallel_maintenance_workers",
+}
+
+# The indexes of the tables which are left invalid by failed or canceled
+# concurrent builds.
+INVALID_INDEXES_QUERY: str = (
+    "SELECT i.indexrelid::regclass::text AS name FROM pg_index i "
+    "WHERE NOT i.indisvalid "
+    "AND i.indrelid IN (SELECT to_regclass(t) FROM unnest($1::text[]) t)"
+)
+
+
+def get_index_build_chains(
+    migration_file: str, statements: list[SqlStatement]
+) -> list[list[SqlStatement]]:
+    """Group the index builds which can run at the same time.
+
+    Concurrent builds on the same table wait for each other, so they are
+    chained to run one after another. Every other build is a chain by
+    itself.
+
+    Arguments:
+        migration_file: The name of the migration file.
+        statements: The statements of the file.
+
+    Returns:
+        The chains of the statements in the order of the file.
+
+    Raises:
+        IndexBuildError: If a statement doesn't create an index.
+    """
+    chains: dict[str, list[SqlStatement]] = {}
+    for position, statement in enumerate(statements):
+        indexed_table: tuple[str, bool] | None = get_indexed_table(statement)
+        if indexed_table is None:
+            raise IndexBuildError(
+                f"{migration_file}:{statement.line} isn't a CREATE INDEX statement. "
+                "Files which build indexes in parallel can only create indexes."
+            )
+        table, concurrently = indexed_table
+        key: str = table if concurrently else f"\0{position}"
+        chains.setdefault(key, []).append(statement)
+    return list(chains.values())
+
+
+class ParallelIndexBuilder(SqlService):
+    """ParallelIndexBuilder service class."""
+
+    @validate_call
+    async def __call__(
+        self,
+        migration_file: str,
+        contents: str,
+        parallelism: int,
+        settings: dict[str, str] | None = None,
+    ) -> None:
+        """Build the indexes of a migration file over several connections.
+
+        Each build runs outside of a transaction on one of the connections,
+        so `CREATE INDEX CONCURRENTLY` can be used. The connections use the
+        search path of the database, so the unqualified tables are found in
+        its schemas. If a build fails, the other builds are canceled, and the
+        invalid indexes which the concurrent builds leave are dropped. The
+        indexes which are built before stay, so the statements should use
+        `IF NOT EXISTS` to be run again.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            contents: SQL commands of the migration file.
+            parallelism: The maximum number of connections.
+            settings: The settings of each connection by their names.
+
+        Returns:
+            None.
+
+        Raises:
+            EmptyFileError: When the file doesn't include any SQL command.
+            IndexBuildError: If a statement doesn't create an index.
+        """
+        statements: list[SqlStatement] = split_sql_statements(contents)
+        if not statements:
+            raise EmptyFileError(f"{migration_file} doesn't include any command.")
+        chains: list[list[SqlStatement]] = get_index_build_chains(
+            migration_file=migration_file, statements=statements
+        )
+        tables: list[str] = sorted(
+            {
+                ".".join(quote_identifier(part) for part in table.split("."))
+                for table, concurrently in map(get_indexed_table, statements)
+                if concurrently
+            }
+        )
+        try:
+            database: Sql = self.database.clone()
+        except ValueError as e:
+            raise IndexBuildError(
+                f"{migration_file} can't build the indexes in parallel. {e}"
+            )
+        invalid_indexes: set[str] = (
+            await self.get_invalid_indexes(database=database, tables=tables)
+            if tables
+            else set()
+        )
+        pending: Iterator[list[SqlStatement]] = iter(chains)
+        workers: list[asyncio.Task] = [
+            asyncio.create_task(
+                self.run_worker(
+                    migration_file=migration_file,
+                    chains=pending,
+                    settings=settings or {},
+                )
+            )
+            for _ in range(max(1, min(parallelism, len(chains))))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if tables:
+                await self.drop_invalid_indexes(
+                    database=database, tables=tables, kept=invalid_indexes
+                )
+            raise
+
+    @staticmethod
+    async def get_invalid_indexes(database: Sql, tables: list[str]) -> set[str]:
+        """Get the invalid indexes of the tables.
+
+        Arguments:
+            database: The database to query on a new connection.
+            tables: The quoted names of the tables.
+
+        Returns:
+            The names of the indexes.
+        """
+        async with database.session() as connection:
+            records = await connection.fetch(INVALID_INDEXES_QUERY, tables)
+        return {record["name"] for record in records}
+
+    async def drop_invalid_indexes(
+        self, database: Sql, tables: list[str], kept: set[str]
+    ) -> None:
+        """Drop the invalid indexes of the failed and canceled builds.
+
+        A concurrent build leaves its index invalid if it fails, and
+        `IF NOT EXISTS` would skip it when the file is run again.
+
+        Arguments:
+            database: The database to query on a new connection.
+            tables: The quoted names of the tables of the concurrent builds.
+            kept: The invalid indexes which existed before the builds.
+
+        Returns:
+            None.
+        """
+        for index in await self.get_invalid_indexes(database=database, tables=tables):
+            if index in kept:
+                continue
+            await database.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+            self.logger.warning(f"Invalid index {index} is dropped.")
+
+    async def run_worker(
+        self,
+        migration_file: str,
+        chains: Iterator[list[SqlStatement]],
+        settings: dict[str, str],
+    ) -> None:
+        """Build the indexes of the chains one by one on a new connection.
+
+        Arguments:
+            migration_file: The name of the migration file.
+            chains: The shared iterator of the pending chains.
+            settings: The settings of the connection by their names.
+
+        Returns:
+            None.
+        """
+        database: Sql = self.database.clone()
+        async with database.session() as connection:
+            for name, value in settings.items():
+                await connection.execute(
+                    "SELECT set_config($1, $2, false)", name, value
+                )
+            for chain in chains:
+                for statement in chain:
+                    start: float = perf_counter()
+                    await connection.execute(statement.query)
+                    self.logger.info(
+                        f"{migration_file}:{statement.line} is built in "
+                        f"{perf_counter() - start:.1f} s."
+                    )
@@ -0,0 +1,89 @@
+"""Replica lag throttle service module."""
+import asyncio
+from time import perf_counter
+
+from asyncpg import connect
+from pydantic import PrivateAttr
+
+from py_db_migrate.service.service import SqlService
+
+POLL_INTERVAL: float = 1.0
+
+# The replay lag of an idle standby is NULL, so it is counted as no lag.
+PRIMARY_LAG_QUERY: str = (
+    "SELECT COALESCE(max(EXTRACT(EPOCH FROM replay_lag)), 0)::float8 "
+    "FROM pg_stat_replication"
+)
+REPLICA_LAG_QUERY: str = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END::float8"
+)
+
+
+class ReplicaLagThrottle(SqlService):
+    """ReplicaLagThrottle service class.
+
+    Attributes:
+        max_lag: The replication lag in seconds to wait for.
+        replicas: The DSNs of the replicas to check. If it is empty, the lag
+            is read from pg_stat_replication of the primary.
+        interval: Seconds between two checks while waiting.
+    """
+
+    max_lag: float
+    replicas: list[str] = []
+    interval: float = POLL_INTERVAL
+
+    _waited: float = PrivateAttr(default=0.0)
+
+    @property
+    def waited(self) -> float:
+        """The total seconds spent waiting for the replicas."""
+        return self._waited
+
+    async def __call__(self, before: str) -> float:
+        """Wait until the replication lag falls under the maximum lag.
+
+        Arguments:
+            before: The description of the next step for the logs.
+
+        Returns:
+            The seconds spent waiting.
+        """
+        start: float = perf_counter()
+        lag: float = await self.get_lag()
+        if lag <= self.max_lag:
+            return 0.0
+
+        self.logger.info(
+            f"Replication lag is {lag:.1f} s. Waiting before {before} until it is "
+            f"under {self.max_lag:g} s."
+        )
+        while lag > self.max_lag:
+            await asyncio.sleep(self.interval)
+            lag = await self.get_lag()
+        waited: float = perf_counter() - start
+        self._waited += waited
+        self.logger.info(f"Waited {waited:.1f} s for the replicas.")
+        return waited
+
+    async def get_lag(self) -> float:
+        """Get the replication lag of the slowest replica.
+
+        Returns:
+            The lag in seconds.
+        """
+        if not self.replicas:
+            async with self.database.session() as connection:
+                return await connection.fetchval(PRIMARY_LAG_QUERY)
+
+        lags: list[float] = []
+        for dsn in self.replicas:
+            connection = await connect(dsn)
+            try:
+                lags.append(await connection.fetchval(REPLICA_LAG_QUERY))
+            finally:
+                await connection.close()
+        return max(lags)
@@ -0,0 +1,711 @@
+"""SQL parsing helpers of the service layer."""
+import re
+from enum import IntEnum
+from io import StringIO
+
+from pydantic import BaseModel, validate_call
+
+DOLLAR_QUOTE_PATTERN: re.Pattern = re.compile(r"\$([A-Za-z_][A-Za-z_0-9]*)?\$")
+KEYWORD_PATTERN: re.Pattern = re.compile(r"[A-Za-z_]+")
+DIRECTIVE_PATTERN: re.Pattern = re.compile(r"--\s*py-db-migrate:([\w-]+)\s*(.*?)\s*$")
+
+IDENTIFIER: str = r'((?:"[^"]+"|[\w$]+)(?:\.(?:"[^"]+"|[\w$]+))?)'
+ALTER_TABLE_PATTERN: re.Pattern = re.compile(
+    r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?" + IDENTIFIER,
+    re.IGNORECASE | re.DOTALL,
+)
+VOLATILE_DEFAULT_PATTERN: re.Pattern = re.compile(
+    r"\bDEFAULT\s+\(?\s*(?:RANDOM|CLOCK_TIMESTAMP|TIMEOFDAY|GEN_RANDOM_UUID|"
+    r"UUID_GENERATE_\w+|NEXTVAL)\s*\(",
+    re.IGNORECASE,
+)
+
+
+STATEMENT_KEYWORDS: frozenset[str] = frozenset(
+    (
+        "ABORT ALTER ANALYZE BEGIN CALL CHECKPOINT CLOSE CLUSTER COMMENT COMMIT "
+        "COPY CREATE DEALLOCATE DECLARE DELETE DISCARD DO DROP END EXECUTE "
+        "EXPLAIN FETCH GRANT IMPORT INSERT LISTEN LOAD LOCK MERGE MOVE NOTIFY "
+        "PREPARE REASSIGN REFRESH REINDEX RELEASE RESET REVOKE ROLLBACK SAVEPOINT "
+        "SECURITY SELECT SET SHOW START TABLE TRUNCATE UNLISTEN UPDATE VACUUM "
+        "VALUES WITH"
+    ).split()
+)
+
+
+class LockLevel(IntEnum):
+    """Table lock levels of PostgreSQL from the weakest to the strongest."""
+
+    NONE = 0
+    ACCESS_SHARE = 1
+    ROW_SHARE = 2
+    ROW_EXCLUSIVE = 3
+    SHARE_UPDATE_EXCLUSIVE = 4
+    SHARE = 5
+    SHARE_ROW_EXCLUSIVE = 6
+    EXCLUSIVE = 7
+    ACCESS_EXCLUSIVE = 8
+
+    @property
+    def label(self) -> str:
+        """Return the name of the lock level as PostgreSQL writes it."""
+        return self.name.replace("_", " ")
+
+
+class SqlStatement(BaseModel):
+    """SqlStatement model.
+
+    Attributes:
+        query: The text of the statement without the trailing semicolon.
+        line: The line number where the statement starts in its file.
+    """
+
+    query: str
+    line: int
+
+    @property
+    def keyword(self) -> str:
+        """Return the first keyword of the statement in upper case."""
+        match = KEYWORD_PATTERN.match(self.query)
+        return match.group(0).upper() if match else ""
+
+
+class StatementImpact(BaseModel):
+    """StatementImpact model.
+
+    Attributes:
+        statement: The classified statement.
+        lock: The strongest table lock that the statement takes.
+        rewrite: Whether the statement rewrites the whole table.
+        scan: Whether the statement reads the whole table while locking it.
+        tables: The existing tables that the statement touches.
+    """
+
+    statement: SqlStatement
+    lock: LockLevel
+    rewrite: bool = False
+    scan: bool = False
+    tables: list[str] = []
+
+
+def _is_identifier_character(character: str) -> bool:
+    """Check whether the given character can be a part of an identifier."""
+    return character.isalnum() or character in "_$"
+
+
+def _skip_block_comment(contents: str, position: int) -> int:
+    """Return the position after the block comment starting at position.
+
+    Block comments can be nested in PostgreSQL. If the comment isn't
+    terminated, the position after the end of the contents is returned.
+    """
+    depth: int = 0
+    length: int = len(contents)
+    while position < length:
+        if contents.startswith("/*", position):
+            depth += 1
+            position += 2
+        elif contents.startswith("*/", position):
+            depth -= 1
+            position += 2
+            if not depth:
+                return position
+        else:
+            position += 1
+    return length + 1
+
+
+def _skip_quoted(contents: str, position: int, quote: str, escapes: bool) -> int:
+    """Return the position after the quoted literal starting at position.
+
+    Doubled quotes are treated as a part of the literal. If escapes is True,
+    backslashes escape the next character as in E'' strings. If the literal
+    isn't terminated, the position after the end of the contents is returned.
+    """
+    position += 1
+    length: int = len(contents)
+    while position < length:
+        character: str = contents[position]
+        if escapes and character == "\\":
+            position += 2
+        elif character == quote:
+            if contents.startswith(quote, position + 1):
+                position += 2
+            else:
+                return position + 1
+        else:
+            position += 1
+    return length + 1
+
+
+def _has_escapes(contents: str, position: int) -> bool:
+    """Check whether the quote at position starts an E'' string."""
+    previous: str = contents[position - 1] if position else ""
+    return previous in ("e", "E") and not (
+        position > 1 and _is_identifier_character(contents[position - 2])
+    )
+
+
+def _split_sql(
+    contents: str, line: int = 1
+) -> tuple[list[SqlStatement], SqlStatement | None, int]:
+    """Split the given SQL text into statements.
+
+    Arguments:
+        contents: SQL text to split.
+        line: The line number of the first line of the text.
+
+    Returns:
+        The statements which are terminated by a semicolon, the trailing
+        statement without a semicolon if there is any, and the position after
+        the last semicolon which terminates a statement.
+    """
+    statements: list[SqlStatement] = []
+    start: int | None = None
+    counted_until: int = 0
+    terminated_until: int = 0
+    position: int = 0
+    length: int = len(contents)
+
+    while position < length:
+        character: str = contents[position]
+
+        if contents.startswith("--", position):
+            end: int = contents.find("\n", position)
+            position = length if end == -1 else end
+            continue
+        if contents.startswith("/*", position):
+            position = _skip_block_comment(contents, position)
+            continue
+        if character == ";":
+            if start is not None:
+                line += contents.count("\n", counted_until, start)
+                counted_until = start
+                statements.append(
+                    SqlStatement(query=contents[start:position].strip(), line=line)
+                )
+                start = None
+            position += 1
+            terminated_until = position
+            continue
+
+        if start is None and not character.isspace():
+            start = position
+
+        previous: str = contents[position - 1] if position else ""
+        if character == "'":
+            position = _skip_quoted(
+                contents, position, "'", escapes=_has_escapes(contents, position)
+            )
+        elif character == '"':
+            position = _skip_quoted(contents, position, '"', escapes=False)
+        elif character == "$" and not _is_identifier_character(previous):
+            match = DOLLAR_QUOTE_PATTERN.match(contents, position)
+            if match:
+                end = contents.find(match.group(0), match.end())
+                position = length if end == -1 else end + len(match.group(0))
+            else:
+                position += 1
+        else:
+            position += 1
+
+    trailing: SqlStatement | None = None
+    if start is not None and contents[start:].strip():
+        line += contents.count("\n", counted_until, start)
+        trailing = SqlStatement(query=contents[start:].strip(), line=line)
+
+    return statements, trailing, terminated_until
+
+
+@validate_call
+def split_sql_statements(contents: str) -> list[SqlStatement]:
+    """Split the given SQL text into statements.
+
+    Semicolons inside string literals, quoted identifiers, dollar quoted
+    bodies and comments don't end a statement. Statements which consist of
+    comments only are skipped.
+
+    Arguments:
+        contents: SQL text to split.
+
+    Returns:
+        The statements in the order they appear in the text.
+    """
+    statements, trailing, _ = _split_sql(contents)
+    if trailing is not None:
+        statements.append(trailing)
+    return statements
+
+
+class SqlStatementSplitter:
+    """Split SQL text into statements while it is read chunk by chunk.
+
+    Only the text after the last terminated statement is kept in memory, and
+    it is scanned again only when a new chunk has a semicolon.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty splitter."""
+        self._chunks: list[str] = []
+        self._line: int = 1
+
+    def feed(self, chunk: str) -> list[SqlStatement]:
+        """Add the next chunk of the text.
+
+        Arguments:
+            chunk: The next part of the text.
+
+        Returns:
+            The statements which are terminated in the text so far.
+        """
+        self._chunks.append(chunk)
+        if ";" not in chunk:
+            return []
+
+        contents: str = "".join(self._chunks)
+        statements, _, end = _split_sql(contents, line=self._line)
+        self._line += contents.count("\n", 0, end)
+        self._chunks = [contents[end:]]
+        return statements
+
+    def close(self) -> list[SqlStatement]:
+        """Finish the text.
+
+        Returns:
+            The trailing statement without a semicolon if there is any.
+        """
+        contents: str = "".join(self._chunks)
+        self._chunks = []
+        _, trailing, _ = _split_sql(contents, line=self._line)
+        return [] if trailing is None else [trailing]
+
+
+@validate_call
+def find_syntax_errors(contents: str) -> list[tuple[int, str]]:
+    """Find the syntax errors which can be detected without a database.
+
+    Unterminated comments, literals and dollar quoted bodies, unbalanced
+    parentheses and statements which don't start with a known command are
+    detected. The statements are not parsed further.
+
+    Arguments:
+        contents: SQL text to check.
+
+    Returns:
+        The line numbers and the messages of the errors.
+    """
+    errors: list[tuple[int, str]] = []
+    depth: int = 0
+    position: int = 0
+    length: int = len(contents)
+
+    def line_of(index: int) -> int:
+        return contents.count("\n", 0, index) + 1
+
+    while position < length:
+        character: str = contents[position]
+        if contents.startswith("--", position):
+            end: int = contents.find("\n", position)
+            position = length if end == -1 else end
+            continue
+        if contents.startswith("/*", position):
+            end = _skip_block_comment(contents, position)
+            if end > length:
+                errors.append((line_of(position), "Unterminated block comment."))
+                return errors
+            position = end
+            continue
+
+        if character in ("'", '"'):
+            end = _skip_quoted(
+                contents,
+                position,
+                character,
+                escapes=character == "'" and _has_escapes(contents, position),
+            )
+            if end > length:
+                kind: str = "string" if character == "'" else "quoted identifier"
+                errors.append((line_of(position), f"Unterminated {kind}."))
+                return errors
+            position = end
+            continue
+        if character == "$" and not (
+            position and _is_identifier_character(contents[position - 1])
+        ):
+            match = DOLLAR_QUOTE_PATTERN.match(contents, position)
+            if match:
+                end = contents.find(match.group(0), match.end())
+                if end == -1:
+                    errors.append(
+                        (line_of(position), "Unterminated dollar-quoted string.")
+                    )
+                    return errors
+                position = end + len(match.group(0))
+                continue
+
+        if character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+            if depth < 0:
+                errors.append((line_of(position), "Unbalanced parentheses."))
+                depth = 0
+        elif character == ";":
+            if depth:
+                errors.append((line_of(position), "Unbalanced parentheses."))
+                depth = 0
+        position += 1
+
+    if depth:
+        errors.append((line_of(length), "Unbalanced parentheses."))
+
+    errors.extend(
+        (statement.line, f"Unknown command {statement.keyword}.")
+        for statement in split_sql_statements(contents)
+        if statement.keyword and statement.keyword not in STATEMENT_KEYWORDS
+    )
+    return sorted(errors)
+
+
+@validate_call
+def get_created_table(statement: SqlStatement) -> str | None:
+    """Get the name of the table that the statement creates.
+
+    Arguments:
+        statement: Statement to check.
+
+    Returns:
+        The normalized name of the table, or None if the statement doesn't
+        create a table.
+    """
+    match = _search(
+        r"^CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(?:TEMP|TEMPORARY|UNLOGGED)\s+)?"
+        r"TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?" + IDENTIFIER,
+        statement.query,
+    )
+    return _normalize_identifier(match.group(1)) if match else None
+
+
+@validate_call
+def get_indexed_table(statement: SqlStatement) -> tuple[str, bool] | None:
+    """Get the name of the table that the statement creates an index on.
+
+    Arguments:
+        statement: Statement to check.
+
+    Returns:
+        The normalized name of the table and whether the index is built
+        concurrently, or None if the statement doesn't create an index.
+    """
+    match = _search(
+        r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?.*?\bON\s+(?:ONLY\s+)?"
+        f"{IDENTIFIER}",
+        statement.query,
+    )
+    if not match:
+        return None
+    return _normalize_identifier(match.group(2)), bool(match.group(1))
+
+
+@validate_call
+def get_altered_table(statement: SqlStatement) -> str | None:
+    """Get the name of the table that the statement alters.
+
+    Arguments:
+        statement: Statement to check.
+
+    Returns:
+        The normalized name of the table, or None if the statement doesn't
+        alter a table.
+    """
+    match = ALTER_TABLE_PATTERN.match(statement.query)
+    return _normalize_identifier(match.group(1)) if match else None
+
+
+@validate_call
+def get_directives(contents: str) -> dict[str, list[str]]:
+    """Get the directives from the header of a migration file.
+
+    Directives are line comments in `-- py-db-migrate:<name> <value>` format
+    which are placed before the first statement of the file.
+
+    Arguments:
+        contents: The contents of the migration file.
+
+    Returns:
+        The values of the directives by their names.
+    """
+    directives: dict[str, list[str]] = {}
+    for line in StringIO(contents):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("--"):
+            break
+        if match := DIRECTIVE_PATTERN.match(line):
+            directives.setdefault(match.group(1), []).append(match.group(2))
+    return directives
+
+
+def remove_directives(contents: str) -> str:
+    """Remove the directives from the header of a migration file.
+
+    Arguments:
+        contents: The contents of the migration file.
+
+    Returns:
+        The contents without the directive lines before the first statement.
+    """
+    lines: list[str] = []
+    header: bool = True
+    for line in StringIO(contents):
+        stripped: str = line.strip()
+        if stripped and not stripped.startswith("--"):
+            header = False
+        if header and DIRECTIVE_PATTERN.match(stripped):
+            continue
+        lines.append(line)
+    return "".join(lines)
+
+
+def _normalize_identifier(identifier: str) -> str:
+    """Lower unquoted parts of the identifier and remove the quotes."""
+    return ".".join(
+        part[1:-1] if part.startswith('"') else part.lower()
+        for part in re.findall(r'"[^"]+"|[^.]+', identifier)
+    )
+
+
+def _search(pattern: str, query: str) -> re.Match | None:
+    """Search the pattern in the query by ignoring case and whitespace."""
+    return re.search(pattern, query, re.IGNORECASE | re.DOTALL)
+
+
+def _split_top_level(text: str) -> list[str]:
+    """Split the text by the commas which are not in parentheses or quotes."""
+    parts: list[str] = []
+    depth: int = 0
+    last: int = 0
+    position: int = 0
+    while position < len(text):
+        character: str = text[position]
+        if character in "'\"":
+            position = _skip_quoted(text, position, character, escapes=False)
+            continue
+        if character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "," and not depth:
+            parts.append(text[last:position].strip())
+            last = position + 1
+        position += 1
+    parts.append(text[last:].strip())
+    return parts
+
+
+def _classify_alter_table_action(action: str) -> tuple[LockLevel, bool, bool, str]:
+    """Classify a single action of an ALTER TABLE statement.
+
+    Returns:
+        The lock level, rewrite and scan flags and the referenced table if
+        the action adds a foreign key.
+    """
+    not_valid: bool = bool(_search(r"\bNOT\s+VALID\b", action))
+
+    if _search(r"^ALTER\s+(?:COLUMN\s+)?\S+\s+(?:SET\s+DATA\s+)?TYPE\b", action):
+        return LockLevel.ACCESS_EXCLUSIVE, True, False, ""
+    if _search(r"^ALTER\s+(?:COLUMN\s+)?\S+\s+SET\s+NOT\s+NULL\b", action):
+        return LockLevel.ACCESS_EXCLUSIVE, False, True, ""
+    if _search(r"^ALTER\s+(?:COLUMN\s+)?\S+\s+SET\s+(?:STATISTICS|\()", action):
+        return LockLevel.SHARE_UPDATE_EXCLUSIVE, False, False, ""
+    if foreign_key := _search(
+        r"^ADD\s+(?:CONSTRAINT\s+\S+\s+)?FOREIGN\s+KEY\b.*?\bREFERENCES\s+"
+        f"{IDENTIFIER}",
+        action,
+    ):
+        return (
+            LockLevel.SHARE_ROW_EXCLUSIVE,
+            False,
+            not not_valid,
+            _normalize_identifier(foreign_key.group(1)),
+        )
+    if _search(r"^ADD\s+(?:CONSTRAINT\s+\S+\s+)?CHECK\b", action):
+        return LockLevel.ACCESS_EXCLUSIVE, False, not not_valid, ""
+    if _search(
+        r"^ADD\s+(?:CONSTRAINT\s+\S+\s+)?(?:PRIMARY\s+KEY|UNIQUE|EXCLUDE)\b", action
+    ):
+        return (
+            LockLevel.ACCESS_EXCLUSIVE,
+            False,
+            not _search(r"\bUSING\s+INDEX\b", action),
+            "",
+        )
+    if _search(r"^ADD\b", action):
+        rewrite: bool = any(
+            (
+                _search(r"\bGENERATED\b.*\bSTORED\b", action),
+                VOLATILE_DEFAULT_PATTERN.search(action),
+            )
+        )
+        return LockLevel.ACCESS_EXCLUSIVE, rewrite, False, ""
+    if _search(r"^VALIDATE\s+CONSTRAINT\b", action):
+        return LockLevel.SHARE_UPDATE_EXCLUSIVE, False, True, ""
+    if _search(
+        r"^(?:SET\s*\(|RESET\s*\(|CLUSTER\s+ON\b|SET\s+WITHOUT\s+CLUSTER)", action
+    ):
+        return LockLevel.SHARE_UPDATE_EXCLUSIVE, False, False, ""
+    if _search(r"^(?:ENABLE|DISABLE)\s+(?:ALWAYS\s+|REPLICA\s+)?TRIGGER\b", action):
+        return LockLevel.SHARE_ROW_EXCLUSIVE, False, False, ""
+    if _search(r"^SET\s+(?:TABLESPACE|LOGGED|UNLOGGED)\b", action):
+        return LockLevel.ACCESS_EXCLUSIVE, True, False, ""
+    return LockLevel.ACCESS_EXCLUSIVE, False, False, ""
+
+
+def _classify_alter_table(
+    statement: SqlStatement, table: str, actions: str
+) -> StatementImpact:
+    """Classify an ALTER TABLE statement by its strongest action."""
+    impact: StatementImpact = StatementImpact(
+        statement=statement, lock=LockLevel.NONE, tables=[table]
+    )
+    for action in _split_top_level(actions):
+        lock, rewrite, scan, referenced_table = _classify_alter_table_action(action)
+        impact.lock = max(impact.lock, lock)
+        impact.rewrite = impact.rewrite or rewrite
+        impact.scan = impact.scan or scan
+        if referenced_table and referenced_table not in impact.tables:
+            impact.tables.append(referenced_table)
+    return impact
+
+
+@validate_call
+def classify_statement(statement: SqlStatement) -> StatementImpact:
+    """Classify the given statement by its table lock and rewrite risk.
+
+    The classification is static. It follows the lock levels that are
+    documented by PostgreSQL for each command and doesn't connect to db.
+
+    Arguments:
+        statement: Statement to classify.
+
+    Returns:
+        The impact of the statement on the tables that it touches.
+    """
+    query: str = statement.query
+    only: str = r"(?:ONLY\s+)?"
+    if_exists: str = r"(?:IF\s+EXISTS\s+)?"
+
+    if match := _search(
+        r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?.*?\bON\s+"
+        f"{only}{IDENTIFIER}",
+        query,
+    ):
+        return StatementImpact(
+            statement=statement,
+            lock=(
+                LockLevel.SHARE_UPDATE_EXCLUSIVE if match.group(1) else LockLevel.SHARE
+            ),
+            scan=True,
+            tables=[_normalize_identifier(match.group(2))],
+        )
+    if match := _search(r"^DROP\s+INDEX\s+(CONCURRENTLY\s+)?" + if_exists, query):
+        return StatementImpact(
+            statement=statement,
+            lock=(
+                LockLevel.SHARE_UPDATE_EXCLUSIVE
+                if match.group(1)
+                else LockLevel.ACCESS_EXCLUSIVE
+            ),
+        )
+    if match := _search(
+        r"^REINDEX\s+(?:\(.*?\)\s*)?(?:TABLE|INDEX)\s+(CONCURRENTLY\s+)?" + IDENTIFIER,
+        query,
+    ):
+        return StatementImpact(
+            statement=statement,
+            lock=(
+                LockLevel.SHARE_UPDATE_EXCLUSIVE if match.group(1) else LockLevel.SHARE
+            ),
+            scan=True,
+            tables=[_normalize_identifier(match.group(2))],
+        )
+    if match := _search(
+        r"^ALTER\s+TABLE\s+" + if_exists + only + IDENTIFIER + r"\s*\*?\s*", query
+    ):
+        end: int = match.end()
+        return _classify_alter_table(
+            statement=statement,
+            table=_normalize_identifier(match.group(1)),
+            actions=query[end:],
+        )
+    if match := _search(
+        r"^(?:VACUUM\s+(?:\([^)]*\bFULL\b[^)]*\)|FULL\b(?:\s+(?:FREEZE|VERBOSE|"
+        r"ANALYZE)\b)*)|CLUSTER(?:\s+VERBOSE)?\b)\s*(?!USING\b)" + IDENTIFIER + "?",
+        query,
+    ):
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel.ACCESS_EXCLUSIVE,
+            rewrite=True,
+            tables=[_normalize_identifier(match.group(1))] if match.group(1) else [],
+        )
+    if match := _search(
+        r"^REFRESH\s+MATERIALIZED\s+VIEW\s+(CONCURRENTLY\s+)?" + IDENTIFIER, query
+    ):
+        return StatementImpact(
+            statement=statement,
+            lock=(
+                LockLevel.EXCLUSIVE if match.group(1) else LockLevel.ACCESS_EXCLUSIVE
+            ),
+            rewrite=True,
+            tables=[_normalize_identifier(match.group(2))],
+        )
+    if match := _search(r"^TRUNCATE\s+(?:TABLE\s+)?" + only + IDENTIFIER, query):
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel.ACCESS_EXCLUSIVE,
+            tables=[_normalize_identifier(match.group(1))],
+        )
+    if match := _search(
+        r"^DROP\s+(?:TABLE|MATERIALIZED\s+VIEW)\s+" + if_exists + IDENTIFIER, query
+    ):
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel.ACCESS_EXCLUSIVE,
+            tables=[_normalize_identifier(match.group(1))],
+        )
+    if match := _search(
+        r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:CONSTRAINT\s+)?TRIGGER\b.*?"
+        r"\bON\s+" + IDENTIFIER,
+        query,
+    ):
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel.SHARE_ROW_EXCLUSIVE,
+            tables=[_normalize_identifier(match.group(1))],
+        )
+    if match := _search(
+        r"^LOCK\s+(?:TABLE\s+)?" + only + IDENTIFIER + r"(?:\s+IN\s+(.*?)\s+MODE)?",
+        query,
+    ):
+        mode: str = (match.group(2) or "ACCESS EXCLUSIVE").upper()
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel[re.sub(r"\s+", "_", mode)],
+            tables=[_normalize_identifier(match.group(1))],
+        )
+    if match := _search(r"^(?:UPDATE\s+|DELETE\s+FROM\s+)" + only + IDENTIFIER, query):
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel.ROW_EXCLUSIVE,
+            scan=True,
+            tables=[_normalize_identifier(match.group(1))],
+        )
+    if match := _search(r"^INSERT\s+INTO\s+" + IDENTIFIER, query):
+        return StatementImpact(
+            statement=statement,
+            lock=LockLevel.ROW_EXCLUSIVE,
+            tables=[_normalize_identifier(match.group(1))],
+        )
+    return StatementImpact(statement=statement, lock=LockLevel.NONE)
@@ -0,0 +1,205 @@
+"""Template database service module."""
+from hashlib import sha256
+from pathlib import Path
+
+from asyncpg.exceptions import PostgresError
+from pydantic import validate_call
+
+from py_db_migrate.database import Sql
+from py_db_migrate.service.migration_up import MigrationUp
+from py_db_migrate.service.service import SqlService
+from py_db_migrate.service.utils import (
+    get_migration_folder_checksum,
+    quote_identifier,
+)
+
+TEMPLATE_PREFIX: str = "pydbmigrate_template_"
+
+STALE_TEMPLATES_QUERY: str = (
+    "SELECT datname FROM pg_database WHERE datname LIKE $1 AND datname <> $2"
+)
+
+
+def get_template_prefix(migration_folder: Path, migration_table: str) -> str:
+    """Get the prefix of the template databases of a project.
+
+    The projects are told apart by the path of their migration folder and
+    the name of their migration table. So, the projects, checkouts and CI
+    jobs which share a server don't drop the templates of each other.
+
+    Arguments:
+        migration_folder: Migration folder path.
+        migration_table: The name of the table that holds migrated files.
+
+    Returns:
+        The prefix which is followed by the checksum of the folder.
+    """
+    project: str = sha256(
+        f"{migration_folder.resolve()}\0{migration_table}".encode()
+    ).hexdigest()
+    return f"{TEMPLATE_PREFIX}{project[:8]}_"
+
+
+class TemplateDatabase(SqlService):
+    """TemplateDatabase service class.
+
+    The database of the service is used as the maintenance database which
+    the template and the new databases are created from.
+    """
+
+    @validate_call
+    async def __call__(self, migration_folder: Path, migration_table: str) -> str:
+        """Get the template database of the migration folder.
+
+        The name of the template includes the checksum of the migration
+        folder. So, a change in any migration file invalidates the cache. If
+        the template doesn't exist, it is migrated into a temporary database
+        which is renamed when all migrations succeed, and the templates of the
+        older folder contents of the same project are dropped. An advisory
+        lock keeps the parallel workers of the project from building the same
+        template at the same time.
+
+        Arguments:
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            The name of the template database.
+
+        Raises:
+            FolderNotFoundError: If the migration folder couldn't be found.
+            MigrationError: If the problem occurs while migrating.
+        """
+        checksum: str = await get_migration_folder_checksum(folder=migration_folder)
+        prefix: str = get_template_prefix(
+            migration_folder=migration_folder, migration_table=migration_table
+        )
+        template: str = f"{prefix}{checksum[:16]}"
+
+        async with self.database.session() as connection:
+            await connection.execute("SELECT pg_advisory_lock(hashtext($1))", prefix)
+            try:
+                if await self.check_existence_of_database(name=template):
+                    self.logger.info(f"Template database {template} is reused.")
+                    return template
+
+                await self.drop_stale_templates(template=template, prefix=prefix)
+                await self.build_template(
+                    template=template,
+                    migration_folder=migration_folder,
+                    migration_table=migration_table,
+                )
+            finally:
+                await connection.execute(
+                    "SELECT pg_advisory_unlock(hashtext($1))", prefix
+                )
+        self.logger.info(f"Template database {template} is created.")
+        return template
+
+    @validate_call
+    async def create_database(self, name: str, template: str) -> None:
+        """Create a migrated database by copying the template database.
+
+        Arguments:
+            name: The name of the new database.
+            template: The name of the template database.
+
+        Returns:
+            None.
+        """
+        await self.database.execute(
+            f"CREATE DATABASE {quote_identifier(name)} "
+            f"TEMPLATE {quote_identifier(template)}"
+        )
+        self.logger.info(f"Database {name} is created from {template}.")
+
+    @validate_call
+    async def drop_database(self, name: str) -> None:
+        """Drop the given database if it exists.
+
+        Arguments:
+            name: The name of the database.
+
+        Returns:
+            None.
+        """
+        await self.database.execute(f"DROP DATABASE IF EXISTS {quote_identifier(name)}")
+
+    @validate_call
+    async def check_existence_of_database(self, name: str) -> bool:
+        """Check whether the given database exists or not.
+
+        Arguments:
+            name: The name of the database.
+
+        Returns:
+            True if exists. Otherwise, False.
+        """
+        async with self.database.session() as connection:
+            return bool(
+                await connection.fetchval(
+                    "SELECT 1 FROM pg_database WHERE datname = $1", name
+                )
+            )
+
+    @validate_call
+    async def build_template(
+        self, template: str, migration_folder: Path, migration_table: str
+    ) -> None:
+        """Migrate a new database and mark it as the template.
+
+        Arguments:
+            template: The name of the template database.
+            migration_folder: Migration folder path.
+            migration_table: The name of the table that holds migrated files.
+
+        Returns:
+            None.
+        """
+        build: str = f"{template}_build"
+        await self.drop_database(name=build)
+        await self.database.execute(f"CREATE DATABASE {quote_identifier(build)}")
+        try:
+            build_database: Sql = self.database.clone(name=build)
+            await MigrationUp(database=build_database)(
+                migration_folder=migration_folder, migration_table=migration_table
+            )
+        except Exception:
+            await self.drop_database(name=build)
+            raise
+
+        await self.database.execute(
+            f"ALTER DATABASE {quote_identifier(build)} "
+            f"RENAME TO {quote_identifier(template)}"
+        )
+        await self.database.execute(
+            f"ALTER DATABASE {quote_identifier(template)} IS_TEMPLATE true"
+        )
+
+    @validate_call
+    async def drop_stale_templates(self, template: str, prefix: str) -> None:
+        """Drop the templates of the project built from other folder contents.
+
+        Arguments:
+            template: The name of the current template database to keep.
+            prefix: The prefix of the template databases of the project.
+
+        Returns:
+            None.
+        """
+        pattern: str = prefix.replace("_", "\\_") + "%"
+        async with self.database.session() as connection:
+            records = await connection.fetch(STALE_TEMPLATES_QUERY, pattern, template)
+        for row in records:
+            stale_template: str = quote_identifier(row["datname"])
+            try:
+                await self.database.execute(
+                    f"ALTER DATABASE {stale_template} IS_TEMPLATE false"
+                )
+                await self.database.execute(f"DROP DATABASE {stale_template}")
+                self.logger.info(f"Template database {row['datname']} is dropped.")
+            except PostgresError as e:
+                self.logger.warning(
+                    f"Template database {row['datname']} couldn't be dropped. "
+                    f"`{str(e)}`"
+                )
@@ -1,9 +1,29 @@
 """Utils functions of the service layer."""
+import asyncio
+import gzip
+import importlib.util
+import inspect
+import io
+from hashlib import sha256
 from pathlib import Path
+from posix import DirEntry
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Iterable, cast
 
+import aiofiles
 import aiofiles.os
 from pydantic import validate_call
 
+from py_db_migrate.service import DuplicateMigrationError, EmptyFileError
+from py_db_migrate.service.bundle import get_migration_bundle, is_migration_bundle
+from py_db_migrate.service.sql_parser import SqlStatement, SqlStatementSplitter
+
+COMPRESSED_FILE_EXTENSIONS: tuple[str, ...] = (".sql.gz", ".sql.zst")
+MIGRATION_FILE_EXTENSIONS: tuple[str, ...] = (
+    ".sql",
+    ".py",
+) + COMPRESSED_FILE_EXTENSIONS
+READ_CHUNK_SIZE: int = 1024**2
+
 
 @validate_call
 async def check_existence_of_file(path: Path) -> bool:
@@ -16,3 +36,363 @@ async def check_existence_of_file(path: Path) -> bool:
         True if file exists. Otherwise, False.
     """
     return await aiofiles.os.path.exists(path)
+
+
+@validate_call
+async def get_migration_file_names(folder: Path) -> tuple[str, ...]:
+    """Get the names of the up migration files in the given folder.
+
+    SQL, compressed SQL and Python migration files are included. If the
+    folder is a bundle, only its index is read.
+
+    Arguments:
+        folder: Folder or bundle to search migration files.
+
+    Returns:
+        The sorted names of the up migration files without their extension.
+
+    Raises:
+        DuplicateMigrationError: If a migration has up files with different
+            extensions.
+    """
+    file_names: dict[str, str] = {}
+    for file_name in await get_migration_file_entries(folder=folder):
+        for extension in MIGRATION_FILE_EXTENSIONS:
+            if file_name.endswith(f"-up{extension}"):
+                name: str = file_name[: -len(extension)]
+                if name in file_names:
+                    raise DuplicateMigrationError(
+                        f"{name} has both {file_names[name]} and {file_name}. "
+                        "Keep only one of them."
+                    )
+                file_names[name] = file_name
+                break
+    return tuple(sorted(file_names))
+
+
+@validate_call
+async def get_migration_file_entries(folder: Path) -> list[str]:
+    """Get the names of all migration files with their extensions.
+
+    Arguments:
+        folder: Migration folder or bundle path.
+
+    Returns:
+        The sorted names of the up and down migration files.
+    """
+    if await aiofiles.os.path.isfile(folder):
+        names: list[str] = get_migration_bundle(folder).names
+    else:
+        entries: Iterable[DirEntry] = await aiofiles.os.scandir(path=folder)
+        names = [entry.name for entry in entries if entry.is_file()]
+    return sorted(name for name in names if name.endswith(MIGRATION_FILE_EXTENSIONS))
+
+
+@validate_call
+async def get_migration_file_path(folder: Path, name: str) -> Path:
+    """Find the path of a migration file by its name.
+
+    The files of a bundle are looked up in its index, and their paths are
+    under the path of the bundle.
+
+    Arguments:
+        folder: Migration folder or bundle path.
+        name: The name of the migration file without its extension.
+
+    Returns:
+        The path of the SQL, the Python or the compressed SQL migration file.
+
+    Raises:
+        FileNotFoundError: If the file couldn't be found.
+    """
+    if await aiofiles.os.path.isfile(folder):
+        bundle = get_migration_bundle(folder)
+        for extension in MIGRATION_FILE_EXTENSIONS:
+            if f"{name}{extension}" in bundle:
+                return folder / f"{name}{extension}"
+        raise FileNotFoundError(f"{name} couldn't be found.")
+    for extension in MIGRATION_FILE_EXTENSIONS:
+        path: Path = folder / f"{name}{extension}"
+        if await check_existence_of_file(path):
+            return path
+    raise FileNotFoundError(f"{name} couldn't be found.")
+
+
+def read_sql_migration_file(folder: Path, name: str) -> str | None:
+    """Read the SQL migration file in a blocking way.
+
+    It is used by the worker threads which read the files ahead.
+
+    Arguments:
+        folder: Migration folder or bundle path.
+        name: The name of the migration file without its extension.
+
+    Returns:
+        The contents of the file, or None if there is no SQL file by the name.
+    """
+    try:
+        with open_migration_file(folder / f"{name}.sql") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+@validate_call
+async def read_migration_file_contents(path: Path) -> str:
+    """Read the contents of a plain SQL or Python migration file.
+
+    Arguments:
+        path: Path of the file in a migration folder or a bundle.
+
+    Returns:
+        The contents of the file.
+
+    Raises:
+        FileNotFoundError: If the file couldn't be found.
+    """
+    if await aiofiles.os.path.isfile(path.parent):
+        return get_migration_bundle(path.parent).read(path.name).decode("utf-8")
+    async with aiofiles.open(file=path, mode="r") as file:
+        return await file.read()
+
+
+def get_python_migration_function(
+    path: Path, name: str
+) -> Callable[[Any], Awaitable[None]]:
+    """Import a Python migration file and get its migration function.
+
+    Python migration files define `async def up(conn)` or
+    `async def down(conn)` functions which receive the database connection
+    of the migration.
+
+    Arguments:
+        path: Path of the Python migration file in a folder or a bundle.
+        name: The name of the function. (up or down)
+
+    Returns:
+        The migration function.
+
+    Raises:
+        EmptyFileError: If the file doesn't define the async function.
+    """
+    module_name: str = f"pydbmigration_{path.stem.replace('-', '_')}"
+    if is_migration_bundle(path.parent):
+        spec = importlib.util.spec_from_loader(module_name, loader=None)
+        module = importlib.util.module_from_spec(spec)
+        source: bytes = get_migration_bundle(path.parent).read(path.name)
+        exec(compile(source, str(path), "exec"), module.__dict__)  # nosec
+    else:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    function = getattr(module, name, None)
+    if not inspect.iscoroutinefunction(function):
+        raise EmptyFileError(f"{path.name} doesn't define `async def {name}(conn)`.")
+    return function
+
+
+@validate_call
+async def get_migration_folder_checksum(folder: Path) -> str:
+    """Calculate a checksum of the names and contents of the migration files.
+
+    Compressed files are checksummed by their decompressed contents and
+    their names without the compression extension, so compressing a file
+    doesn't change the checksum. The files are read in chunks. A bundle has
+    the same checksum as the folder it is packed from.
+
+    Arguments:
+        folder: Migration folder or bundle path.
+
+    Returns:
+        SHA-256 checksum of the folder in hex format.
+    """
+    checksum = sha256()
+    for name in await get_migration_file_entries(folder=folder):
+        checksum.update(name.removesuffix(".gz").removesuffix(".zst").encode() + b"\0")
+        file: IO[bytes] = await asyncio.to_thread(
+            open_migration_file, folder / name, binary=True
+        )
+        try:
+            while chunk := await asyncio.to_thread(file.read, READ_CHUNK_SIZE):
+                checksum.update(chunk)
+        finally:
+            file.close()
+        checksum.update(b"\0")
+    return checksum.hexdigest()
+
+
+def open_migration_file(path: Path, binary: bool = False) -> IO:
+    """Open a migration file for reading by decompressing it if necessary.
+
+    The contents of the compressed files are decompressed while they are
+    read. Reading `.sql.zst` files needs the zstandard package. The files of
+    a bundle are read from its memory map.
+
+    Arguments:
+        path: Path of the migration file in a folder or a bundle.
+        binary: Open the file in binary mode instead of UTF-8 text.
+
+    Returns:
+        The file object.
+
+    Raises:
+        ImportError: If the zstandard package is needed but not installed.
+        FileNotFoundError: If the file couldn't be found.
+    """
+    file: IO[bytes]
+    if is_migration_bundle(path.parent):
+        file = io.BytesIO(get_migration_bundle(path.parent).read(path.name))
+        if path.name.endswith(".gz"):
+            file = cast(IO[bytes], gzip.GzipFile(fileobj=file, mode="rb"))
+        elif path.name.endswith(".zst"):
+            file = get_zstandard_reader(path=path, file=file)
+    elif path.name.endswith(".gz"):
+        file = cast(IO[bytes], gzip.open(path, mode="rb"))
+    elif path.name.endswith(".zst"):
+        file = get_zstandard_reader(path=path, file=open(path, mode="rb"))
+    else:
+        file = open(path, mode="rb")
+    return file if binary else io.TextIOWrapper(file, encoding="utf-8")
+
+
+def get_zstandard_reader(path: Path, file: IO[bytes]) -> IO[bytes]:
+    """Wrap a zstd compressed file with a decompressing reader.
+
+    Arguments:
+        path: Path of the migration file.
+        file: The compressed file object.
+
+    Returns:
+        The reader of the decompressed contents.
+
+    Raises:
+        ImportError: If the zstandard package isn't installed.
+    """
+    try:
+        import zstandard
+    except ImportError as e:
+        file.close()
+        raise ImportError(
+            f"zstandard package is needed to read {path.name}. "
+            "Install it with `pip install py-db-migrate[zstd]`."
+        ) from e
+    return zstandard.ZstdDecompressor().stream_reader(file)
+
+
+async def stream_sql_statements(
+    path: Path, chunk_size: int = READ_CHUNK_SIZE
+) -> AsyncIterator[SqlStatement]:
+    """Read the statements of a SQL migration file one by one.
+
+    The file is read and decompressed in chunks in a worker thread, so only
+    the statement being read is kept in memory.
+
+    Arguments:
+        path: Path of the SQL or the compressed SQL migration file.
+        chunk_size: The number of characters to read at once.
+
+    Returns:
+        The statements in the order they appear in the file.
+    """
+    splitter: SqlStatementSplitter = SqlStatementSplitter()
+    file: IO[str] = await asyncio.to_thread(open_migration_file, path)
+    try:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            for statement in splitter.feed(chunk):
+                yield statement
+    finally:
+        file.close()
+    for statement in splitter.close():
+        yield statement
+
+
+@validate_call
+async def get_migration_folder_snapshot(folder: Path) -> dict[str, tuple[int, int]]:
+    """Get the modification times and sizes of the migration files.
+
+    Only the directory entries are read, so it is cheap enough to be polled.
+
+    Arguments:
+        folder: Migration folder path.
+
+    Returns:
+        The modification time in nanoseconds and the size of each migration
+        file by its name.
+    """
+    entries: Iterable[DirEntry] = await aiofiles.os.scandir(path=folder)
+    snapshot: dict[str, tuple[int, int]] = {}
+    for entry in entries:
+        if entry.is_file() and entry.name.endswith(MIGRATION_FILE_EXTENSIONS):
+            stat = entry.stat()
+            snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+@validate_call
+def quote_identifier(name: str) -> str:
+    """Quote the given name as an SQL identifier.
+
+    Arguments:
+        name: Name of a database object.
+
+    Returns:
+        The quoted identifier.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+@validate_call
+def quote_table_name(table: str) -> str:
+    """Quote the given table name as a string literal for `to_regclass`.
+
+    Arguments:
+        table: Table name which may be schema qualified.
+
+    Returns:
+        The string literal of the quoted identifier.
+    """
+    identifier: str = ".".join(
+        '"' + part.replace('"', '""') + '"' for part in table.split(".")
+    )
+    return "'" + identifier.replace("'", "''") + "'"
+
+
+@validate_call
+def get_up_file_name(name: str) -> str:
+    """Get the up file name of a migration from a name given by the user.
+
+    Arguments:
+        name: The name of the migration with or without `-up` and `.sql`.
+
+    Returns:
+        The name of the up file without its extension.
+    """
+    return name.removesuffix(".sql").removesuffix("-up") + "-up"
+
+
+async def execute_compressed_migration_file(
+    connection: Any, migration_file: str, path: Path
+) -> None:
+    """Execute the statements of a compressed migration file one by one.
+
+    The file is decompressed while its statements are executed, so the
+    decompressed contents are never held in memory at once.
+
+    Arguments:
+        connection: The database connection of the migration.
+        migration_file: The name of the migration file.
+        path: Path of the compressed migration file.
+
+    Returns:
+        None.
+
+    Raises:
+        EmptyFileError: When the file doesn't include any SQL command.
+    """
+    executed: bool = False
+    async for statement in stream_sql_statements(path=path):
+        await connection.execute(statement.query)
+        executed = True
+    if not executed:
+        raise EmptyFileError(f"{migration_file} doesn't include any command.")
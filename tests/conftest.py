@@ -1,5 +1,7 @@
 """Common test objects."""
+import aiofiles
 import pytest
+from pathlib import Path
 from shutil import rmtree
 from uuid import uuid4
 import os
@@ -24,3 +26,13 @@ def use_temp_file():
     os.mkdir(file_name)
     yield file_name
     rmtree(file_name)
+
+
+async def write_migration_files(
+    folder: str, files: dict[str, str], suffix: str = ".sql"
+) -> None:
+    for file_name, contents in files.items():
+        async with aiofiles.open(
+            Path(f"{folder}/{file_name}{suffix}"), mode="w"
+        ) as file:
+            await file.write(contents)
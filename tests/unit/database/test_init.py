@@ -10,9 +10,18 @@ class SqlConcrete(Sql):
     async def fetch(self, query):
         raise NotImplementedError
 
+    async def fetch_records(self, query):
+        raise NotImplementedError
+
+    def stream(self, query, prefetch=1000):
+        raise NotImplementedError
+
     async def __call__(self):
         raise NotImplementedError
 
+    async def session(self):
+        raise NotImplementedError
+
 
 class TestSql:
     def test_sql(self):
@@ -1,6 +1,17 @@
 """Unit tests for postgresql class."""
+import pytest
+from asyncpg import connect
+from asyncpg.exceptions import (
+    AdminShutdownError,
+    SerializationError,
+    UndefinedTableError,
+)
+
 from tests.conftest import psql  # noqa: F401
 
+from py_db_migrate.database import postgresql
+from py_db_migrate.database.postgresql import retry_transient
+
 
 class TestPsql:
     async def test_execute_and_fetch(self, psql):
@@ -20,6 +31,36 @@ class TestPsql:
             await psql.execute("drop table name")
 
 
+class TestPsqlStream:
+    async def test_stream(self, psql):
+        result = [
+            row["id"]
+            async for row in psql.stream(
+                "select generate_series(1, 25) as id", prefetch=10
+            )
+        ]
+        assert result == list(range(1, 26))
+
+    async def test_fetch_records(self, psql):
+        [row] = await psql.fetch_records("select 1 as id, 'test' as name")
+        assert not isinstance(row, dict)
+        assert row["id"] == 1
+        assert dict(row) == {"id": 1, "name": "test"}
+
+    async def test_stream_in_session(self, psql):
+        """
+        Case: The cursor runs in a savepoint of the active transaction.
+        """
+        async with psql.session() as connection:
+            async with connection.transaction():
+                await connection.execute("create temp table psqlstream (id int)")
+                await connection.execute("insert into psqlstream values (1), (2)")
+                result = [
+                    row["id"] async for row in psql.stream("select id from psqlstream")
+                ]
+                assert result == [1, 2]
+
+
 class TestPsqlCall:
     async def test_call(self, psql):
         table_name = "psqlcall"
@@ -58,6 +99,40 @@ class TestPsqlCall:
             await psql.execute(f"drop table {table_name}")
 
 
+class TestPsqlSession:
+    async def test_session(self, psql):
+        """
+        Case: Queries inside the session use the pinned connection.
+        """
+        async with psql.session() as connection:
+            [row] = await psql.fetch("select pg_backend_pid() as pid")
+            assert row["pid"] == connection.get_server_pid()
+
+            async with psql.session() as nested_connection:
+                assert nested_connection is connection
+
+        assert connection.is_closed()
+        assert psql._connection is None
+
+    async def test_session_savepoint(self, psql):
+        """
+        Case: Transactions inside an active transaction of the session are
+            savepoints. So, rolling back the outer one cancels all of them.
+        """
+        table_name = "psqlsessionsavepoint"
+        async with psql.session() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            async with psql() as conn:
+                await conn.execute(f"create table {table_name} (id int)")
+            await transaction.rollback()
+
+        check_query = await psql.fetch(
+            f"select to_regclass('{table_name}') is null as missing"
+        )
+        assert check_query[0]["missing"] is True
+
+
 class TestPsqlHelpers:
     async def test_get_connection(self, psql):
         """
@@ -73,3 +148,119 @@ class TestPsqlHelpers:
         assert result["user"] == "admin"
         assert result["password"] == "password"
         assert result["database"] == "postgres"
+        assert "search_path" not in result
+        assert psql.clone(search_path="a, public")._get_connection_params()[
+            "server_settings"
+        ] == {"search_path": "a, public"}
+
+    async def test_clone(self, psql):
+        """
+        Case: The database is cloned in a session. So, the clone opens its
+        own connection.
+        """
+        async with psql.session() as connection:
+            clone = psql.clone()
+            clone_pid = await clone.fetch("select pg_backend_pid() as pid")
+
+            assert clone_pid != [{"pid": connection.get_server_pid()}]
+        assert psql.clone(name="other").model_dump() == (
+            psql.model_dump() | {"name": "other"}
+        )
+
+
+class TestRetryTransient:
+    async def test_retry_transient(self):
+        """
+        Case: The operation fails twice with a transient error and then works.
+        """
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            if len(calls) < 3:
+                raise AdminShutdownError("terminating connection")
+            return "done"
+
+        assert await retry_transient(operation, delay=0) == "done"
+        assert len(calls) == 3
+
+    async def test_retry_transient_attempts(self):
+        """
+        Case: The operation always fails. So, the last error is raised.
+        """
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            raise SerializationError("could not serialize access")
+
+        with pytest.raises(SerializationError):
+            await retry_transient(operation, attempts=3, delay=0)
+        assert len(calls) == 3
+
+    async def test_retry_transient_not_transient(self):
+        """
+        Case: The error isn't transient. So, it is raised at once.
+        """
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            raise UndefinedTableError("relation doesn't exist")
+
+        with pytest.raises(UndefinedTableError):
+            await retry_transient(operation, delay=0)
+        assert len(calls) == 1
+
+    async def test_retry_transient_reset(self):
+        """
+        Case: The connection is reset. So, the operation runs again.
+        """
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            if len(calls) < 2:
+                raise ConnectionResetError("connection reset by peer")
+            return "done"
+
+        assert await retry_transient(operation, delay=0) == "done"
+        assert len(calls) == 2
+
+    async def test_retry_transient_closed_session(self, psql):
+        """
+        Case: The pinned connection of the session is reset. So, the
+        operation isn't run again on it.
+        """
+        calls = []
+
+        async with psql.session() as connection:
+
+            async def operation():
+                calls.append(1)
+                connection.terminate()
+                raise ConnectionResetError("connection reset by peer")
+
+            assert psql.can_retry()
+            with pytest.raises(ConnectionResetError):
+                await retry_transient(operation, delay=0, can_retry=psql.can_retry)
+        assert len(calls) == 1
+        assert psql.can_retry()
+
+    async def test_connect_retry(self, psql, monkeypatch):
+        """
+        Case: The server refuses the first connections during a failover.
+        """
+        calls = []
+
+        async def flaky_connect(**params):
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionRefusedError("connection refused")
+            return await connect(**params)
+
+        monkeypatch.setattr(postgresql, "connect", flaky_connect)
+        monkeypatch.setattr(postgresql, "RETRY_DELAY", 0)
+
+        assert await psql.fetch("select 1 as id") == [{"id": 1}]
+        assert len(calls) == 3
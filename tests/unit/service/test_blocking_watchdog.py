@@ -0,0 +1,143 @@
+"""Unit tests for blocking query watchdog service."""
+import asyncio
+from pathlib import Path
+
+import aiofiles.os
+import pytest
+from asyncpg import connect
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.blocking_watchdog import BlockingWatchdog
+from py_db_migrate.service.migration_up import MigrationError
+
+
+@pytest.fixture
+async def locked_table(psql):
+    """A session reads the table in an open transaction. So, the migration
+    waits for it and the following readers wait for the migration."""
+    await psql.execute("create table testwatchdog (id int)")
+    reader = await connect(**psql._get_connection_params())
+    await reader.execute("begin; select * from testwatchdog")
+    try:
+        yield reader
+    finally:
+        await reader.close()
+        await psql.execute("drop table testwatchdog")
+
+
+async def read_table(psql) -> None:
+    await asyncio.sleep(0.1)
+    await psql.fetch("select * from testwatchdog")
+
+
+async def read_table_until(psql, done: asyncio.Event) -> None:
+    while not done.is_set():
+        await read_table(psql)
+
+
+class TestBlockingWatchdog:
+    async def test_migration_up(
+        self,
+        psql,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        locked_table,
+    ):
+        """
+        Case: The migration waits for a lock and blocks a reader every time.
+        So, it is canceled and run again until the retries are used.
+        """
+        table_name = create_and_delete_migration_table
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"), mode="w"
+        ) as file:
+            await file.write("alter table testwatchdog add column name text;")
+        migration_up.watchdog = BlockingWatchdog(
+            database=psql, max_blocked_sessions=0, retries=1, retry_delay=0.2
+        )
+
+        done = asyncio.Event()
+        reader = asyncio.create_task(read_table_until(psql, done))
+        try:
+            with pytest.raises(MigrationError, match="canceled 2 times"):
+                await migration_up(
+                    migration_folder=use_temp_file, migration_table=table_name
+                )
+        finally:
+            done.set()
+            await reader
+
+        assert migration_up.watchdog.reason == "it blocked 1 sessions"
+        assert await migration_up.database.fetch(f"select name from {table_name}") == []
+
+    async def test_migration_up_retry(
+        self,
+        psql,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        locked_table,
+    ):
+        """
+        Case: The lock is released before the retry. So, the migration
+        succeeds after it is canceled once.
+        """
+        table_name = create_and_delete_migration_table
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"), mode="w"
+        ) as file:
+            await file.write("alter table testwatchdog add column name text;")
+        migration_up.watchdog = BlockingWatchdog(
+            database=psql, max_blocking_ms=50, retry_delay=0.5
+        )
+
+        async def release() -> None:
+            await read_table(psql)
+            await locked_table.execute("rollback")
+
+        releaser = asyncio.create_task(release())
+        await migration_up(migration_folder=use_temp_file, migration_table=table_name)
+        await releaser
+
+        assert migration_up.watchdog.reason is None
+        assert await migration_up.database.fetch(f"select name from {table_name}") == [
+            {"name": "20230902182613-file-1-up"}
+        ]
+
+    async def test_get_blocked_sessions_query(self, psql, locked_table):
+        """
+        Case: A session runs for a while before it waits for the lock. So,
+        only the wait is counted.
+        """
+        blocker = await connect(**psql._get_connection_params())
+        blocked = await connect(**psql._get_connection_params())
+        try:
+            await locked_table.execute("rollback")
+            await blocker.execute("begin; lock table testwatchdog")
+            waiter = asyncio.create_task(
+                blocked.execute(
+                    "do $$ begin perform pg_sleep(0.6); "
+                    "perform * from testwatchdog; end $$"
+                )
+            )
+            await asyncio.sleep(0.8)
+            record = await blocker.fetchrow(
+                BlockingWatchdog.get_blocked_sessions_query(
+                    server_version=blocker.get_server_version().major
+                ),
+                blocker.get_server_pid(),
+            )
+            await blocker.execute("rollback")
+            await waiter
+        finally:
+            await blocker.close()
+            await blocked.close()
+
+        assert record["blocked"] == 1
+        assert 0 < record["blocking_ms"] < 500
@@ -0,0 +1,126 @@
+"""Unit tests for checkpointed migration execution service."""
+import pytest
+
+from tests.conftest import (  # noqa: F401
+    use_temp_file,
+    psql,
+    write_migration_files,
+)
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_up import MigrationError
+
+FILE_NAME = "20230902182613-file-1-up"
+
+
+@pytest.fixture
+async def checkpoint_tables(psql, create_and_delete_migration_table):
+    table_name = create_and_delete_migration_table
+    try:
+        yield table_name
+    finally:
+        await psql.execute(
+            f"drop table if exists {table_name}_checkpoints, testcheckpoint, "
+            "testcheckpointtarget"
+        )
+
+
+class TestCheckpointedExecutor:
+    async def test_call(self, migration_up, use_temp_file, checkpoint_tables):
+        table_name = checkpoint_tables
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:no-transaction\n"
+                "create table testcheckpoint (id int);\n"
+                "create index concurrently testcheckpoint_id on testcheckpoint (id);\n"
+                "insert into testcheckpoint values (1);"
+            },
+        )
+
+        await migration_up(migration_folder=use_temp_file, migration_table=table_name)
+
+        database = migration_up.database
+        assert await database.fetch("select id from testcheckpoint") == [{"id": 1}]
+        assert await database.fetch(
+            "select indexname from pg_indexes where tablename = 'testcheckpoint'"
+        ) == [{"indexname": "testcheckpoint_id"}]
+        assert await database.fetch(f"select name from {table_name}") == [
+            {"name": FILE_NAME}
+        ]
+        assert await database.fetch(f"select * from {table_name}_checkpoints") == []
+
+    async def test_call_resume(self, migration_up, use_temp_file, checkpoint_tables):
+        """
+        Case: The third statement fails. So, the next run starts from it
+        instead of creating the table again.
+        """
+        table_name = checkpoint_tables
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:no-transaction\n"
+                "create table testcheckpoint (id int);\n"
+                "insert into testcheckpoint values (1);\n"
+                "insert into testcheckpointtarget select id from testcheckpoint;"
+            },
+        )
+
+        with pytest.raises(MigrationError):
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+        checkpoints = await migration_up.database.fetch(
+            f"select name, statements from {table_name}_checkpoints"
+        )
+        await migration_up.database.execute(
+            "create table testcheckpointtarget (id int)"
+        )
+        await migration_up(migration_folder=use_temp_file, migration_table=table_name)
+
+        assert checkpoints == [{"name": FILE_NAME, "statements": 2}]
+        assert await migration_up.database.fetch(
+            "select id from testcheckpointtarget"
+        ) == [{"id": 1}]
+        assert await migration_up.database.fetch(f"select name from {table_name}") == [
+            {"name": FILE_NAME}
+        ]
+
+    async def test_call_changed_file(
+        self, migration_up, use_temp_file, checkpoint_tables
+    ):
+        """
+        Case: The file is changed after its first statement was run. So, it
+        isn't resumed.
+        """
+        table_name = checkpoint_tables
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:no-transaction\n"
+                "create table testcheckpoint (id int);\n"
+                "select 1/0;"
+            },
+        )
+        with pytest.raises(MigrationError):
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:no-transaction\n"
+                "create table testcheckpoint (id int);\n"
+                "select 1;"
+            },
+        )
+
+        with pytest.raises(MigrationError, match="is changed after 1 of"):
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+
+        assert await migration_up.database.fetch(f"select name from {table_name}") == []
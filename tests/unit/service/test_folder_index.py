@@ -0,0 +1,44 @@
+"""Unit tests for migration folder index service."""
+from pathlib import Path
+from unittest.mock import patch
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file  # noqa: F401
+
+from py_db_migrate.service import folder_index
+from py_db_migrate.service.folder_index import MigrationFolderIndex
+
+
+@pytest.fixture
+def migration_folder_index() -> MigrationFolderIndex:
+    return MigrationFolderIndex()
+
+
+class TestMigrationFolderIndex:
+    async def test_call(self, migration_folder_index, use_temp_file):
+        """
+        Case: The folder is scanned again only after it changes.
+        """
+        folder = Path(use_temp_file)
+        async with aiofiles.open(folder / "file-1-up.sql", mode="w") as file:
+            await file.write("select 1;")
+
+        with patch.object(
+            folder_index,
+            "get_migration_file_names",
+            wraps=folder_index.get_migration_file_names,
+        ) as get_migration_file_names:
+            assert await migration_folder_index(folder=folder) == ("file-1-up",)
+            assert await migration_folder_index(folder=folder) == ("file-1-up",)
+            assert get_migration_file_names.call_count == 1
+
+            async with aiofiles.open(folder / "file-2-up.sql", mode="w") as file:
+                await file.write("select 2;")
+
+            assert await migration_folder_index(folder=folder) == (
+                "file-1-up",
+                "file-2-up",
+            )
+            assert get_migration_file_names.call_count == 2
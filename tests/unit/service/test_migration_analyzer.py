@@ -0,0 +1,148 @@
+"""Unit tests for migration analyzer service."""
+import gzip
+
+import aiofiles.os
+import pytest
+
+
+from pathlib import Path
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_analyzer import MigrationAnalyzer, TableSize
+from py_db_migrate.service.sql_parser import SqlStatement, classify_statement
+
+
+@pytest.fixture
+def migration_analyzer(psql) -> MigrationAnalyzer:
+    return MigrationAnalyzer(database=psql)
+
+
+class TestMigrationAnalyzer:
+    async def test_call(
+        self, migration_analyzer, use_temp_file, create_and_delete_migration_table
+    ):
+        table_name = create_and_delete_migration_table
+        try:
+            await migration_analyzer.database.execute(
+                "create table testanalyzer as "
+                "select generate_series(1, 1000) as id; analyze testanalyzer"
+            )
+            for file_name, contents in (
+                ("20230902182613-file-1-up", "create table testanalyzernew (id int);"),
+                (
+                    "20230902182614-file-2-up",
+                    "create index on testanalyzer (id);\n"
+                    "alter table testanalyzer alter column id type bigint;",
+                ),
+            ):
+                async with aiofiles.open(
+                    Path(f"{use_temp_file}/{file_name}.sql"),
+                    mode="w",
+                ) as file:
+                    await file.write(contents)
+            await migration_analyzer.database.execute(
+                f"insert into {table_name} (date, name) values "
+                "(now(), '20230902182613-file-1-up')"
+            )
+
+            result = await migration_analyzer(
+                migration_folder=Path(use_temp_file),
+                migration_table=table_name,
+                large_table_size=1,
+            )
+
+            assert [risk.impact.statement.line for risk in result] == [2, 1]
+            assert result[0].level == "HIGH"
+            assert result[0].impact.rewrite is True
+            assert result[0].rows == 1000
+            assert result[0].size > 0
+            assert result[1].level == "HIGH"
+        finally:
+            await migration_analyzer.database.execute("drop table testanalyzer")
+
+    async def test_call_no_migration_table(self, migration_analyzer, use_temp_file):
+        """
+        Case: There is no migration table. All files are pending and the table
+            isn't created.
+        """
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"),
+            mode="w",
+        ) as file:
+            await file.write("drop table testanalyzermissing;")
+
+        result = await migration_analyzer(
+            migration_folder=Path(use_temp_file),
+            migration_table="pydbmigration_analyzer",
+        )
+
+        assert len(result) == 1
+        assert result[0].size == 0
+        assert result[0].level == "MEDIUM"
+        assert not await migration_analyzer.database.fetch(
+            "select 1 from pg_class where relname = 'pydbmigration_analyzer'"
+        )
+
+    async def test_call_compressed(self, migration_analyzer, use_temp_file):
+        """
+        Case: A pending migration file is compressed. So, its statements are
+            analyzed too.
+        """
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql.gz"),
+            mode="wb",
+        ) as file:
+            await file.write(gzip.compress(b"drop table testanalyzermissing;"))
+
+        result = await migration_analyzer(
+            migration_folder=Path(use_temp_file),
+            migration_table="pydbmigration_analyzer",
+        )
+
+        assert len(result) == 1
+        assert result[0].migration_file == "20230902182613-file-1-up"
+
+
+class TestGetTableSizes:
+    async def test_get_table_sizes(self, migration_analyzer):
+        try:
+            await migration_analyzer.database.execute(
+                'create table "TestSizes" (id int); '
+                'insert into "TestSizes" values (1); analyze "TestSizes"'
+            )
+            result = await migration_analyzer.get_table_sizes(
+                tables=["TestSizes", "testsizesmissing"]
+            )
+
+            assert list(result) == ["TestSizes"]
+            assert result["TestSizes"].rows == 1
+        finally:
+            await migration_analyzer.database.execute('drop table "TestSizes"')
+
+
+class TestGetStatementRisk:
+    def test_get_statement_risk(self, migration_analyzer):
+        impact = classify_statement(
+            SqlStatement(query="alter table a add column b int", line=1)
+        )
+        small = migration_analyzer.get_statement_risk(
+            migration_file="file-up",
+            impact=impact,
+            table_sizes={"a": TableSize(rows=10, size=10)},
+            large_table_size=100,
+        )
+        large = migration_analyzer.get_statement_risk(
+            migration_file="file-up",
+            impact=impact,
+            table_sizes={"a": TableSize(rows=10, size=2 * 1024**4)},
+            large_table_size=100,
+        )
+
+        assert small.level == "MEDIUM"
+        assert large.level == "HIGH"
+        assert large.score > small.score
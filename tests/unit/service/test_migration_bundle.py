@@ -0,0 +1,159 @@
+"""Unit tests for migration bundle service."""
+import gzip
+from pathlib import Path
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service import BundleError, FolderNotFoundError
+from py_db_migrate.service import bundle
+from py_db_migrate.service.bundle import get_migration_bundle
+from py_db_migrate.service.migration_bundle import MigrationBundle
+from py_db_migrate.service.migration_down import MigrationDown
+from py_db_migrate.service.migration_status import MigrationStatus
+from py_db_migrate.service.utils import (
+    get_migration_file_names,
+    get_migration_folder_checksum,
+)
+
+
+@pytest.fixture
+def migration_bundle() -> MigrationBundle:
+    return MigrationBundle()
+
+
+@pytest.fixture
+async def migration_folder(use_temp_file):
+    folder = Path(use_temp_file, "migrations")
+    await aiofiles.os.mkdir(folder)
+    files = {
+        "file-1-up.sql": b"create table testmigrationbundle (id int);",
+        "file-1-down.sql": b"drop table testmigrationbundle;",
+        "file-2-up.sql.gz": gzip.compress(
+            b"insert into testmigrationbundle (id) values (1);\n"
+            b"insert into testmigrationbundle (id) values (2);"
+        ),
+        "file-2-down.py": (
+            b"async def down(conn):\n"
+            b"    await conn.execute('delete from testmigrationbundle')\n"
+        ),
+        "notes.txt": b"not a migration",
+    }
+    for name, contents in files.items():
+        async with aiofiles.open(folder / name, mode="wb") as file:
+            await file.write(contents)
+    return folder
+
+
+class TestMigrationBundle:
+    async def test_call(self, migration_bundle, migration_folder):
+        bundle_path = migration_folder.parent / "migrations.bundle"
+
+        result = await migration_bundle(
+            migration_folder=migration_folder, bundle_path=bundle_path
+        )
+
+        assert result == [
+            "file-1-down.sql",
+            "file-1-up.sql",
+            "file-2-down.py",
+            "file-2-up.sql.gz",
+        ]
+        assert await get_migration_file_names(bundle_path) == (
+            "file-1-up",
+            "file-2-up",
+        )
+        assert await get_migration_folder_checksum(
+            bundle_path
+        ) == await get_migration_folder_checksum(migration_folder)
+
+    async def test_call_chunks(self, migration_bundle, migration_folder, monkeypatch):
+        """
+        Case: The files are larger than a chunk. So, they are copied in
+        several chunks.
+        """
+        monkeypatch.setattr(bundle, "BUNDLE_CHUNK_SIZE", 4)
+        bundle_path = migration_folder.parent / "migrations.bundle"
+
+        result = await migration_bundle(
+            migration_folder=migration_folder, bundle_path=bundle_path
+        )
+
+        reader = get_migration_bundle(bundle_path)
+        for name in result:
+            async with aiofiles.open(migration_folder / name, mode="rb") as file:
+                assert reader.read(name) == await file.read()
+
+    async def test_call_folder_not_found(self, migration_bundle, use_temp_file):
+        with pytest.raises(FolderNotFoundError):
+            await migration_bundle(
+                migration_folder=Path(use_temp_file, "missing"),
+                bundle_path=Path(use_temp_file, "migrations.bundle"),
+            )
+
+    async def test_call_corrupted(self, migration_bundle, migration_folder):
+        """
+        Case: A file of the bundle is changed. So, reading it raises.
+        """
+        bundle_path = migration_folder.parent / "migrations.bundle"
+        await migration_bundle(
+            migration_folder=migration_folder, bundle_path=bundle_path
+        )
+        async with aiofiles.open(bundle_path, mode="rb") as file:
+            contents = await file.read()
+        async with aiofiles.open(bundle_path, mode="wb") as file:
+            await file.write(contents.replace(b"create table", b"CREATE TABLE"))
+
+        with pytest.raises(BundleError):
+            get_migration_bundle(bundle_path).read("file-1-up.sql")
+
+    async def test_run_from_bundle(
+        self,
+        migration_bundle,
+        migration_folder,
+        migration_up,
+        create_and_delete_migration_table,
+    ):
+        """
+        Case: up, status and down run from the bundle without the folder.
+        """
+        table_name = create_and_delete_migration_table  # migration table
+        bundle_path = migration_folder.parent / "migrations.bundle"
+        await migration_bundle(
+            migration_folder=migration_folder, bundle_path=bundle_path
+        )
+        for name in await aiofiles.os.listdir(migration_folder):
+            await aiofiles.os.remove(migration_folder / name)
+
+        try:
+            await migration_up(migration_folder=bundle_path, migration_table=table_name)
+            check_query = await migration_up.database.fetch(
+                "select id from testmigrationbundle order by id"
+            )
+            assert check_query == [{"id": 1}, {"id": 2}]
+
+            states = await MigrationStatus(database=migration_up.database)(
+                migration_folder=bundle_path, migration_table=table_name
+            )
+            assert [(state.name, state.date is None) for state in states] == [
+                ("file-1-up", False),
+                ("file-2-up", False),
+            ]
+
+            await MigrationDown(database=migration_up.database)(
+                migration_folder=bundle_path, migration_table=table_name
+            )
+            rows = await migration_up.database.fetch(
+                "select * from testmigrationbundle"
+            )
+            assert rows == []
+        finally:
+            await migration_up.database.execute(
+                "drop table if exists testmigrationbundle"
+            )
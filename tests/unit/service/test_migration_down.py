@@ -1,4 +1,6 @@
 """Unit tests for migration down service."""
+import gzip
+
 import aiofiles.os
 import pytest
 
@@ -139,3 +141,72 @@ class TestMigrateDown:
                 migration_file=file_name,
                 migration_table=table_name,
             )
+
+    async def test_migrate_down_python(
+        self, migration_down, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: Python down file is run with the connection of the migration.
+        """
+        table_name = create_and_delete_migration_table  # migration table
+        file_name = "20230923182613-file-2-down"
+        new_table_name = "testmigratedownpython"
+
+        await migration_down.database.execute(
+            f"create table {new_table_name} (id int);"
+            f"insert into {table_name} (name, date) values "
+            "('20230923182613-file-2-up','2021-01-03T01:00:00Z')"
+        )
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.py"),
+            mode="w",
+        ) as file:
+            await file.write(
+                "async def down(conn):\n"
+                f"    await conn.execute('drop table {new_table_name}')\n"
+            )
+
+        await migration_down.migrate_down(
+            migration_folder=use_temp_file,
+            migration_file=file_name,
+            migration_table=table_name,
+        )
+
+        check_query = await migration_down.database.fetch(
+            f"select to_regclass('{new_table_name}') as name"
+        )
+        assert check_query == [{"name": None}]
+        assert await migration_down.database.fetch(f"select * from {table_name}") == []
+
+    async def test_migrate_down_compressed(
+        self, migration_down, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: Gzip compressed down file is run statement by statement.
+        """
+        table_name = create_and_delete_migration_table  # migration table
+        file_name = "20230923182613-file-3-down"
+        new_table_name = "testmigratedowncompressed"
+
+        await migration_down.database.execute(
+            f"create table {new_table_name} (id int);"
+            f"insert into {table_name} (name, date) values "
+            "('20230923182613-file-3-up','2021-01-03T01:00:00Z')"
+        )
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql.gz"),
+            mode="wb",
+        ) as file:
+            await file.write(gzip.compress(f"drop table {new_table_name};".encode()))
+
+        await migration_down.migrate_down(
+            migration_folder=use_temp_file,
+            migration_file=file_name,
+            migration_table=table_name,
+        )
+
+        check_query = await migration_down.database.fetch(
+            f"select to_regclass('{new_table_name}') as name"
+        )
+        assert check_query == [{"name": None}]
+        assert await migration_down.database.fetch(f"select * from {table_name}") == []
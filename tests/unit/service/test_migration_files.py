@@ -5,7 +5,9 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from tests.conftest import use_temp_file  # noqa: F401
+from py_db_migrate.service import EmptyFileError
 from py_db_migrate.service.migration_files import MigrationFiles
+from py_db_migrate.service.utils import get_python_migration_function
 
 
 @pytest.fixture
@@ -36,6 +38,22 @@ class TestAddMigrationFiles:
         result = await aiofiles.os.listdir(use_temp_file)
         assert set(result) == {"migration-up.sql", "migration-down.sql"}
 
+    async def test_add_migration_files_python(self, migration_files, use_temp_file):
+        """
+        Case: The functions of the Python templates fail until they are filled
+            like the placeholder of the SQL files.
+        """
+        await migration_files.add_migration_files(
+            folder_path=Path(use_temp_file), name="migration", python=True
+        )
+
+        for direction in ("up", "down"):
+            function = get_python_migration_function(
+                path=Path(f"{use_temp_file}/migration-{direction}.py"), name=direction
+            )
+            with pytest.raises(EmptyFileError):
+                await function(None)
+
 
 class TestFormatFileNames:
     def test_format_file_names(self, migration_files):
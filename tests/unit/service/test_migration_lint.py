@@ -0,0 +1,192 @@
+"""Unit tests for migration lint service."""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import use_temp_file, write_migration_files  # noqa: F401
+
+from py_db_migrate.service import FolderNotFoundError
+from py_db_migrate.service import migration_lint as migration_lint_module
+from py_db_migrate.service.migration_files import PYTHON_TEMPLATES
+from py_db_migrate.service.migration_lint import MigrationLint, lint_files, lint_sql
+
+
+@pytest.fixture
+def migration_lint() -> MigrationLint:
+    return MigrationLint()
+
+
+class TestMigrationLint:
+    async def test_call(self, migration_lint, use_temp_file):
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up.sql": "create table a (id int);\ncreate index i on a (id);",
+                "file-1-down.sql": "drop table a;",
+                "file-2-up.sql": "/* Insert your SQL commands here. */",
+                "file-3-up.sql": "alter table a add column b int;\nselec 1;",
+                "file-3-down.py": "def down(conn):\n    pass\n",
+            },
+            suffix="",
+        )
+
+        result = await migration_lint(migration_folder=use_temp_file)
+
+        assert [
+            (issue.file, issue.line, issue.level, issue.message) for issue in result
+        ] == [
+            (
+                "file-1-down.sql",
+                1,
+                "warning",
+                "The statement deletes the data of a table.",
+            ),
+            ("file-2-up", None, "error", "file-2-down is missing."),
+            (
+                "file-2-up.sql",
+                None,
+                "error",
+                "The file still has the placeholder comment.",
+            ),
+            (
+                "file-3-down.py",
+                None,
+                "error",
+                "The file doesn't define `async def down`.",
+            ),
+            ("file-3-up.sql", 2, "error", "Unknown command SELEC."),
+        ]
+
+    async def test_call_cache(self, migration_lint, use_temp_file):
+        """
+        Case: Unchanged files are read from the cache.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {"file-1-up.sql": "update a set b = 1;", "file-1-down.sql": "select 1;"},
+            suffix="",
+        )
+        cache_path = Path(use_temp_file) / "lint-cache.json"
+
+        result = await migration_lint(
+            migration_folder=use_temp_file, cache_path=cache_path
+        )
+        cache = await migration_lint.read_cache(cache_path=cache_path)
+        await migration_lint.write_cache(
+            cache_path=cache_path,
+            cache={key: [(1, "error", "cached")] for key in cache},
+        )
+        cached_result = await migration_lint(
+            migration_folder=use_temp_file, cache_path=cache_path
+        )
+
+        assert [issue.message for issue in result] == [
+            "UPDATE without WHERE changes every row."
+        ]
+        assert len(cache) == 2
+        assert [issue.message for issue in cached_result] == ["cached", "cached"]
+
+    async def test_call_cache_backend(self, migration_lint, use_temp_file):
+        """
+        Case: The syntax checker is changed. So, the cache isn't used.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {"file-1-up.sql": "select 1;", "file-1-down.sql": "select 1;"},
+            suffix="",
+        )
+        cache_path = Path(use_temp_file) / "lint-cache.json"
+        await migration_lint(migration_folder=use_temp_file, cache_path=cache_path)
+        cache = await migration_lint.read_cache(cache_path=cache_path)
+        await migration_lint.write_cache(
+            cache_path=cache_path,
+            cache={key: [(1, "error", "cached")] for key in cache},
+        )
+
+        with patch.object(
+            migration_lint_module, "get_syntax_backend", return_value="other"
+        ):
+            result = await migration_lint(
+                migration_folder=use_temp_file, cache_path=cache_path
+            )
+
+        assert result == []
+
+    async def test_call_online_rewrite(self, migration_lint, use_temp_file):
+        """
+        Case: The statements of an online rewrite alter a copy of the table.
+        So, they aren't reported.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up.sql": "-- py-db-migrate:online-rewrite a\n"
+                "alter table a alter column b type bigint;",
+                "file-1-down.sql": "select 1;",
+            },
+            suffix="",
+        )
+
+        assert await migration_lint(migration_folder=use_temp_file) == []
+
+    async def test_call_python_template(self, migration_lint, use_temp_file):
+        """
+        Case: A Python file still raises the error of its template.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up": PYTHON_TEMPLATES["up"],
+                "file-1-down": "async def down(conn):\n"
+                "    await conn.execute('select 1')\n",
+            },
+            suffix=".py",
+        )
+
+        result = await migration_lint(migration_folder=use_temp_file)
+
+        assert [(issue.file, issue.message) for issue in result] == [
+            ("file-1-up.py", "The file still raises the placeholder error.")
+        ]
+
+    async def test_call_folder_not_found(self, migration_lint):
+        with pytest.raises(FolderNotFoundError):
+            await migration_lint(migration_folder=Path("./missing-folder"))
+
+
+class TestLintFiles:
+    async def test_lint_files_pool(self, migration_lint):
+        """
+        Case: Files are linted in a process pool in the same order.
+        """
+        files = [
+            (f"file-{index}-up.sql", "select 1;" if index % 2 else "selec 1;")
+            for index in range(10)
+        ]
+
+        result = await migration_lint.lint_files(
+            files=files, workers=2, pool_threshold=1
+        )
+
+        assert result == lint_files(files)
+        assert result[0] == [(1, "error", "Unknown command SELEC.")]
+        assert result[1] == []
+
+
+class TestLintSql:
+    def test_lint_sql_pglast(self):
+        """
+        Case: pglast parses the file. So, the builtin checks aren't run.
+        """
+        pglast = SimpleNamespace(parse_sql=lambda contents: None)
+
+        with patch.dict(sys.modules, {"pglast": pglast}), patch.object(
+            migration_lint_module, "find_syntax_errors"
+        ) as find_syntax_errors:
+            result = lint_sql("select 1;")
+
+        assert result == []
+        find_syntax_errors.assert_not_called()
@@ -0,0 +1,149 @@
+"""Unit tests for migration mark service."""
+import aiofiles.os
+import pytest
+
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_mark import MigrationMark
+
+FILE_NAMES = (
+    "20230902182613-file-1-up",
+    "20230902182614-file-2-up",
+    "20230902182615-file-3-up",
+    "20230902182616-file-4-up",
+)
+
+
+@pytest.fixture
+def migration_mark(psql) -> MigrationMark:
+    return MigrationMark(database=psql)
+
+
+@pytest.fixture
+async def migration_folder(use_temp_file) -> Path:
+    for file_name in FILE_NAMES:
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql"), mode="w"
+        ) as file:
+            await file.write("create table testmark (id int);")
+    return Path(use_temp_file)
+
+
+class TestMigrationMark:
+    async def test_call(
+        self, migration_mark, migration_folder, create_and_delete_migration_table
+    ):
+        table_name = create_and_delete_migration_table
+        await migration_mark.database.execute(
+            f"insert into {table_name} (date, name) values "
+            "(now(), '20230902182613-file-1-up')"
+        )
+
+        result = await migration_mark(
+            migration_folder=migration_folder,
+            migration_table=table_name,
+            end="20230902182615-file-3",
+        )
+
+        assert result == ("20230902182614-file-2-up", "20230902182615-file-3-up")
+        rows = await migration_mark.database.fetch(
+            f"select name from {table_name} order by date"
+        )
+        assert [row["name"] for row in rows] == list(FILE_NAMES[:3])
+        assert not await migration_mark.database.fetch(
+            "select 1 from pg_class where relname = 'testmark'"
+        )
+
+    async def test_call_before_migrated(
+        self, migration_mark, migration_folder, create_and_delete_migration_table
+    ):
+        """
+        Case: The marked files come before a migrated file. So, they are dated
+        before it and `down` rolls back the migrated file first.
+        """
+        table_name = create_and_delete_migration_table
+        await migration_mark.database.execute(
+            f"insert into {table_name} (date, name) values "
+            "(now() - interval '1 day', '20230902182615-file-3-up')"
+        )
+
+        await migration_mark(
+            migration_folder=migration_folder,
+            migration_table=table_name,
+            names=("20230902182613-file-1", "20230902182614-file-2"),
+        )
+
+        rows = await migration_mark.database.fetch(
+            f"select name from {table_name} order by date"
+        )
+        assert [row["name"] for row in rows] == list(FILE_NAMES[:3])
+
+    async def test_call_dry_run(self, migration_mark, migration_folder):
+        """
+        Case: Dry run doesn't create the migration table or write any row.
+        """
+        result = await migration_mark(
+            migration_folder=migration_folder,
+            migration_table="pydbmigration_mark",
+            names=("20230902182616-file-4-up.sql",),
+            dry_run=True,
+        )
+
+        assert result == ("20230902182616-file-4-up",)
+        assert not await migration_mark.database.fetch(
+            "select 1 from pg_class where relname = 'pydbmigration_mark'"
+        )
+
+    async def test_call_no_selection(self, migration_mark, migration_folder):
+        with pytest.raises(ValueError):
+            await migration_mark(
+                migration_folder=migration_folder, migration_table="pydbmigration"
+            )
+
+
+class TestSelectMigrationFiles:
+    def test_get_mark_dates(self, migration_mark):
+        now = datetime(2023, 9, 3, tzinfo=timezone.utc)
+        migrated = datetime(2023, 9, 1, tzinfo=timezone.utc)
+
+        result = migration_mark.get_mark_dates(
+            marked_files=(FILE_NAMES[0], FILE_NAMES[1], FILE_NAMES[3]),
+            migrated_dates={FILE_NAMES[2]: migrated},
+            now=now,
+        )
+
+        assert result == [
+            migrated - timedelta(microseconds=3),
+            migrated - timedelta(microseconds=2),
+            now + timedelta(microseconds=2),
+        ]
+
+    def test_select_migration_files(self, migration_mark):
+        result = migration_mark.select_migration_files(
+            migration_files=FILE_NAMES,
+            names=("20230902182613-file-1",),
+            start="20230902182615-file-3-up",
+            end=None,
+        )
+
+        assert result == [FILE_NAMES[0], FILE_NAMES[2], FILE_NAMES[3]]
+
+    def test_select_migration_files_not_found(self, migration_mark):
+        """
+        Case: A given migration doesn't exist in the folder.
+        """
+        with pytest.raises(FileNotFoundError):
+            migration_mark.select_migration_files(
+                migration_files=FILE_NAMES,
+                names=("20230902182613-missing",),
+                start=None,
+                end=None,
+            )
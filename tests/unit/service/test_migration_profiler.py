@@ -0,0 +1,82 @@
+"""Unit tests for migration statement profiler service."""
+import json
+from pathlib import Path
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_profiler import MigrationProfiler
+from py_db_migrate.service.migration_up import MigrationError
+
+
+@pytest.fixture
+def migration_profiler(psql) -> MigrationProfiler:
+    return MigrationProfiler(database=psql)
+
+
+class TestMigrationProfiler:
+    async def test_profile(
+        self, migration_profiler, use_temp_file, create_and_delete_migration_table
+    ):
+        table_name = create_and_delete_migration_table
+        file_name = "20230902182613-file-1-up"
+        output_path = Path(f"{use_temp_file}/profile.json")
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql"), mode="w"
+        ) as file:
+            await file.write(
+                "create table testprofiler (id int);\n\n"
+                "select pg_sleep(0.3);\n"
+                "drop table testprofiler;"
+            )
+
+        result = await migration_profiler.profile(
+            migration_folder=use_temp_file,
+            migration_table=table_name,
+            output_path=output_path,
+            interval=0.02,
+        )
+
+        assert [(profile.line, profile.migration_file) for profile in result] == [
+            (1, file_name),
+            (3, file_name),
+            (4, file_name),
+        ]
+        assert result[1].duration >= 0.3
+        assert result[1].waits.get("Timeout:PgSleep", 0) > 0
+        assert await migration_profiler.database.fetch(
+            f"select name from {table_name}"
+        ) == [{"name": file_name}]
+        async with aiofiles.open(output_path, mode="r") as file:
+            assert json.loads(await file.read()) == [
+                profile.model_dump() for profile in result
+            ]
+
+    async def test_profile_error(
+        self, migration_profiler, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: The second statement fails. So, the migration is rolled back
+        and the statements until the failing one are profiled.
+        """
+        table_name = create_and_delete_migration_table
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"), mode="w"
+        ) as file:
+            await file.write("create table testprofiler (id int);\nselect 1/0;")
+
+        with pytest.raises(MigrationError):
+            await migration_profiler.profile(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+
+        assert [profile.line for profile in migration_profiler._profiles] == [1, 2]
+        assert await migration_profiler.database.fetch(
+            "select to_regclass('testprofiler') as name"
+        ) == [{"name": None}]
@@ -0,0 +1,93 @@
+"""Unit tests for migration rehearsal service."""
+import aiofiles.os
+import pytest
+
+
+from pathlib import Path
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+
+from py_db_migrate.service.migration_rehearsal import MigrationRehearsal
+from py_db_migrate.service.migration_up import MigrationError
+
+
+@pytest.fixture
+def migration_rehearsal(psql) -> MigrationRehearsal:
+    return MigrationRehearsal(database=psql)
+
+
+class TestMigrationRehearsal:
+    async def test_rehearse(self, migration_rehearsal, use_temp_file):
+        migration_table = "pydbmigration_rehearsal"
+        for file_name, contents in (
+            (
+                "20230902182613-file-1-up",
+                "create table testrehearsal (id int primary key, name text);\n"
+                "insert into testrehearsal (id) values (1), (2);",
+            ),
+            (
+                "20230902182614-file-2-up",
+                "update testrehearsal set name = 'test' where id = 1;\n"
+                "delete from testrehearsal where id = 2;",
+            ),
+        ):
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{file_name}.sql"),
+                mode="w",
+            ) as file:
+                await file.write(contents)
+
+        result = await migration_rehearsal.rehearse(
+            migration_folder=Path(use_temp_file),
+            migration_table=migration_table,
+        )
+
+        assert [rehearsal.name for rehearsal in result] == [
+            "20230902182613-file-1-up",
+            "20230902182614-file-2-up",
+        ]
+        assert [statement.line for statement in result[0].statements] == [1, 2]
+        assert all(statement.plan is None for statement in result[0].statements)
+        assert any("testrehearsal" in lock for lock in result[0].locks)
+        assert set(result[0].locks) <= set(result[1].locks)
+        assert "Update on testrehearsal" in result[1].statements[0].plan
+        assert "Delete on testrehearsal" in result[1].statements[1].plan
+
+        # Nothing is committed.
+        check_query = await migration_rehearsal.database.fetch(
+            "select to_regclass('testrehearsal') is null as table_missing, "
+            f"to_regclass('{migration_table}') is null as migration_table_missing"
+        )
+        assert check_query == [{"table_missing": True, "migration_table_missing": True}]
+
+    async def test_rehearse_syntax_error(self, migration_rehearsal, use_temp_file):
+        """
+        Case: There is a syntax error in the file. It will raise MigrationError.
+        """
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"),
+            mode="w",
+        ) as file:
+            await file.write("create table testrehearsal (id int pri")
+
+        with pytest.raises(MigrationError):
+            await migration_rehearsal.rehearse(
+                migration_folder=Path(use_temp_file),
+                migration_table="pydbmigration_rehearsal",
+            )
+
+    async def test_rehearse_empty_file(self, migration_rehearsal, use_temp_file):
+        """
+        Case: The file doesn't include any command.
+        """
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"),
+            mode="w",
+        ) as file:
+            await file.write("/* Insert your SQL commands here. */")
+
+        with pytest.raises(MigrationError):
+            await migration_rehearsal.rehearse(
+                migration_folder=Path(use_temp_file),
+                migration_table="pydbmigration_rehearsal",
+            )
@@ -0,0 +1,123 @@
+"""Unit tests for migration reset service."""
+from pathlib import Path
+from uuid import uuid4
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+
+from py_db_migrate.database.postgresql import PSql
+from py_db_migrate.service.migration_reset import MigrationReset
+from py_db_migrate.service.migration_up import MigrationUp
+
+
+@pytest.fixture
+async def database(psql) -> PSql:
+    name = f"pydbmigrate_reset_{uuid4().hex}"
+    await psql.execute(f"create database {name}")
+    yield PSql(**(psql.model_dump() | {"name": name}))
+    await psql.execute(f"drop database {name} with (force)")
+    for row in await psql.fetch(
+        "select datname from pg_database where datname like 'pydbmigrate_template_%'"
+    ):
+        await psql.execute(f"alter database {row['datname']} is_template false")
+        await psql.execute(f"drop database {row['datname']}")
+
+
+@pytest.fixture
+async def migrated_database(database, use_temp_file) -> PSql:
+    async with aiofiles.open(
+        Path(f"{use_temp_file}/20231002182613-file-1-up.sql"), mode="w"
+    ) as file:
+        await file.write(
+            "create schema other;"
+            "create table other.parent (id serial primary key);"
+            "create table child (id int references other.parent (id));"
+            "insert into other.parent default values;"
+            "insert into child values (1);"
+        )
+    await MigrationUp(database=database)(
+        migration_folder=use_temp_file, migration_table="pydbmigration"
+    )
+    return database
+
+
+class TestMigrationReset:
+    async def test_call(self, migrated_database, use_temp_file):
+        """
+        Case: Tables are truncated but the migration table is kept.
+        """
+        await MigrationReset(database=migrated_database)(
+            migration_folder=use_temp_file, migration_table="pydbmigration"
+        )
+
+        assert await migrated_database.fetch("select * from child") == []
+        assert await migrated_database.fetch(
+            "select nextval('other.parent_id_seq') as id"
+        ) == [{"id": 1}]
+        assert len(await migrated_database.fetch("select * from pydbmigration")) == 1
+
+    async def test_call_extension_table(self, migrated_database, use_temp_file):
+        """
+        Case: The tables of the extensions aren't truncated.
+        """
+        await migrated_database.execute(
+            "alter extension plpgsql add table other.parent"
+        )
+
+        await MigrationReset(database=migrated_database)(
+            migration_folder=use_temp_file, migration_table="pydbmigration"
+        )
+
+        assert await migrated_database.fetch("select * from other.parent") == [
+            {"id": 1}
+        ]
+        assert await migrated_database.fetch("select * from child") == []
+
+    async def test_call_rebuild(self, migrated_database, use_temp_file):
+        """
+        Case: The database is copied from the template database with its
+            privileges and settings.
+        """
+        await migrated_database.execute("insert into other.parent default values")
+        await migrated_database.execute(
+            f"revoke temporary on database {migrated_database.name} from public"
+        )
+        await migrated_database.execute(
+            f"alter database {migrated_database.name} set work_mem = '7MB'"
+        )
+        migration_reset = MigrationReset(database=migrated_database)
+
+        for _ in range(2):
+            await migration_reset(
+                migration_folder=use_temp_file,
+                migration_table="pydbmigration",
+                rebuild=True,
+            )
+
+            assert await migrated_database.fetch("select * from other.parent") == [
+                {"id": 1}
+            ]
+            assert (
+                len(await migrated_database.fetch("select * from pydbmigration")) == 1
+            )
+            assert await migrated_database.fetch(
+                "select has_database_privilege('public', current_database(), "
+                "'temporary') as temporary, current_setting('work_mem') as work_mem"
+            ) == [{"temporary": False, "work_mem": "7MB"}]
+        templates = await migrated_database.fetch(
+            "select datname from pg_database "
+            "where datname like 'pydbmigrate_template_%'"
+        )
+        assert len(templates) == 1
+
+    async def test_truncate_tables_empty_database(self, database):
+        """
+        Case: There is no table to truncate.
+        """
+        result = await MigrationReset(database=database).truncate_tables(
+            migration_table="pydbmigration"
+        )
+
+        assert result == []
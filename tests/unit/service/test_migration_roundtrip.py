@@ -0,0 +1,125 @@
+"""Unit tests for migration round-trip verification service."""
+import pytest
+
+from tests.conftest import use_temp_file, psql, write_migration_files  # noqa: F401
+
+from py_db_migrate.service.migration_roundtrip import MigrationRoundtrip
+
+
+@pytest.fixture
+def migration_roundtrip(psql) -> MigrationRoundtrip:
+    return MigrationRoundtrip(database=psql)
+
+
+class TestMigrationRoundtrip:
+    @pytest.mark.parametrize("workers, verified", [(1, False), (3, True)])
+    async def test_call(self, migration_roundtrip, use_temp_file, workers, verified):
+        """
+        Case: Down file of the second migration leaves a column. So, its
+        second up fails and the third one is verified only if it is in
+        another chunk.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up": "create table roundtrip (id int);",
+                "file-1-down": "drop table roundtrip;",
+                "file-2-up": "alter table roundtrip add column name text;",
+                "file-2-down": "select 1;",
+                "file-3-up": "create index roundtrip_id on roundtrip (id);",
+                "file-3-down": "drop index roundtrip_id;",
+            },
+        )
+
+        result = await migration_roundtrip(
+            migration_folder=use_temp_file,
+            migration_table="pydbmigration",
+            workers=workers,
+        )
+
+        assert [(item.name, item.ok) for item in result] == [
+            ("file-1-up", True),
+            ("file-2-up", False),
+            ("file-3-up", verified),
+        ]
+        assert result[1].differences == ["+ column roundtrip.name text"]
+        assert result[1].error is not None  # second up fails on the column
+
+    async def test_call_missing_down_file(self, migration_roundtrip, use_temp_file):
+        """
+        Case: Down file is missing. So, the migration fails but the next one
+        is still verified.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up": "create table roundtrip (id int);",
+                "file-2-up": "create table roundtrip2 (id int);",
+                "file-2-down": "drop table roundtrip2;",
+            },
+        )
+
+        result = await migration_roundtrip(
+            migration_folder=use_temp_file,
+            migration_table="pydbmigration",
+            workers=1,
+        )
+
+        assert result[0].error.startswith("Down failed.")
+        assert result[1].ok
+
+    async def test_call_up_failed(self, migration_roundtrip, use_temp_file):
+        """
+        Case: Up file fails. So, the rest of the chunk is skipped.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up": "create tabl roundtrip (id int);",
+                "file-2-up": "create table roundtrip2 (id int);",
+            },
+        )
+
+        result = await migration_roundtrip(
+            migration_folder=use_temp_file,
+            migration_table="pydbmigration",
+            workers=1,
+        )
+
+        assert result[0].error.startswith("Up failed.")
+        assert result[1].error == "Skipped, file-1-up failed."
+        databases = await migration_roundtrip.database.fetch(
+            "select datname from pg_database "
+            "where datname like 'pydbmigrate_roundtrip_%'"
+        )
+        assert databases == []
+
+    async def test_call_snapshot_failed(self, migration_roundtrip, use_temp_file):
+        """
+        Case: Up file of the first chunk fails. So, the snapshot of the second
+        chunk can't be created and the second chunk is skipped.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up": "create table roundtrip (id int);",
+                "file-1-down": "drop table roundtrip;",
+                "file-2-up": "create tabl roundtrip2 (id int);",
+                "file-3-up": "create table roundtrip3 (id int);",
+            },
+        )
+
+        result = await migration_roundtrip(
+            migration_folder=use_temp_file,
+            migration_table="pydbmigration",
+            workers=2,
+        )
+
+        assert result[0].ok
+        assert result[1].error.startswith("Up failed.")
+        assert result[2].error.startswith("Skipped, file-2-up failed.")
+        databases = await migration_roundtrip.database.fetch(
+            "select datname from pg_database "
+            "where datname like 'pydbmigrate_roundtrip_%'"
+        )
+        assert databases == []
@@ -0,0 +1,106 @@
+"""Unit tests for migration server service."""
+import asyncio
+from pathlib import Path
+from uuid import uuid4
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+
+from py_db_migrate.client import ServerError, request
+from py_db_migrate.database.postgresql import PSql
+from py_db_migrate.service.migration_server import MigrationServer
+
+
+@pytest.fixture
+async def migration_server(psql) -> MigrationServer:
+    name = f"pydbmigrate_server_{uuid4().hex}"
+    await psql.execute(f"create database {name}")
+    yield MigrationServer(database=PSql(**(psql.model_dump() | {"name": name})))
+    await psql.execute(f"drop database {name} with (force)")
+    for row in await psql.fetch(
+        "select datname from pg_database where datname like 'pydbmigrate_template_%'"
+    ):
+        await psql.execute(f"alter database {row['datname']} is_template false")
+        await psql.execute(f"drop database {row['datname']}")
+
+
+@pytest.fixture
+async def serve(migration_server, use_temp_file):
+    table_name = "testmigrationservertable"
+    socket_path = Path(use_temp_file) / "server.sock"
+    task = asyncio.create_task(
+        migration_server(
+            migration_folder=use_temp_file,
+            migration_table=table_name,
+            socket_path=socket_path,
+        )
+    )
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        await asyncio.sleep(0.01)
+    try:
+        yield str(socket_path)
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+async def send(command: str, socket_path: str):
+    return await asyncio.to_thread(request, command, socket_path)
+
+
+class TestMigrationServer:
+    async def test_call(self, serve, use_temp_file):
+        for file_name, contents in (
+            ("file-1-up", "create table testmigrationserver (id int);"),
+            ("file-1-down", "drop table testmigrationserver;"),
+            ("file-2-up", "insert into testmigrationserver values (1);"),
+            ("file-2-down", "delete from testmigrationserver;"),
+        ):
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{file_name}.sql"), mode="w"
+            ) as file:
+                await file.write(contents)
+
+        status = await send("status", serve)
+        assert [state["date"] for state in status] == [None, None]
+
+        status = await send("up", serve)
+        assert all(state["date"] for state in status)
+
+        status = await send("down", serve)
+        assert [state["date"] is None for state in status] == [False, True]
+
+        status = await send("reset", serve)
+        assert all(state["date"] for state in status)
+
+    async def test_call_error(self, serve):
+        """
+        Case: Unknown commands and failed commands are answered with an error.
+        """
+        with pytest.raises(ServerError):
+            await send("unknown", serve)
+
+        with pytest.raises(ServerError):
+            await send("down", serve)
+
+    async def test_call_new_file(self, serve, use_temp_file):
+        """
+        Case: A file which is added after a request isn't hidden by the cached
+            index of the folder.
+        """
+        path = Path(f"{use_temp_file}/file-1-up.sql")
+        async with aiofiles.open(path, mode="w") as file:
+            await file.write("select 1;")
+        assert len(await send("status", serve)) == 1
+
+        async with aiofiles.open(path.with_name("file-2-up.sql"), mode="w") as file:
+            await file.write("select 2;")
+
+        status = await send("up", serve)
+        assert [state["name"] for state in status] == ["file-1-up", "file-2-up"]
+        assert all(state["date"] for state in status)
@@ -0,0 +1,278 @@
+"""Unit tests for migration squash service."""
+import aiofiles.os
+import pytest
+
+
+from pathlib import Path
+
+from tests.conftest import use_temp_file, psql, write_migration_files  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_squash import MigrationSquash
+from py_db_migrate.service.migration_up import MigrationError
+from py_db_migrate.service.sql_parser import get_directives
+
+
+@pytest.fixture
+def migration_squash() -> MigrationSquash:
+    return MigrationSquash()
+
+
+MIGRATION_FILES = {
+    "20230902182613-file-1-up": "create table testsquash (id int);",
+    "20230902182613-file-1-down": "drop table testsquash;",
+    "20230902182614-file-2-up": "insert into testsquash values (1)",
+    "20230902182614-file-2-down": "delete from testsquash;",
+    "20230902182615-file-3-up": "insert into testsquash values (2);",
+    "20230902182615-file-3-down": "delete from testsquash where id = 2;",
+}
+
+
+class TestMigrationSquash:
+    async def test_call(self, migration_squash, use_temp_file):
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+
+        result = await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182615-file-3-up"
+        )
+
+        assert result == "20230902182614-file-2-baseline-up"
+        assert set(await aiofiles.os.listdir(use_temp_file)) == {
+            "20230902182614-file-2-baseline-up.sql",
+            "20230902182614-file-2-baseline-down.sql",
+            "20230902182615-file-3-up.sql",
+            "20230902182615-file-3-down.sql",
+        }
+
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{result}.sql"), mode="r"
+        ) as file:
+            contents = await file.read()
+        assert contents.startswith(
+            "-- py-db-migrate:baseline 20230902182613-file-1-up\n"
+            "-- py-db-migrate:baseline 20230902182614-file-2-up\n"
+        )
+        assert "insert into testsquash values (1);" in contents
+
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182614-file-2-baseline-down.sql"), mode="r"
+        ) as file:
+            contents = await file.read()
+        assert contents.index("delete from testsquash;") < contents.index(
+            "drop table testsquash;"
+        )
+
+    async def test_call_no_file_before(self, migration_squash, use_temp_file):
+        """
+        Case: There is no migration before the given one.
+        """
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+
+        with pytest.raises(FileNotFoundError):
+            await migration_squash(
+                migration_folder=Path(use_temp_file), before="20230902182613"
+            )
+
+    async def test_call_missing_down_file(self, migration_squash, use_temp_file):
+        """
+        Case: A squashed migration doesn't have a down file. The folder isn't
+            changed.
+        """
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+        await aiofiles.os.remove(
+            Path(f"{use_temp_file}/20230902182614-file-2-down.sql")
+        )
+
+        with pytest.raises(ValueError, match="20230902182614-file-2-down"):
+            await migration_squash(
+                migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+            )
+
+        assert set(await aiofiles.os.listdir(use_temp_file)) == {
+            f"{file_name}.sql"
+            for file_name in MIGRATION_FILES
+            if file_name != "20230902182614-file-2-down"
+        }
+
+    async def test_call_directive(self, migration_squash, use_temp_file):
+        """
+        Case: A squashed migration can't run in a transaction. The folder
+            isn't changed.
+        """
+        await write_migration_files(
+            use_temp_file,
+            {
+                **MIGRATION_FILES,
+                "20230902182614-file-2-up": "-- py-db-migrate:no-transaction\n"
+                "create index concurrently testsquash_id on testsquash (id);",
+            },
+        )
+
+        with pytest.raises(ValueError, match="no-transaction"):
+            await migration_squash(
+                migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+            )
+
+        assert set(await aiofiles.os.listdir(use_temp_file)) == {
+            f"{file_name}.sql" for file_name in MIGRATION_FILES
+        }
+
+    async def test_call_baseline(self, migration_squash, use_temp_file):
+        """
+        Case: An earlier baseline is squashed again. Its directives don't join
+            the header of the new baseline.
+        """
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+        await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182614-file-2"
+        )
+
+        result = await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+        )
+
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{result}.sql"), mode="r"
+        ) as file:
+            contents = await file.read()
+        assert get_directives(contents) == {
+            "baseline": [
+                "20230902182613-file-1-baseline-up",
+                "20230902182614-file-2-up",
+            ]
+        }
+        assert "create table testsquash (id int);" in contents
+
+
+class TestMigrationUpBaseline:
+    async def test_fresh_database(
+        self,
+        migration_squash,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+    ):
+        """
+        Case: The squashed migrations weren't run. Only the baseline and the
+            remaining migration are run.
+        """
+        table_name = create_and_delete_migration_table
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+        await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+        )
+        try:
+            await migration_up(
+                migration_folder=Path(use_temp_file), migration_table=table_name
+            )
+
+            assert await migration_up.get_migrated_file_names_from_db(
+                table=table_name
+            ) == ["20230902182614-file-2-baseline-up", "20230902182615-file-3-up"]
+            assert (
+                len(await migration_up.database.fetch("select * from testsquash")) == 2
+            )
+        finally:
+            await migration_up.database.execute("drop table if exists testsquash")
+
+    async def test_existing_database(
+        self,
+        migration_squash,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+    ):
+        """
+        Case: The squashed migrations were run before. The baseline replaces
+            their rows without running.
+        """
+        table_name = create_and_delete_migration_table
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+        await migration_up.database.execute(
+            f"insert into {table_name} (date, name) values "
+            "('2023-09-02T01:00:00Z', '20230902182613-file-1-up'),"
+            "('2023-09-03T01:00:00Z', '20230902182614-file-2-up')"
+        )
+        await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+        )
+        try:
+            await migration_up.database.execute("create table testsquash (id int)")
+            await migration_up(
+                migration_folder=Path(use_temp_file), migration_table=table_name
+            )
+
+            rows = await migration_up.database.fetch(
+                f"select name, date::text from {table_name} order by date"
+            )
+            assert [row["name"] for row in rows] == [
+                "20230902182614-file-2-baseline-up",
+                "20230902182615-file-3-up",
+            ]
+            assert rows[0]["date"].startswith("2023-09-03")
+            assert await migration_up.database.fetch("select id from testsquash") == [
+                {"id": 2}
+            ]
+        finally:
+            await migration_up.database.execute("drop table if exists testsquash")
+
+    async def test_partially_migrated_database(
+        self,
+        migration_squash,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+    ):
+        """
+        Case: Only some of the squashed migrations were run before.
+        """
+        table_name = create_and_delete_migration_table
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+        await migration_up.database.execute(
+            f"insert into {table_name} (date, name) values "
+            "(now(), '20230902182613-file-1-up')"
+        )
+        await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+        )
+
+        with pytest.raises(MigrationError):
+            await migration_up(
+                migration_folder=Path(use_temp_file), migration_table=table_name
+            )
+
+    async def test_baseline_database(
+        self,
+        migration_squash,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+    ):
+        """
+        Case: The database adopted a baseline which is squashed again.
+        """
+        table_name = create_and_delete_migration_table
+        await write_migration_files(use_temp_file, MIGRATION_FILES)
+        await migration_squash(
+            migration_folder=Path(use_temp_file), before="20230902182614-file-2"
+        )
+        try:
+            await migration_up(
+                migration_folder=Path(use_temp_file), migration_table=table_name
+            )
+            await migration_squash(
+                migration_folder=Path(use_temp_file), before="20230902182615-file-3"
+            )
+
+            await migration_up(
+                migration_folder=Path(use_temp_file), migration_table=table_name
+            )
+
+            assert await migration_up.get_migrated_file_names_from_db(
+                table=table_name
+            ) == ["20230902182614-file-2-baseline-up", "20230902182615-file-3-up"]
+        finally:
+            await migration_up.database.execute("drop table if exists testsquash")
@@ -0,0 +1,64 @@
+"""Unit tests for migration status service."""
+from pathlib import Path
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_status import MigrationStatus
+
+
+@pytest.fixture
+def migration_status(psql) -> MigrationStatus:
+    return MigrationStatus(database=psql)
+
+
+class TestMigrationStatus:
+    async def test_call(
+        self, migration_status, use_temp_file, create_and_delete_migration_table
+    ):
+        table_name = create_and_delete_migration_table  # migration table
+        for file_name in ("file-1-up", "file-2-up"):
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{file_name}.sql"), mode="w"
+            ) as file:
+                await file.write("select 1;")
+        await migration_status.database.execute(
+            f"insert into {table_name} (name, date) values "
+            "('file-1-up','2020-01-03T01:00:00Z'),"
+            "('file-0-up','2020-01-02T01:00:00Z')"
+        )
+
+        result = await migration_status(
+            migration_folder=use_temp_file, migration_table=table_name
+        )
+
+        assert [(state.name, state.missing) for state in result] == [
+            ("file-1-up", False),
+            ("file-2-up", False),
+            ("file-0-up", True),
+        ]
+        assert result[0].date.year == 2020
+        assert result[1].date is None
+
+    async def test_call_no_migration_table(self, migration_status, use_temp_file):
+        """
+        Case: Migration table doesn't exist. So, all migrations are pending.
+        """
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/file-1-up.sql"), mode="w"
+        ) as file:
+            await file.write("select 1;")
+
+        result = await migration_status(
+            migration_folder=use_temp_file, migration_table="testmigrationstatus"
+        )
+
+        assert [state.model_dump() for state in result] == [
+            {"name": "file-1-up", "date": None, "missing": False}
+        ]
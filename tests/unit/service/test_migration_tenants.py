@@ -0,0 +1,176 @@
+"""Unit tests for schema-per-tenant migration service."""
+from uuid import uuid4
+
+import pytest
+
+from tests.conftest import use_temp_file, psql, write_migration_files  # noqa: F401
+
+from py_db_migrate.service.migration_tenants import MigrationTenants
+
+
+@pytest.fixture
+def migration_tenants(psql) -> MigrationTenants:
+    return MigrationTenants(database=psql)
+
+
+@pytest.fixture
+async def tenant_schemas(psql):
+    prefix = "tenant" + uuid4().hex[:8]
+    schemas = [f"{prefix}_{index}" for index in range(3)]
+    for schema in schemas:
+        await psql.execute(f"create schema {schema}")
+    try:
+        yield prefix, schemas
+    finally:
+        for schema in schemas:
+            await psql.execute(f"drop schema {schema} cascade")
+        await psql.execute(f"drop table if exists {prefix}_migration_tenants")
+
+
+class TestMigrationTenants:
+    async def test_call(self, migration_tenants, use_temp_file, tenant_schemas):
+        prefix, schemas = tenant_schemas
+        await write_migration_files(
+            use_temp_file, {"file-1-up": "create table items (id int);"}
+        )
+
+        result = await migration_tenants(
+            migration_folder=use_temp_file,
+            migration_table=f"{prefix}_migration",
+            schema_pattern=f"{prefix}\\_%",
+            concurrency=2,
+        )
+
+        assert [(item.schema_name, item.ok, item.skipped) for item in result] == [
+            (schema, True, False) for schema in schemas
+        ]
+        for schema in schemas:
+            assert await migration_tenants.database.fetch(
+                f"select name from {schema}.{prefix}_migration"
+            ) == [{"name": "file-1-up"}]
+            assert await migration_tenants.database.fetch(
+                f"select count(*) from {schema}.items"
+            ) == [{"count": 0}]
+
+    async def test_call_shared_schema(
+        self, migration_tenants, use_temp_file, tenant_schemas
+    ):
+        """
+        Case: The migration uses a function of the public schema, which also
+        has a migration table with the same name. So, the function is found
+        and the migration table of each tenant is used.
+        """
+        prefix, schemas = tenant_schemas
+        database = migration_tenants.database
+        await database.execute(
+            f"create function public.{prefix}_id() returns int "
+            "language sql as 'select 1'"
+        )
+        await database.execute(
+            f"create table public.{prefix}_migration as select 'file-1-up' as name"
+        )
+        await write_migration_files(
+            use_temp_file,
+            {"file-1-up": f"create table items (id int default {prefix}_id());"},
+        )
+
+        try:
+            result = await migration_tenants(
+                migration_folder=use_temp_file,
+                migration_table=f"{prefix}_migration",
+                schema_pattern=f"{prefix}\\_%",
+            )
+            for schema in schemas:
+                await database.execute(f"insert into {schema}.items default values")
+                assert await database.fetch(f"select id from {schema}.items") == [
+                    {"id": 1}
+                ]
+        finally:
+            await database.execute(f"drop table public.{prefix}_migration")
+            await database.execute(f"drop function public.{prefix}_id cascade")
+
+        assert all(item.ok for item in result)
+
+    async def test_call_parallel_indexes(
+        self, migration_tenants, use_temp_file, tenant_schemas
+    ):
+        """
+        Case: The indexes are built on other connections. So, they are built
+        on the table of each tenant.
+        """
+        prefix, schemas = tenant_schemas
+        await write_migration_files(
+            use_temp_file,
+            {
+                "file-1-up": "create table items (id int);\n"
+                "create table tags (id int);",
+                "file-2-up": "-- py-db-migrate:parallel-indexes 2\n"
+                "create index concurrently items_id on items (id);\n"
+                "create index concurrently tags_id on tags (id);",
+            },
+        )
+
+        result = await migration_tenants(
+            migration_folder=use_temp_file,
+            migration_table=f"{prefix}_migration",
+            schema_pattern=f"{prefix}\\_%",
+        )
+
+        assert all(item.ok for item in result)
+        for schema in schemas:
+            assert await migration_tenants.database.fetch(
+                "select indexname from pg_indexes where tablename in "
+                f"('items', 'tags') and schemaname = '{schema}' order by indexname"
+            ) == [{"indexname": "items_id"}, {"indexname": "tags_id"}]
+
+    async def test_call_resume(self, migration_tenants, use_temp_file, tenant_schemas):
+        """
+        Case: A schema fails. So, only it is migrated again in the next run,
+        until the migration files change.
+        """
+        prefix, schemas = tenant_schemas
+        await migration_tenants.database.execute(
+            f"create table {schemas[1]}.items (name text)"
+        )
+        await write_migration_files(
+            use_temp_file, {"file-1-up": "create table items (id int);"}
+        )
+
+        first = await migration_tenants(
+            migration_folder=use_temp_file,
+            migration_table=f"{prefix}_migration",
+            schema_query=f"select nspname from pg_namespace where nspname like "
+            f"'{prefix}%'",
+        )
+        await migration_tenants.database.execute(f"drop table {schemas[1]}.items")
+        second = await migration_tenants(
+            migration_folder=use_temp_file,
+            migration_table=f"{prefix}_migration",
+            schema_pattern=f"{prefix}\\_%",
+        )
+        await write_migration_files(
+            use_temp_file, {"file-2-up": "alter table items add column name text;"}
+        )
+        third = await migration_tenants(
+            migration_folder=use_temp_file,
+            migration_table=f"{prefix}_migration",
+            schema_pattern=f"{prefix}\\_%",
+        )
+
+        assert [(item.ok, item.skipped) for item in first] == [
+            (True, False),
+            (False, False),
+            (True, False),
+        ]
+        assert [(item.ok, item.skipped) for item in second] == [
+            (True, True),
+            (True, False),
+            (True, True),
+        ]
+        assert [(item.ok, item.skipped) for item in third] == [(True, False)] * 3
+
+    async def test_call_no_schema_filter(self, migration_tenants, use_temp_file):
+        with pytest.raises(ValueError):
+            await migration_tenants(
+                migration_folder=use_temp_file, migration_table="pydbmigration"
+            )
@@ -1,4 +1,6 @@
 """Unit tests for migration up service."""
+import gzip
+
 import aiofiles.os
 import pytest
 
@@ -155,6 +157,52 @@ class TestMigrationUp:
 
         assert not check_query_migration_table
 
+    async def test_migration_file_connection_lost(
+        self, migration_up, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: The connection is terminated while a migration runs. So, it
+        isn't retried and it isn't recorded.
+        """
+        table_name = create_and_delete_migration_table
+        file_name = "20230902182613-file-1-up"
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql"),
+            mode="w",
+        ) as file:
+            await file.write("select pg_terminate_backend(pg_backend_pid());")
+
+        with pytest.raises(MigrationError, match="Connection was lost"):
+            await migration_up(
+                migration_folder=Path(use_temp_file),
+                migration_table=table_name,
+            )
+
+        assert await migration_up.database.fetch(f"select * from {table_name}") == []
+
+    async def test_migration_file_rollback_error(
+        self, migration_up, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: A migration fails with a serialization error. The connection
+        isn't lost, so the problem of the file is reported.
+        """
+        table_name = create_and_delete_migration_table
+        file_name = "20230902182613-file-1-up"
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql"),
+            mode="w",
+        ) as file:
+            await file.write(
+                "do $$ begin raise exception using errcode = '40001'; end $$;"
+            )
+
+        with pytest.raises(MigrationError, match="Problem occurred"):
+            await migration_up(
+                migration_folder=Path(use_temp_file),
+                migration_table=table_name,
+            )
+
     async def test_migration_file_not_found(self, migration_up):
         """
         Case: The given migration_up folder doesn't exist. The program will raise
@@ -229,6 +277,178 @@ class TestMigrateFile:
                 migration_table="testmigratefileemptyfile",
             )
 
+    async def test_migrate_file_python(
+        self, migration_up, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: Python migration file is run with the connection of the migration.
+        """
+        file_name = "20231002182613-file-4-up"
+        new_table_name = "testmigratefilepython"
+        table_name = create_and_delete_migration_table  # migration table
+        try:
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{file_name}.py"),
+                mode="w",
+            ) as file:
+                await file.write(
+                    "async def up(conn):\n"
+                    "    await conn.execute(\n"
+                    f"        'create table {new_table_name} (id int)'\n"
+                    "    )\n"
+                    "    await conn.executemany(\n"
+                    f"        'insert into {new_table_name} (id) values ($1)',\n"
+                    "        [(i,) for i in range(3)],\n"
+                    "    )\n"
+                )
+
+            await migration_up.migrate_file(
+                migration_folder=use_temp_file,
+                migration_file=file_name,
+                migration_table=table_name,
+            )
+
+            check_query = await migration_up.database.fetch(
+                f"select * from {new_table_name}"
+            )
+            [check_migration_table_query] = await migration_up.database.fetch(
+                f"select name from {table_name}"
+            )
+
+            assert len(check_query) == 3
+            assert check_migration_table_query["name"] == file_name
+
+        finally:
+            await migration_up.database.execute(
+                f"drop table if exists {new_table_name}"
+            )
+
+    async def test_migrate_file_python_error(
+        self, migration_up, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: Python migration raises. So, its changes are rolled back.
+        """
+        file_name = "20231002182613-file-5-up"
+        new_table_name = "testmigratefilepythonerror"
+        table_name = create_and_delete_migration_table  # migration table
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.py"),
+            mode="w",
+        ) as file:
+            await file.write(
+                "async def up(conn):\n"
+                f"    await conn.execute('create table {new_table_name} (id int)')\n"
+                "    raise RuntimeError('failed')\n"
+            )
+
+        with pytest.raises(RuntimeError):
+            await migration_up.migrate_file(
+                migration_folder=use_temp_file,
+                migration_file=file_name,
+                migration_table=table_name,
+            )
+
+        check_query = await migration_up.database.fetch(
+            f"select to_regclass('{new_table_name}') as name"
+        )
+        assert check_query == [{"name": None}]
+        assert await migration_up.database.fetch(f"select * from {table_name}") == []
+
+    async def test_migrate_file_compressed(
+        self, migration_up, use_temp_file, create_and_delete_migration_table
+    ):
+        """
+        Case: Gzip compressed file is run statement by statement.
+        """
+        file_name = "20231002182613-file-6-up"
+        new_table_name = "testmigratefilecompressed"
+        table_name = create_and_delete_migration_table  # migration table
+        try:
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{file_name}.sql.gz"),
+                mode="wb",
+            ) as file:
+                await file.write(
+                    gzip.compress(
+                        f"create table {new_table_name} (id int);\n"
+                        f"insert into {new_table_name} (id) values (1), (2);".encode()
+                    )
+                )
+
+            await migration_up.migrate_file(
+                migration_folder=use_temp_file,
+                migration_file=file_name,
+                migration_table=table_name,
+            )
+
+            check_query = await migration_up.database.fetch(
+                f"select * from {new_table_name}"
+            )
+            [check_migration_table_query] = await migration_up.database.fetch(
+                f"select name from {table_name}"
+            )
+
+            assert len(check_query) == 2
+            assert check_migration_table_query["name"] == file_name
+
+        finally:
+            await migration_up.database.execute(
+                f"drop table if exists {new_table_name}"
+            )
+
+    async def test_migrate_file_compressed_empty_file(
+        self, migration_up, use_temp_file
+    ):
+        """
+        Case: Given compressed file is empty. So, it will raise Empty file error.
+        """
+        file_name = "20231002182613-file-7-up"
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql.gz"),
+            mode="wb",
+        ) as file:
+            await file.write(gzip.compress(b"/* random comments */ "))
+
+        with pytest.raises(EmptyFileError):
+            await migration_up.migrate_file(
+                migration_folder=use_temp_file,
+                migration_file=file_name,
+                migration_table="testmigratefileemptyfile",
+            )
+
+
+class TestPrefetchMigrationFiles:
+    @pytest.mark.parametrize("prefetch", [0, 1, 4])
+    async def test_prefetch_migration_files(
+        self, migration_up, use_temp_file, prefetch
+    ):
+        """
+        Case: Files are read ahead in order. Python files have no contents.
+        """
+        for file_name, contents in (
+            ("file-1-up.sql", "select 1;"),
+            ("file-2-up.py", "async def up(conn):\n    pass\n"),
+            ("file-3-up.sql", "select 3;"),
+        ):
+            async with aiofiles.open(Path(f"{use_temp_file}/{file_name}"), "w") as file:
+                await file.write(contents)
+
+        result = [
+            item
+            async for item in migration_up.prefetch_migration_files(
+                migration_folder=Path(use_temp_file),
+                migration_files=("file-1-up", "file-2-up", "file-3-up"),
+                prefetch=prefetch,
+            )
+        ]
+
+        assert result == [
+            ("file-1-up", "select 1;"),
+            ("file-2-up", None),
+            ("file-3-up", "select 3;"),
+        ]
+
 
 class TestGetExistingMigrationFilesFromMigrationFolder:
     async def test_get_existing_migration_files_from_migration_folder(
@@ -302,3 +522,96 @@ class TestGetMigratedFileNamesFromDatabase:
             assert result == []
         finally:
             await migration_up.database.execute(f"drop table {table_name}")
+
+
+class TestFetchOrCreateMigrationTable:
+    async def test_fetch_or_create_migration_table(
+        self, migration_up, create_and_delete_migration_table
+    ):
+        table_name = create_and_delete_migration_table
+        await migration_up.database.execute(
+            f"insert into {table_name} (date, name) values "
+            "('2022-09-23T01:00:00Z', 'file2-up'),"
+            "('2021-09-23T01:00:00Z', 'file1-up')"
+        )
+
+        result = await migration_up.fetch_or_create_migration_table(name=table_name)
+
+        assert result == ["file1-up", "file2-up"]
+
+    async def test_fetch_or_create_migration_table_missing(self, migration_up):
+        """
+        Case: Migration table doesn't exist. So, it is created.
+        """
+        table_name = "testfetchorcreatemigrationtable"
+        try:
+            result = await migration_up.fetch_or_create_migration_table(name=table_name)
+
+            assert result == []
+            assert await migration_up.database.fetch(
+                f"select to_regclass('{table_name}') is not null as exists"
+            ) == [{"exists": True}]
+        finally:
+            await migration_up.database.execute(f"drop table if exists {table_name}")
+
+    async def test_fetch_or_create_migration_table_in_transaction(self, migration_up):
+        """
+        Case: Migration table doesn't exist in a transaction. So, the
+        transaction is still usable after the fetch fails.
+        """
+        table_name = "testfetchorcreatemigrationtabletransaction"
+        async with migration_up.database.session() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                result = await migration_up.fetch_or_create_migration_table(
+                    name=table_name
+                )
+                assert result == []
+                assert await migration_up.database.fetch(
+                    f"select count(*) from {table_name}"
+                ) == [{"count": 0}]
+            finally:
+                await transaction.rollback()
+
+
+class TestGetPendingMigrationFiles:
+    async def test_get_pending_migration_files(
+        self, migration_up, use_temp_file, create_and_delete_migration_table
+    ):
+        table_name = create_and_delete_migration_table
+        for file_name in (
+            "20230902182613-file-1-up",
+            "20230802182613-file-2-up",
+        ):
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{file_name}.sql"),
+                mode="w",
+            ) as file:
+                await file.write("/* testing */")
+
+        await migration_up.database.execute(
+            f"insert into {table_name} (date, name) values "
+            "(now(), '20230802182613-file-2-up')"
+        )
+
+        result = await migration_up.get_pending_migration_files(
+            migration_folder=Path(use_temp_file), migration_table=table_name
+        )
+
+        assert result == ("20230902182613-file-1-up",)
+
+    async def test_get_pending_migration_files_folder_not_found(
+        self, migration_up, create_and_delete_migration_table
+    ):
+        """
+        Case: Migration folder doesn't exist. So, the connection which is
+        opened meanwhile is closed.
+        """
+        with pytest.raises(FolderNotFoundError):
+            await migration_up.get_pending_migration_files(
+                migration_folder=Path("./temp"),
+                migration_table=create_and_delete_migration_table,
+            )
+
+        assert migration_up.database._connection is None
@@ -0,0 +1,157 @@
+"""Unit tests for migration watch service."""
+import asyncio
+import os
+from pathlib import Path
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+
+from py_db_migrate.database.postgresql import PSql
+from py_db_migrate.service.migration_watch import MigrationWatch
+
+
+@pytest.fixture
+def migration_watch(psql) -> MigrationWatch:
+    return MigrationWatch(database=psql)
+
+
+@pytest.fixture
+async def migration_table(migration_watch):
+    table_name = "testmigrationwatchtable"
+    await migration_watch.create_migration_table(name=table_name)
+    yield table_name
+    await migration_watch.database.execute(f"drop table {table_name}")
+
+
+async def write_file(path: Path, contents: str) -> None:
+    async with aiofiles.open(path, mode="w") as file:
+        await file.write(contents)
+
+
+async def wait_for_rows(migration_watch, query: str, count: int) -> list:
+    # The watcher pins the connection of its database, so poll on another one.
+    database = PSql(**migration_watch.database.model_dump())
+    for _ in range(100):
+        rows = await database.fetch(query)
+        if len(rows) == count:
+            return rows
+        await asyncio.sleep(0.05)
+    return rows
+
+
+class TestMigrationWatch:
+    async def test_call(self, migration_watch, use_temp_file, migration_table):
+        """
+        Case: New migration files are run while watching.
+        """
+        folder = Path(use_temp_file)
+        await write_file(folder / "20231002182613-file-1-up.sql", "select 1;")
+
+        task = asyncio.create_task(
+            migration_watch(
+                migration_folder=folder,
+                migration_table=migration_table,
+                interval=0.01,
+            )
+        )
+        try:
+            rows = await wait_for_rows(
+                migration_watch, f"select name from {migration_table}", 1
+            )
+            assert rows == [{"name": "20231002182613-file-1-up"}]
+
+            await write_file(folder / "20231002182614-file-2-up.sql", "select 2;")
+            rows = await wait_for_rows(
+                migration_watch, f"select name from {migration_table}", 2
+            )
+            assert len(rows) == 2
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    async def test_call_connection_lost(
+        self, migration_watch, use_temp_file, migration_table
+    ):
+        """
+        Case: The connection of the watcher is terminated. So, a new one is
+        opened and the next migration is run on it.
+        """
+        folder = Path(use_temp_file)
+        await write_file(folder / "20231002182613-file-1-up.sql", "select 1;")
+
+        task = asyncio.create_task(
+            migration_watch(
+                migration_folder=folder,
+                migration_table=migration_table,
+                interval=0.01,
+            )
+        )
+        try:
+            await wait_for_rows(
+                migration_watch, f"select name from {migration_table}", 1
+            )
+            pid = migration_watch.database._connection.get_server_pid()
+            await PSql(**migration_watch.database.model_dump()).execute(
+                f"select pg_terminate_backend({pid})"
+            )
+
+            await write_file(folder / "20231002182614-file-2-up.sql", "select 2;")
+            rows = await wait_for_rows(
+                migration_watch, f"select name from {migration_table}", 2
+            )
+            assert len(rows) == 2
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    async def test_call_failed_migration(
+        self, migration_watch, use_temp_file, migration_table
+    ):
+        """
+        Case: Failed migration is tried again after its file is changed.
+        """
+        folder = Path(use_temp_file)
+        path = folder / "20231002182613-file-1-up.sql"
+        await write_file(path, "selec 1;")
+
+        await migration_watch(
+            migration_folder=folder, migration_table=migration_table, max_checks=1
+        )
+        rows = await migration_watch.database.fetch(
+            f"select name from {migration_table}"
+        )
+        assert rows == []
+
+        await write_file(path, "select 1;")
+        os.utime(path, ns=(0, 0))
+        await migration_watch(
+            migration_folder=folder, migration_table=migration_table, max_checks=1
+        )
+        assert await migration_watch.database.fetch(
+            f"select name from {migration_table}"
+        ) == [{"name": "20231002182613-file-1-up"}]
+
+    async def test_call_python_error(
+        self, migration_watch, use_temp_file, migration_table
+    ):
+        """
+        Case: The error of a Python migration doesn't stop watching.
+        """
+        folder = Path(use_temp_file)
+        await write_file(
+            folder / "20231002182613-file-1-up.py",
+            "async def up(conn):\n    raise RuntimeError('failed')\n",
+        )
+
+        await migration_watch(
+            migration_folder=folder, migration_table=migration_table, max_checks=2
+        )
+
+        rows = await migration_watch.database.fetch(
+            f"select name from {migration_table}"
+        )
+        assert rows == []
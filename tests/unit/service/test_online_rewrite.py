@@ -0,0 +1,274 @@
+"""Unit tests for online table rewrite service."""
+import asyncio
+
+import pytest
+
+from tests.conftest import (  # noqa: F401
+    use_temp_file,
+    psql,
+    write_migration_files,
+)
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service.migration_up import MigrationError
+
+FILE_NAME = "20230902182613-file-1-up"
+
+
+@pytest.fixture
+async def rewrite_tables(psql):
+    await psql.execute(
+        "create table testrewriteparent (id int primary key);"
+        "insert into testrewriteparent values (1);"
+        "create table testrewrite ("
+        "id serial primary key, "
+        "parent_id int references testrewriteparent (id), "
+        "total int not null);"
+        "create index testrewrite_total on testrewrite (total);"
+        "insert into testrewrite (parent_id, total) "
+        "select 1, i from generate_series(1, 25) i;"
+    )
+    try:
+        yield
+    finally:
+        await psql.execute(
+            "drop table if exists testrewrite, testrewriteparent, _testrewrite_new;"
+            "drop function if exists _testrewrite_sync();"
+        )
+
+
+class TestOnlineRewriter:
+    async def test_call(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        rewrite_tables,
+    ):
+        table_name = create_and_delete_migration_table
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:online-rewrite testrewrite\n"
+                "-- py-db-migrate:rewrite-batch-size 10\n"
+                "alter table testrewrite alter column total type bigint;\n"
+                "alter table testrewrite add column note text;"
+            },
+        )
+
+        await migration_up(migration_folder=use_temp_file, migration_table=table_name)
+        await migration_up.database.execute(
+            "insert into testrewrite (parent_id, total) values (1, 26)"
+        )
+
+        database = migration_up.database
+        assert await database.fetch(
+            "select count(*), sum(total), max(id) from testrewrite"
+        ) == [{"count": 26, "sum": 351, "max": 26}]
+        assert await database.fetch(
+            "select format_type(atttypid, atttypmod) as type from pg_attribute "
+            "where attrelid = 'testrewrite'::regclass and attname = 'total'"
+        ) == [{"type": "bigint"}]
+        assert await database.fetch(
+            "select indexname from pg_indexes where tablename = 'testrewrite' "
+            "order by indexname"
+        ) == [{"indexname": "testrewrite_pkey"}, {"indexname": "testrewrite_total"}]
+        assert await database.fetch(
+            "select conname, convalidated from pg_constraint "
+            "where conrelid = 'testrewrite'::regclass and contype = 'f'"
+        ) == [{"conname": "testrewrite_parent_id_fkey", "convalidated": True}]
+        assert await database.fetch(f"select name from {table_name}") == [
+            {"name": FILE_NAME}
+        ]
+
+    async def test_call_concurrent_changes(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        rewrite_tables,
+    ):
+        """
+        Case: The table changes while its rows are copied. So, the changes
+        are copied by the trigger.
+        """
+        table_name = create_and_delete_migration_table
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:online-rewrite public.testrewrite\n"
+                "-- py-db-migrate:rewrite-batch-size 10\n"
+                "-- py-db-migrate:rewrite-batch-delay 0.3\n"
+                "alter table testrewrite alter column total type bigint;"
+            },
+        )
+
+        migration = asyncio.create_task(
+            migration_up(migration_folder=use_temp_file, migration_table=table_name)
+        )
+        await asyncio.sleep(0.15)
+        await migration_up.database.execute(
+            "update testrewrite set total = 100 where id in (5, 25);"
+            "delete from testrewrite where id in (6, 24);"
+            "insert into testrewrite (parent_id, total) values (1, 26);"
+        )
+        await migration
+
+        assert await migration_up.database.fetch(
+            "select id, total from testrewrite where id in (5, 6, 24, 25, 26) "
+            "order by id"
+        ) == [
+            {"id": 5, "total": 100},
+            {"id": 25, "total": 100},
+            {"id": 26, "total": 26},
+        ]
+        assert await migration_up.database.fetch(
+            "select count(*) from testrewrite"
+        ) == [{"count": 24}]
+
+    async def test_call_not_alter_table(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        rewrite_tables,
+    ):
+        table_name = create_and_delete_migration_table
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:online-rewrite testrewrite\n"
+                "alter table testrewrite add column note text;\n"
+                "update testrewrite set note = 'a';"
+            },
+        )
+
+        with pytest.raises(MigrationError):
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+
+        assert await migration_up.database.fetch(
+            "select to_regclass('_testrewrite_new') as name"
+        ) == [{"name": None}]
+        assert await migration_up.database.fetch(f"select name from {table_name}") == []
+
+    async def test_call_table_setup(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        rewrite_tables,
+    ):
+        """
+        Case: The table has privileges, row level security, a policy and a
+        trigger. So, they are given to the rewritten table.
+        """
+        table_name = create_and_delete_migration_table
+        database = migration_up.database
+        await database.execute(
+            "create role testrewrite_reader;"
+            "grant select on testrewrite to testrewrite_reader;"
+            "grant update (total) on testrewrite to testrewrite_reader;"
+            "alter table testrewrite enable row level security;"
+            "alter table testrewrite force row level security;"
+            "create policy testrewrite_positive on testrewrite for select "
+            "to testrewrite_reader using (total > 0);"
+            "create function testrewrite_touch() returns trigger "
+            "language plpgsql as "
+            "'begin new.total := new.total + 1000; return new; end';"
+            "create trigger testrewrite_touch before insert on testrewrite "
+            "for each row execute function testrewrite_touch();"
+        )
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:online-rewrite testrewrite\n"
+                "alter table testrewrite add column note text;"
+            },
+        )
+
+        try:
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+            await database.execute(
+                "insert into testrewrite (parent_id, total) values (1, 1)"
+            )
+
+            assert await database.fetch(
+                "select sum(total) from testrewrite where id <= 25"
+            ) == [{"sum": 325}]
+            assert await database.fetch(
+                "select total from testrewrite where id = 26"
+            ) == [{"total": 1001}]
+            assert await database.fetch(
+                "select relrowsecurity, relforcerowsecurity, "
+                "has_table_privilege('testrewrite_reader', oid, 'select') "
+                "as can_select, "
+                "has_column_privilege('testrewrite_reader', oid, 'total', 'update') "
+                "as can_update "
+                "from pg_class where oid = 'testrewrite'::regclass"
+            ) == [
+                {
+                    "relrowsecurity": True,
+                    "relforcerowsecurity": True,
+                    "can_select": True,
+                    "can_update": True,
+                }
+            ]
+            assert await database.fetch(
+                "select policyname, roles::text[], qual from pg_policies "
+                "where tablename = 'testrewrite'"
+            ) == [
+                {
+                    "policyname": "testrewrite_positive",
+                    "roles": ["testrewrite_reader"],
+                    "qual": "(total > 0)",
+                }
+            ]
+        finally:
+            await database.execute(
+                "drop table if exists testrewrite cascade;"
+                "drop owned by testrewrite_reader;"
+                "drop role testrewrite_reader;"
+                "drop function testrewrite_touch();"
+            )
+
+    async def test_call_copy_error(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        rewrite_tables,
+    ):
+        """
+        Case: A row can't be copied to the shadow table. So, the shadow
+        table, the trigger and its function are dropped.
+        """
+        table_name = create_and_delete_migration_table
+        database = migration_up.database
+        await database.execute("update testrewrite set total = 100000 where id = 5")
+        await write_migration_files(
+            use_temp_file,
+            {
+                FILE_NAME: "-- py-db-migrate:online-rewrite testrewrite\n"
+                "alter table testrewrite alter column total type smallint;"
+            },
+        )
+
+        with pytest.raises(MigrationError):
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+
+        assert await database.fetch(
+            "select to_regclass('_testrewrite_new') as name, "
+            "to_regprocedure('_testrewrite_sync()') as function, "
+            "(select count(*) from pg_trigger "
+            "where tgrelid = 'testrewrite'::regclass and not tgisinternal) "
+            "as triggers"
+        ) == [{"name": None, "function": None, "triggers": 0}]
@@ -0,0 +1,191 @@
+"""Unit tests for parallel index build service."""
+from pathlib import Path
+
+import aiofiles.os
+import pytest
+from asyncpg.exceptions import UniqueViolationError
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service import IndexBuildError
+from py_db_migrate.service.migration_up import MigrationError
+from py_db_migrate.service.parallel_indexes import (
+    ParallelIndexBuilder,
+    get_index_build_chains,
+)
+from py_db_migrate.service.sql_parser import split_sql_statements
+
+
+@pytest.fixture
+async def index_tables(psql):
+    await psql.execute(
+        "create table testindexa (id int, name text);"
+        "create table testindexb (id int, name text);"
+    )
+    try:
+        yield
+    finally:
+        await psql.execute("drop table testindexa, testindexb")
+
+
+async def get_index_names(psql) -> list[str]:
+    records = await psql.fetch(
+        "select indexname from pg_indexes where tablename in "
+        "('testindexa', 'testindexb') order by indexname"
+    )
+    return [record["indexname"] for record in records]
+
+
+class TestGetIndexBuildChains:
+    def test_get_index_build_chains(self):
+        """
+        Case: Concurrent builds on the same table are chained. Other builds
+        are independent.
+        """
+        statements = split_sql_statements(
+            "create index concurrently i1 on a (id);\n"
+            "create index i2 on a (name);\n"
+            "create index concurrently i3 on a (name);\n"
+            "create index concurrently i4 on b (id);"
+        )
+
+        result = get_index_build_chains("file", statements)
+
+        assert [[statement.line for statement in chain] for chain in result] == [
+            [1, 3],
+            [2],
+            [4],
+        ]
+
+    def test_get_index_build_chains_not_index(self):
+        with pytest.raises(IndexBuildError):
+            get_index_build_chains(
+                "file", split_sql_statements("create index i on a (id); select 1;")
+            )
+
+
+class TestParallelIndexBuilder:
+    async def test_call(self, psql, index_tables):
+        await ParallelIndexBuilder(database=psql)(
+            migration_file="file",
+            contents="create index concurrently testindexa_id on testindexa (id);\n"
+            "create index testindexb_id on testindexb (id);\n"
+            "create index testindexb_name on testindexb (name);",
+            parallelism=2,
+            settings={"maintenance_work_mem": "16MB"},
+        )
+
+        assert await get_index_names(psql) == [
+            "testindexa_id",
+            "testindexb_id",
+            "testindexb_name",
+        ]
+
+    async def test_call_invalid_index(self, psql, index_tables):
+        """
+        Case: A concurrent build fails on duplicate values. So, its invalid
+        index is dropped and the finished index stays.
+        """
+        await psql.execute("insert into testindexa (id) values (1), (1)")
+
+        with pytest.raises(UniqueViolationError):
+            await ParallelIndexBuilder(database=psql)(
+                migration_file="file",
+                contents="create index concurrently testindexb_id on testindexb (id);"
+                "\ncreate unique index concurrently testindexa_id "
+                "on testindexa (id);",
+                parallelism=1,
+            )
+
+        assert await get_index_names(psql) == ["testindexb_id"]
+
+    async def test_call_search_path(self, psql):
+        """
+        Case: The database has a search path. So, the unqualified indexes are
+        built on the tables of its schema.
+        """
+        await psql.execute(
+            "create schema testindexschema;"
+            "create table testindexschema.testindexa (id int);"
+            "create table testindexschema.testindexb (id int);"
+        )
+        try:
+            await ParallelIndexBuilder(
+                database=psql.clone(search_path="testindexschema")
+            )(
+                migration_file="file",
+                contents="create index concurrently testindexa_id on testindexa (id);"
+                "\ncreate index testindexb_id on testindexb (id);",
+                parallelism=2,
+            )
+
+            records = await psql.fetch(
+                "select indexname from pg_indexes "
+                "where schemaname = 'testindexschema' order by indexname"
+            )
+            assert [record["indexname"] for record in records] == [
+                "testindexa_id",
+                "testindexb_id",
+            ]
+        finally:
+            await psql.execute("drop schema testindexschema cascade")
+
+    async def test_call_migration(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        index_tables,
+    ):
+        table_name = create_and_delete_migration_table
+        file_name = "20230902182613-file-1-up"
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql"), mode="w"
+        ) as file:
+            await file.write(
+                "-- py-db-migrate:parallel-indexes 2\n"
+                "-- py-db-migrate:max-parallel-maintenance-workers 0\n"
+                "create index concurrently testindexa_id on testindexa (id);\n"
+                "create index concurrently testindexb_id on testindexb (id);"
+            )
+
+        await migration_up(migration_folder=use_temp_file, migration_table=table_name)
+
+        assert await get_index_names(migration_up.database) == [
+            "testindexa_id",
+            "testindexb_id",
+        ]
+        assert await migration_up.database.fetch(f"select name from {table_name}") == [
+            {"name": file_name}
+        ]
+
+    async def test_call_migration_error(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        index_tables,
+    ):
+        """
+        Case: A build fails. So, the migration isn't recorded.
+        """
+        table_name = create_and_delete_migration_table
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/20230902182613-file-1-up.sql"), mode="w"
+        ) as file:
+            await file.write(
+                "-- py-db-migrate:parallel-indexes 2\n"
+                "create index testindexa_id on testindexa (id);\n"
+                "create index testindexb_id on testindexb (missing);"
+            )
+
+        with pytest.raises(MigrationError):
+            await migration_up(
+                migration_folder=use_temp_file, migration_table=table_name
+            )
+
+        assert await migration_up.database.fetch(f"select name from {table_name}") == []
@@ -0,0 +1,86 @@
+"""Unit tests for replica lag throttle service."""
+from pathlib import Path
+from uuid import uuid4
+
+import aiofiles.os
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+from tests.unit.service.test_migration_up import (  # noqa: F401
+    create_and_delete_migration_table,
+    migration_up,
+)
+
+from py_db_migrate.service import replica_lag
+from py_db_migrate.service.replica_lag import ReplicaLagThrottle
+
+
+def get_dsn(psql) -> str:
+    return (
+        f"postgresql://{psql.user}:{psql.password}@{psql.host}:{psql.port}/"
+        f"{psql.name}"
+    )
+
+
+@pytest.fixture
+async def lagging_replica(psql, monkeypatch):
+    """The lag is 10 seconds in the first two checks and 0 after them."""
+    sequence = "a" + uuid4().hex
+    await psql.execute(f"create sequence {sequence}")
+    monkeypatch.setattr(
+        replica_lag,
+        "REPLICA_LAG_QUERY",
+        f"SELECT CASE WHEN nextval('{sequence}') <= 2 THEN 10 ELSE 0 END::float8",
+    )
+    try:
+        yield ReplicaLagThrottle(
+            database=psql, max_lag=1, replicas=[get_dsn(psql)], interval=0.01
+        )
+    finally:
+        await psql.execute(f"drop sequence {sequence}")
+
+
+class TestReplicaLagThrottle:
+    async def test_call(self, psql):
+        """
+        Case: The primary and the replica are in sync. So, it doesn't wait.
+        """
+        primary = ReplicaLagThrottle(database=psql, max_lag=1)
+        replica = ReplicaLagThrottle(database=psql, max_lag=1, replicas=[get_dsn(psql)])
+
+        assert await primary(before="file") == 0.0
+        assert await replica(before="file") == 0.0
+        assert primary.waited == replica.waited == 0.0
+
+    async def test_call_wait(self, lagging_replica):
+        result = await lagging_replica(before="file")
+
+        assert result > 0
+        assert lagging_replica.waited == result
+        assert await lagging_replica.get_lag() == 0
+
+    async def test_migration_up(
+        self,
+        migration_up,
+        use_temp_file,
+        create_and_delete_migration_table,
+        lagging_replica,
+    ):
+        """
+        Case: The replica lags before the first migration. So, the
+        migrations wait for it.
+        """
+        table_name = create_and_delete_migration_table
+        for name in ("20230902182613-file-1-up", "20230902182614-file-2-up"):
+            async with aiofiles.open(
+                Path(f"{use_temp_file}/{name}.sql"), mode="w"
+            ) as file:
+                await file.write("select 1;")
+        migration_up.throttle = lagging_replica
+
+        result = await migration_up(
+            migration_folder=use_temp_file, migration_table=table_name
+        )
+
+        assert len(result) == 2
+        assert lagging_replica.waited > 0
@@ -0,0 +1,265 @@
+"""Unit tests for sql parser functions of service layer."""
+import pytest
+
+from py_db_migrate.service.sql_parser import (
+    LockLevel,
+    SqlStatement,
+    SqlStatementSplitter,
+    classify_statement,
+    find_syntax_errors,
+    get_created_table,
+    get_altered_table,
+    get_directives,
+    get_indexed_table,
+    remove_directives,
+    split_sql_statements,
+)
+
+
+class TestSplitSqlStatements:
+    def test_split_sql_statements(self):
+        result = split_sql_statements(
+            "create table a (id int);\n"
+            "insert into a (id) values (1);\n\n"
+            "select * from a"
+        )
+
+        assert result == [
+            SqlStatement(query="create table a (id int)", line=1),
+            SqlStatement(query="insert into a (id) values (1)", line=2),
+            SqlStatement(query="select * from a", line=4),
+        ]
+
+    def test_split_sql_statements_quoted_semicolons(self):
+        """
+        Case: Semicolons inside literals, identifiers, dollar quoted bodies and
+            comments don't split the statement.
+        """
+        contents = (
+            "insert into a values (';', E'\\';', 'it''s;');\n"
+            'select "a;b" from c;\n'
+            "do $body$ begin perform 1; end $body$;\n"
+            "select 1 /* ; /* nested; */ ; */ -- ;\n"
+            ";"
+        )
+        result = split_sql_statements(contents)
+
+        assert [statement.query for statement in result] == [
+            "insert into a values (';', E'\\';', 'it''s;')",
+            'select "a;b" from c',
+            "do $body$ begin perform 1; end $body$",
+            "select 1 /* ; /* nested; */ ; */ -- ;",
+        ]
+        assert [statement.line for statement in result] == [1, 2, 3, 4]
+
+    def test_split_sql_statements_only_comments(self):
+        """
+        Case: The contents don't include any command.
+        """
+        assert split_sql_statements("/* Insert your SQL commands here. */") == []
+        assert split_sql_statements("-- comment\n ; ;") == []
+
+
+class TestSqlStatementSplitter:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+    def test_sql_statement_splitter(self, chunk_size):
+        """
+        Case: The statements are the same as the ones of the whole contents
+        wherever the chunks are cut.
+        """
+        contents = (
+            "create table a (id int, name text default 'a;b');\n"
+            "/* comment; */ insert into a (id) values (1);\n"
+            "create function f() returns int as $$ select 1; $$ language sql;\n"
+            "select * from a"
+        )
+        splitter = SqlStatementSplitter()
+        result = []
+        for start in range(0, len(contents), chunk_size):
+            end = start + chunk_size
+            result.extend(splitter.feed(contents[start:end]))
+        result.extend(splitter.close())
+
+        assert result == split_sql_statements(contents)
+
+
+class TestSqlStatement:
+    def test_keyword(self):
+        assert SqlStatement(query="update a set b = 1", line=1).keyword == "UPDATE"
+        assert SqlStatement(query="(select 1)", line=1).keyword == ""
+
+
+class TestClassifyStatement:
+    @pytest.mark.parametrize(
+        "query,lock,rewrite,scan,tables",
+        [
+            (
+                "ALTER TABLE users ALTER COLUMN id TYPE bigint",
+                LockLevel.ACCESS_EXCLUSIVE,
+                True,
+                False,
+                ["users"],
+            ),
+            (
+                "alter table public.Users add column name text default 'a, b'",
+                LockLevel.ACCESS_EXCLUSIVE,
+                False,
+                False,
+                ["public.users"],
+            ),
+            (
+                "alter table a add column b uuid default gen_random_uuid()",
+                LockLevel.ACCESS_EXCLUSIVE,
+                True,
+                False,
+                ["a"],
+            ),
+            (
+                'alter table a add constraint fk foreign key (b) references "C" (id) '
+                "not valid",
+                LockLevel.SHARE_ROW_EXCLUSIVE,
+                False,
+                False,
+                ["a", "C"],
+            ),
+            (
+                "alter table a add column b int, "
+                "add constraint fk foreign key (b) references c (id)",
+                LockLevel.ACCESS_EXCLUSIVE,
+                False,
+                True,
+                ["a", "c"],
+            ),
+            (
+                "alter table a validate constraint fk",
+                LockLevel.SHARE_UPDATE_EXCLUSIVE,
+                False,
+                True,
+                ["a"],
+            ),
+            (
+                "alter table a alter column b set not null",
+                LockLevel.ACCESS_EXCLUSIVE,
+                False,
+                True,
+                ["a"],
+            ),
+            (
+                "create index concurrently idx on only a (b)",
+                LockLevel.SHARE_UPDATE_EXCLUSIVE,
+                False,
+                True,
+                ["a"],
+            ),
+            (
+                "create unique index idx on a using btree (b)",
+                LockLevel.SHARE,
+                False,
+                True,
+                ["a"],
+            ),
+            ("vacuum full a", LockLevel.ACCESS_EXCLUSIVE, True, False, ["a"]),
+            ("cluster a using idx", LockLevel.ACCESS_EXCLUSIVE, True, False, ["a"]),
+            ("truncate table a", LockLevel.ACCESS_EXCLUSIVE, False, False, ["a"]),
+            ("update a set b = 1", LockLevel.ROW_EXCLUSIVE, False, True, ["a"]),
+            ("lock table a in share mode", LockLevel.SHARE, False, False, ["a"]),
+            ("create table a (id int)", LockLevel.NONE, False, False, []),
+        ],
+    )
+    def test_classify_statement(self, query, lock, rewrite, scan, tables):
+        result = classify_statement(SqlStatement(query=query, line=1))
+
+        assert result.lock == lock
+        assert result.rewrite is rewrite
+        assert result.scan is scan
+        assert result.tables == tables
+
+
+class TestGetDirectives:
+    def test_get_directives(self):
+        result = get_directives(
+            "\n-- py-db-migrate:baseline file-1-up\n"
+            "-- a comment\n"
+            "--py-db-migrate:baseline  file-2-up \n"
+            "create table a (id int);\n"
+            "-- py-db-migrate:baseline file-3-up\n"
+        )
+
+        assert result == {"baseline": ["file-1-up", "file-2-up"]}
+
+    def test_remove_directives(self):
+        result = remove_directives(
+            "-- py-db-migrate:baseline file-1-up\n"
+            "-- a comment\n"
+            "create table a (id int);\n"
+            "-- py-db-migrate:baseline file-3-up\n"
+        )
+
+        assert result == (
+            "-- a comment\n"
+            "create table a (id int);\n"
+            "-- py-db-migrate:baseline file-3-up\n"
+        )
+
+
+class TestFindSyntaxErrors:
+    @pytest.mark.parametrize(
+        "contents, errors",
+        [
+            ("select 1;\nselect (1);", []),
+            ("do $$ begin perform ';'; end $$;", []),
+            ("select E'it\\'s';", []),
+            ("(select 1) union (select 2);", []),
+            ("select 1;\nselec 2;", [(2, "Unknown command SELEC.")]),
+            ("select 1;\nselect 'a;", [(2, "Unterminated string.")]),
+            ('select "a;', [(1, "Unterminated quoted identifier.")]),
+            ("do $body$ begin", [(1, "Unterminated dollar-quoted string.")]),
+            ("select 1;\n/* /* */", [(2, "Unterminated block comment.")]),
+            ("select (1;", [(1, "Unbalanced parentheses.")]),
+            ("select 1);", [(1, "Unbalanced parentheses.")]),
+        ],
+    )
+    def test_find_syntax_errors(self, contents, errors):
+        assert find_syntax_errors(contents) == errors
+
+
+class TestGetCreatedTable:
+    @pytest.mark.parametrize(
+        "query, table",
+        [
+            ("create table a (id int)", "a"),
+            ('create unlogged table if not exists s."A" (id int)', "s.A"),
+            ("create index i on a (id)", None),
+        ],
+    )
+    def test_get_created_table(self, query, table):
+        assert get_created_table(SqlStatement(query=query, line=1)) == table
+
+
+class TestGetIndexedTable:
+    @pytest.mark.parametrize(
+        "query, result",
+        [
+            (
+                "create index concurrently if not exists i on public.a (id)",
+                ("public.a", True),
+            ),
+            ('create unique index on only "B" using btree (id)', ("B", False)),
+            ("create table a (id int)", None),
+        ],
+    )
+    def test_get_indexed_table(self, query, result):
+        assert get_indexed_table(SqlStatement(query=query, line=1)) == result
+
+
+class TestGetAlteredTable:
+    @pytest.mark.parametrize(
+        "query, table",
+        [
+            ("alter table a add column b int", "a"),
+            ('alter table if exists only s."A" drop column b', "s.A"),
+            ("alter index i rename to j", None),
+        ],
+    )
+    def test_get_altered_table(self, query, table):
+        assert get_altered_table(SqlStatement(query=query, line=1)) == table
@@ -0,0 +1,143 @@
+"""Unit tests for template database service."""
+import os
+
+import pytest
+
+
+from pathlib import Path
+
+from tests.conftest import (  # noqa: F401
+    use_temp_file,
+    psql,
+    write_migration_files,
+)
+
+from py_db_migrate.service.migration_up import MigrationError
+from py_db_migrate.service.template_database import TemplateDatabase
+
+FILE_NAME = "20230902182613-file-1-up"
+
+
+@pytest.fixture
+async def template_database(psql) -> TemplateDatabase:
+    template_database = TemplateDatabase(database=psql)
+    yield template_database
+    for row in await psql.fetch(
+        "select datname from pg_database where datname like 'pydbmigrate_template_%'"
+    ):
+        await psql.execute(f"alter database {row['datname']} is_template false")
+        await psql.execute(f"drop database {row['datname']}")
+
+
+class TestTemplateDatabase:
+    async def test_call(self, template_database, use_temp_file):
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (id int);"}
+        )
+
+        template = await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+        reused_template = await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+
+        assert template.startswith("pydbmigrate_template_")
+        assert reused_template == template
+        assert await template_database.database.fetch(
+            f"select datistemplate from pg_database where datname = '{template}'"
+        ) == [{"datistemplate": True}]
+
+    async def test_call_changed_folder(self, template_database, use_temp_file):
+        """
+        Case: A migration file is changed. A new template is built and the
+            older one is dropped.
+        """
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (id int);"}
+        )
+        template = await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (x int);"}
+        )
+        new_template = await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+
+        assert new_template != template
+        assert not await template_database.check_existence_of_database(name=template)
+
+    async def test_call_other_project(self, template_database, use_temp_file):
+        """
+        Case: Another project has a template on the same server. It isn't
+            dropped when the folder of this project changes.
+        """
+        other_folder = Path(use_temp_file) / "other"
+        os.mkdir(other_folder)
+        await write_migration_files(
+            other_folder, {FILE_NAME: "create table testtemplate (id int);"}
+        )
+        other_template = await template_database(
+            migration_folder=other_folder, migration_table="pydbmigration"
+        )
+
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (x int);"}
+        )
+        template = await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (y int);"}
+        )
+        await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+
+        assert not await template_database.check_existence_of_database(name=template)
+        assert await template_database.check_existence_of_database(name=other_template)
+
+    async def test_call_migration_error(self, template_database, use_temp_file):
+        """
+        Case: A migration fails. The temporary database is dropped.
+        """
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (id"}
+        )
+
+        with pytest.raises(MigrationError):
+            await template_database(
+                migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+            )
+
+        assert not await template_database.database.fetch(
+            "select 1 from pg_database where datname like 'pydbmigrate_template_%'"
+        )
+
+
+class TestCreateDatabase:
+    async def test_create_database(self, template_database, use_temp_file):
+        await write_migration_files(
+            use_temp_file, {FILE_NAME: "create table testtemplate (id int);"}
+        )
+        template = await template_database(
+            migration_folder=Path(use_temp_file), migration_table="pydbmigration"
+        )
+        name = "pydbmigrate_test_createdatabase"
+        try:
+            await template_database.create_database(name=name, template=template)
+
+            database = template_database.database.__class__(
+                **(template_database.database.model_dump() | {"name": name})
+            )
+            assert await database.fetch("select name from pydbmigration") == [
+                {"name": "20230902182613-file-1-up"}
+            ]
+            assert await database.fetch("select * from testtemplate") == []
+        finally:
+            await template_database.drop_database(name=name)
+
+        assert not await template_database.check_existence_of_database(name=name)
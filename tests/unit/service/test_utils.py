@@ -1,10 +1,26 @@
 """Unit tests for util functions of service layer."""
+import gzip
+
 import aiofiles.os
 from pathlib import Path
 
+import pytest
+
 from tests.conftest import use_temp_file  # noqa: F401
 
-from py_db_migrate.service.utils import check_existence_of_file
+from py_db_migrate.service import DuplicateMigrationError, EmptyFileError
+from py_db_migrate.service.utils import (
+    check_existence_of_file,
+    get_migration_file_names,
+    get_migration_file_path,
+    get_migration_folder_checksum,
+    get_python_migration_function,
+    get_up_file_name,
+    quote_identifier,
+    quote_table_name,
+    stream_sql_statements,
+)
+from py_db_migrate.service.sql_parser import SqlStatement
 
 
 class TestCheckExistenceOfFile:
@@ -18,3 +34,155 @@ class TestCheckExistenceOfFile:
     async def test_check_existence_of_file_false(self):
         result = await check_existence_of_file(Path("temp/config.yaml"))
         assert result is False
+
+
+class TestGetMigrationFileNames:
+    async def test_get_migration_file_names(self, use_temp_file):
+        for file_name in ("file-2-up.sql", "file-1-up.sql", "file-1-down.sql"):
+            async with aiofiles.open(Path(f"{use_temp_file}/{file_name}"), "w") as file:
+                await file.write("test")
+
+        result = await get_migration_file_names(Path(use_temp_file))
+
+        assert result == ("file-1-up", "file-2-up")
+
+    async def test_get_migration_file_names_python(self, use_temp_file):
+        """
+        Case: Python up files are listed together with SQL ones.
+        """
+        for file_name in ("file-2-up.py", "file-1-up.sql", "file-2-down.py"):
+            async with aiofiles.open(Path(f"{use_temp_file}/{file_name}"), "w") as file:
+                await file.write("test")
+
+        result = await get_migration_file_names(Path(use_temp_file))
+
+        assert result == ("file-1-up", "file-2-up")
+
+    async def test_get_migration_file_names_compressed(self, use_temp_file):
+        """
+        Case: Compressed up files are listed without their extensions.
+        """
+        for file_name in ("file-2-up.sql.gz", "file-1-up.sql.zst", "file-2-down.sql"):
+            async with aiofiles.open(Path(f"{use_temp_file}/{file_name}"), "w") as file:
+                await file.write("test")
+
+        result = await get_migration_file_names(Path(use_temp_file))
+
+        assert result == ("file-1-up", "file-2-up")
+
+    async def test_get_migration_file_names_duplicate(self, use_temp_file):
+        """
+        Case: A migration has both SQL and Python up files.
+        """
+        for file_name in ("file-1-up.sql", "file-1-up.py"):
+            async with aiofiles.open(Path(f"{use_temp_file}/{file_name}"), "w") as file:
+                await file.write("test")
+
+        with pytest.raises(DuplicateMigrationError):
+            await get_migration_file_names(Path(use_temp_file))
+
+
+class TestGetMigrationFilePath:
+    async def test_get_migration_file_path(self, use_temp_file):
+        for file_name in ("file-1-up.sql", "file-2-up.py"):
+            async with aiofiles.open(Path(f"{use_temp_file}/{file_name}"), "w") as file:
+                await file.write("test")
+
+        assert (
+            await get_migration_file_path(Path(use_temp_file), "file-1-up")
+        ).name == "file-1-up.sql"
+        assert (
+            await get_migration_file_path(Path(use_temp_file), "file-2-up")
+        ).name == "file-2-up.py"
+
+    async def test_get_migration_file_path_not_found(self, use_temp_file):
+        with pytest.raises(FileNotFoundError):
+            await get_migration_file_path(Path(use_temp_file), "file-1-up")
+
+
+class TestGetPythonMigrationFunction:
+    async def test_get_python_migration_function(self, use_temp_file):
+        path = Path(f"{use_temp_file}/file-1-up.py")
+        async with aiofiles.open(path, "w") as file:
+            await file.write("async def up(conn):\n    return conn\n")
+
+        function = get_python_migration_function(path=path, name="up")
+
+        assert await function("connection") == "connection"
+
+    async def test_get_python_migration_function_missing(self, use_temp_file):
+        """
+        Case: The file doesn't define an async `down` function.
+        """
+        path = Path(f"{use_temp_file}/file-1-down.py")
+        async with aiofiles.open(path, "w") as file:
+            await file.write("def down(conn):\n    pass\n")
+
+        with pytest.raises(EmptyFileError):
+            get_python_migration_function(path=path, name="down")
+
+
+class TestGetMigrationFolderChecksum:
+    async def test_get_migration_folder_checksum(self, use_temp_file):
+        path = Path(f"{use_temp_file}/file-1-up.sql")
+        async with aiofiles.open(path, "w") as file:
+            await file.write("test")
+        checksum = await get_migration_folder_checksum(Path(use_temp_file))
+
+        async with aiofiles.open(Path(f"{use_temp_file}/notes.txt"), "w") as file:
+            await file.write("test")
+        assert await get_migration_folder_checksum(Path(use_temp_file)) == checksum
+
+        async with aiofiles.open(path, "w") as file:
+            await file.write("changed")
+        assert await get_migration_folder_checksum(Path(use_temp_file)) != checksum
+
+    async def test_get_migration_folder_checksum_compressed(self, use_temp_file):
+        """
+        Case: Compressing a file doesn't change the checksum of the folder.
+        """
+        path = Path(f"{use_temp_file}/file-1-up.sql")
+        async with aiofiles.open(path, "w") as file:
+            await file.write("create table a (id int);")
+        checksum = await get_migration_folder_checksum(Path(use_temp_file))
+
+        async with aiofiles.open(Path(f"{path}.gz"), "wb") as file:
+            await file.write(gzip.compress(b"create table a (id int);"))
+        await aiofiles.os.remove(path)
+
+        assert await get_migration_folder_checksum(Path(use_temp_file)) == checksum
+
+
+class TestStreamSqlStatements:
+    async def test_stream_sql_statements(self, use_temp_file):
+        path = Path(f"{use_temp_file}/file-1-up.sql.gz")
+        async with aiofiles.open(path, "wb") as file:
+            await file.write(
+                gzip.compress(b"create table a (id int);\ninsert into a values (1);")
+            )
+
+        result = [
+            statement async for statement in stream_sql_statements(path, chunk_size=5)
+        ]
+
+        assert result == [
+            SqlStatement(query="create table a (id int)", line=1),
+            SqlStatement(query="insert into a values (1)", line=2),
+        ]
+
+
+class TestQuoteIdentifier:
+    def test_quote_identifier(self):
+        assert quote_identifier('my"db') == '"my""db"'
+
+
+class TestQuoteTableName:
+    def test_quote_table_name(self):
+        assert quote_table_name("public.It's") == "'\"public\".\"It''s\"'"
+
+
+class TestGetUpFileName:
+    def test_get_up_file_name(self):
+        assert get_up_file_name("file-1") == "file-1-up"
+        assert get_up_file_name("file-1-up") == "file-1-up"
+        assert get_up_file_name("file-1-up.sql") == "file-1-up"
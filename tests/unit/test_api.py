@@ -0,0 +1,121 @@
+"""Unit tests for the async API."""
+from pathlib import Path
+from uuid import uuid4
+
+import aiofiles.os
+import asyncpg
+import pytest
+
+from tests.conftest import use_temp_file, psql  # noqa: F401
+
+from py_db_migrate.api import migrate_down, migrate_up, migration_status
+from py_db_migrate.service import FolderNotFoundError
+from py_db_migrate.service.migration_up import MigrationError
+
+
+@pytest.fixture
+async def pool(psql):
+    async with asyncpg.create_pool(
+        user=psql.user,
+        password=psql.password,
+        host=psql.host,
+        port=psql.port,
+        database=psql.name,
+        min_size=1,
+        max_size=2,
+    ) as pool:
+        yield pool
+
+
+@pytest.fixture
+async def migration_files(psql, use_temp_file):
+    table_name = "a" + uuid4().hex
+    files = {
+        "20230902182613-file-1-up": "create table testapi (id int);",
+        "20230902182613-file-1-down": "drop table testapi;",
+    }
+    for file_name, contents in files.items():
+        async with aiofiles.open(
+            Path(f"{use_temp_file}/{file_name}.sql"), mode="w"
+        ) as file:
+            await file.write(contents)
+    try:
+        yield use_temp_file, table_name
+    finally:
+        await psql.execute(f"drop table if exists {table_name}, testapi")
+
+
+class TestApi:
+    async def test_pool(self, pool, migration_files):
+        folder, table_name = migration_files
+
+        migrated_files = await migrate_up(pool, folder, table=table_name)
+        states = await migration_status(pool, folder, table=table_name)
+        down_file = await migrate_down(pool, folder, table=table_name)
+
+        assert migrated_files == ["20230902182613-file-1-up"]
+        assert [(state.name, state.date is not None) for state in states] == [
+            ("20230902182613-file-1-up", True)
+        ]
+        assert down_file == "20230902182613-file-1-down"
+        assert await migrate_up(pool, folder, table=table_name) == [
+            "20230902182613-file-1-up"
+        ]
+        assert pool.get_idle_size() == pool.get_size()
+
+    async def test_connection(self, pool, migration_files):
+        """
+        Case: A connection of the application is given. So, it is used
+        without being closed.
+        """
+        folder, table_name = migration_files
+
+        async with pool.acquire() as connection:
+            migrated_files = await migrate_up(connection, folder, table=table_name)
+            assert await migrate_up(connection, folder, table=table_name) == []
+            assert not connection.is_closed()
+
+        assert migrated_files == ["20230902182613-file-1-up"]
+
+    @pytest.mark.parametrize("parallelism", [1, 2])
+    async def test_pool_parallel_indexes(self, pool, migration_files, parallelism):
+        """
+        Case: The indexes are built in parallel. So, the builds run on other
+        connections of the pool.
+        """
+        folder, table_name = migration_files
+        await migrate_up(pool, folder, table=table_name)
+        async with aiofiles.open(
+            Path(f"{folder}/20230902182614-file-2-up.sql"), mode="w"
+        ) as file:
+            await file.write(
+                f"-- py-db-migrate:parallel-indexes {parallelism}\n"
+                "create index concurrently testapi_id on testapi (id);"
+            )
+
+        assert await migrate_up(pool, folder, table=table_name) == [
+            "20230902182614-file-2-up"
+        ]
+        assert pool.get_idle_size() == pool.get_size()
+
+    async def test_connection_parallel_indexes(self, pool, migration_files):
+        """
+        Case: The indexes are built in parallel on a single connection. So,
+        the migration fails without running the builds.
+        """
+        folder, table_name = migration_files
+        async with aiofiles.open(
+            Path(f"{folder}/20230902182614-file-2-up.sql"), mode="w"
+        ) as file:
+            await file.write(
+                "-- py-db-migrate:parallel-indexes 2\n"
+                "create index concurrently testapi_id on testapi (id);"
+            )
+
+        async with pool.acquire() as connection:
+            with pytest.raises(MigrationError, match="Give a pool instead"):
+                await migrate_up(connection, folder, table=table_name)
+
+    async def test_folder_not_found(self, pool):
+        with pytest.raises(FolderNotFoundError):
+            await migrate_up(pool, "./missing-folder")
@@ -0,0 +1,14 @@
+"""Unit tests for the client of the migration server."""
+from py_db_migrate.client import main
+
+
+class TestMain:
+    def test_main_usage(self, capsys):
+        assert main([]) == 2
+        assert "Usage" in capsys.readouterr().err
+
+    def test_main_no_server(self, capsys):
+        """
+        Case: There is no server listening on the socket.
+        """
+        assert main(["status", "./missing.sock"]) == 1
@@ -7,7 +7,9 @@ from tests.conftest import use_temp_file  # noqa: F401
 from tests.unit.service.test_start import start_service  # noqa: F401
 
 from py_db_migrate.configuration import (
+    ConfigurationError,
     get_configuration,
+    load_configuration,
     DatabaseFields,
     Configuration,
 )
@@ -52,3 +54,13 @@ class TestGetConfiguration:
 
         with pytest.raises(SystemExit):
             get_configuration(path)
+
+
+class TestLoadConfiguration:
+    async def test_load_configuration_no_config_file(self):
+        """
+        Case: There is no configuration file. So, an error is raised instead
+        of exiting.
+        """
+        with pytest.raises(ConfigurationError):
+            load_configuration(Path("./temp/py-db-migration.yaml"))
@@ -0,0 +1,58 @@
+"""Unit tests for pytest plugin."""
+import asyncio
+import pytest
+from pathlib import Path
+from shutil import rmtree
+from uuid import uuid4
+
+from py_db_migrate.configuration import Configuration, DatabaseFields
+from py_db_migrate.database.postgresql import PSql
+from py_db_migrate.pytest_plugin import migrated_psql  # noqa: F401
+from py_db_migrate.service.template_database import TemplateDatabase
+
+
+@pytest.fixture(scope="module")
+def py_db_migrate_configuration() -> Configuration:
+    folder = Path(f"./temp-{uuid4()}")
+    folder.mkdir()
+    (folder / "20230902182613-file-1-up.sql").write_text(
+        "create table testplugin (id int);"
+    )
+    yield Configuration(
+        database=DatabaseFields(
+            host="localhost",
+            port=5432,
+            user="admin",
+            password="password",
+            name="postgres",
+        ),
+        migration_directory=str(folder),
+    )
+    rmtree(folder)
+
+
+@pytest.fixture(scope="module")
+def py_db_migrate_template(py_db_migrate_configuration) -> str:
+    psql = PSql(**py_db_migrate_configuration.database.model_dump())
+    template = asyncio.run(
+        TemplateDatabase(database=psql)(
+            migration_folder=Path(py_db_migrate_configuration.migration_directory),
+            migration_table="pydbmigration",
+        )
+    )
+    yield template
+    asyncio.run(psql.execute(f"alter database {template} is_template false"))
+    asyncio.run(psql.execute(f"drop database {template}"))
+
+
+class TestMigratedPsql:
+    async def test_migrated_psql(self, migrated_psql):
+        assert await migrated_psql.fetch("select * from testplugin") == []
+        await migrated_psql.execute("insert into testplugin values (1)")
+
+    async def test_migrated_psql_isolated(self, migrated_psql):
+        """
+        Case: Each test gets its own database.
+        """
+        assert await migrated_psql.fetch("select * from testplugin") == []
+        assert migrated_psql.name.startswith("pydbmigrate_test_")